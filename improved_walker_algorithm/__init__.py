@@ -1 +1,4 @@
 from .improved_walker_algorithm import *
+from .compact_improved_walker_algorithm import *
+from .incremental_improved_walker_algorithm import *
+from .layout_api import *
@@ -0,0 +1,242 @@
+import numpy as np
+
+from module_graph import CompactTree
+from module_instrumentation import get_instrumentation
+
+
+class CompactImprovedWalkerAlgorithm:
+    """
+    Class Compact Improved Walker Algorithm
+    Variant of the Improved Walker Algorithm, which runs on the arrays of a CompactTree instead of node objects.
+    Because the nodes are numbered in breadth first order, the first walk handles the nodes in reversed order
+    without a stack and the second walk handles them in order. If the tree has label widths, neighboring nodes
+    are apart by the distance and half of the width of both labels. Like the Improved Walker Algorithm an instance
+    keeps the counters of its last layout.
+    """
+
+    def __init__(self):
+        self.tree = None
+        self.offsets = []
+        self.parent = []
+        self.prelim = []
+        self.mod = []
+        self.shift = []
+        self.change = []
+        self.thread = []
+        self.ancestor = []
+        self.midpoint = []
+        self.half_width = []
+        self.contour_step_count = 0
+        self.move_subtree_count = 0
+        self.thread_assignment_count = 0
+
+    def run(self, tree: CompactTree):
+        """
+        Starts the Improved Walker Algorithm. The coordinates are stored in the x and y arrays of the tree.
+        :param tree: CompactTree, for which the algorithm should be run
+        :return: CompactTree
+        """
+        self.__tree_layout(tree)
+        self.contour_step_count = 0
+        self.move_subtree_count = 0
+        self.thread_assignment_count = 0
+        self.__first_walk()
+        self.__second_walk()
+        self.__store_columns()
+
+        instrumentation = get_instrumentation()
+        if instrumentation:
+            instrumentation.report_counters(type(self).__name__, self.get_counters())
+
+        return tree
+
+    def get_counters(self):
+        """
+        Returns the counters of the last layout, with the same names as the counters of the Improved Walker
+        Algorithm.
+        :return: {str: int}
+        """
+        return {'nodes': 0 if self.tree is None else len(self.tree), 'contour_steps': self.contour_step_count,
+                'move_subtree_calls': self.move_subtree_count, 'thread_assignments': self.thread_assignment_count}
+
+    def __tree_layout(self, tree: CompactTree):
+        """
+        The columns are copied into lists for the walks, because single element access on lists is faster.
+        :param tree: CompactTree
+        :return: None
+        """
+        node_count = len(tree)
+        self.tree = tree
+        self.offsets = tree.child_offsets.tolist()
+        self.parent = tree.parent.tolist()
+        self.prelim = [0.0] * node_count
+        self.mod = [0.0] * node_count
+        self.shift = [0.0] * node_count
+        self.change = [0.0] * node_count
+        self.thread = [-1] * node_count
+        self.ancestor = list(range(node_count))
+        self.midpoint = [0.0] * node_count
+        self.half_width = [0.0] * node_count if tree.widths is None else (tree.widths / 2).tolist()
+
+    def __store_columns(self):
+        self.tree.prelim = np.array(self.prelim)
+        self.tree.mod = np.array(self.mod)
+        self.tree.shift = np.array(self.shift)
+        self.tree.change = np.array(self.change)
+        self.offsets = self.parent = self.prelim = self.mod = self.shift = self.change = []
+        self.thread = self.ancestor = self.midpoint = self.half_width = []
+
+    def __first_walk(self):
+        offsets = self.offsets
+        for node_v in range(len(self.parent) - 1, -1, -1):
+            if offsets[node_v] == offsets[node_v + 1]:
+                continue
+
+            default_ancestor = offsets[node_v]
+            for node_w in range(offsets[node_v], offsets[node_v + 1]):
+                self.__place(node_w)
+                default_ancestor = self.__apportion(node_w, default_ancestor)
+            self.__execute_shifts(node_v)
+            self.midpoint[node_v] = (self.prelim[offsets[node_v]] + self.prelim[offsets[node_v + 1] - 1]) / 2
+
+        if self.parent:
+            self.__place(0)
+
+    def __place(self, node_w: int):
+        """
+        Sets the preliminary x coordinate of the node relative to its left sibling.
+        The subtree of the node has already been handled.
+        :param node_w: int
+        :return: None
+        """
+        has_left_sibling = node_w > 0 and node_w > self.offsets[self.parent[node_w]]
+        separation = self.tree.distance + self.half_width[node_w - 1] + self.half_width[node_w] \
+            if has_left_sibling else 0
+        if self.offsets[node_w] == self.offsets[node_w + 1]:
+            self.prelim[node_w] = self.prelim[node_w - 1] + separation if has_left_sibling else 0
+        elif has_left_sibling:
+            self.prelim[node_w] = self.prelim[node_w - 1] + separation
+            self.mod[node_w] = self.prelim[node_w] - self.midpoint[node_w]
+        else:
+            self.prelim[node_w] = self.midpoint[node_w]
+
+    def __second_walk(self):
+        if not self.parent:
+            return
+
+        parent = self.parent
+        prelim = self.prelim
+        mod = self.mod
+        modifier_sum = [0.0] * len(parent)
+        x = [0.0] * len(parent)
+        y = [0.0] * len(parent)
+        modifier_sum[0] = prelim[0]
+        x[0] = prelim[0] + modifier_sum[0]
+        y[0] = 1
+        for node in range(1, len(parent)):
+            parent_node = parent[node]
+            modifier_sum[node] = modifier_sum[parent_node] + mod[parent_node]
+            x[node] = prelim[node] + modifier_sum[node]
+            y[node] = y[parent_node] + 1
+
+        self.tree.x = np.array(x)
+        self.tree.y = np.array(y)
+
+    def __apportion(self, node_v: int, default_ancestor: int):
+        offsets = self.offsets
+        thread = self.thread
+        prelim = self.prelim
+        mod = self.mod
+        half_width = self.half_width
+        distance = self.tree.distance
+        left_most_sibling = offsets[self.parent[node_v]]
+        if node_v == left_most_sibling:
+            return default_ancestor
+
+        node_i_plus = node_v
+        node_o_plus = node_v
+        node_i_minus = node_v - 1
+        node_o_minus = left_most_sibling
+        s_i_plus = mod[node_i_plus]
+        s_o_plus = mod[node_o_plus]
+        s_i_minus = mod[node_i_minus]
+        s_o_minus = mod[node_o_minus]
+
+        contour_steps = 0
+        while True:
+            next_right_i_minus = offsets[node_i_minus + 1] - 1 if offsets[node_i_minus] < offsets[node_i_minus + 1] \
+                else thread[node_i_minus]
+            next_left_i_plus = offsets[node_i_plus] if offsets[node_i_plus] < offsets[node_i_plus + 1] \
+                else thread[node_i_plus]
+            if next_right_i_minus < 0 or next_left_i_plus < 0:
+                break
+            contour_steps += 1
+            node_i_minus = next_right_i_minus
+            node_i_plus = next_left_i_plus
+            node_o_minus = offsets[node_o_minus] if offsets[node_o_minus] < offsets[node_o_minus + 1] \
+                else thread[node_o_minus]
+            node_o_plus = offsets[node_o_plus + 1] - 1 if offsets[node_o_plus] < offsets[node_o_plus + 1] \
+                else thread[node_o_plus]
+            self.ancestor[node_o_plus] = node_v
+            shift = (prelim[node_i_minus] + s_i_minus) - (prelim[node_i_plus] + s_i_plus) + distance \
+                + half_width[node_i_minus] + half_width[node_i_plus]
+            if shift > 0:
+                ancestor_node = self.__ancestor(node_i_minus, node_v, default_ancestor)
+                self.__move_subtree(ancestor_node, node_v, shift)
+                self.move_subtree_count += 1
+                s_i_plus += shift
+                s_o_plus += shift
+            s_i_minus += mod[node_i_minus]
+            s_i_plus += mod[node_i_plus]
+            s_o_minus += mod[node_o_minus]
+            s_o_plus += mod[node_o_plus]
+        self.contour_step_count += contour_steps
+
+        if self.__next_right(node_i_minus) >= 0 and self.__next_right(node_o_plus) < 0:
+            thread[node_o_plus] = self.__next_right(node_i_minus)
+            mod[node_o_plus] += s_i_minus - s_o_plus
+            self.thread_assignment_count += 1
+        if self.__next_left(node_i_plus) >= 0 and self.__next_left(node_o_minus) < 0:
+            thread[node_o_minus] = self.__next_left(node_i_plus)
+            mod[node_o_minus] += s_i_plus - s_o_minus
+            self.thread_assignment_count += 1
+            default_ancestor = node_v
+
+        return default_ancestor
+
+    def __next_left(self, node: int):
+        if self.offsets[node] < self.offsets[node + 1]:
+            return self.offsets[node]
+        else:
+            return self.thread[node]
+
+    def __next_right(self, node: int):
+        if self.offsets[node] < self.offsets[node + 1]:
+            return self.offsets[node + 1] - 1
+        else:
+            return self.thread[node]
+
+    def __execute_shifts(self, node: int):
+        shift = 0
+        change = 0
+        for node_w in range(self.offsets[node + 1] - 1, self.offsets[node] - 1, -1):
+            self.prelim[node_w] += shift
+            self.mod[node_w] += shift
+            change += self.change[node_w]
+            shift += self.shift[node_w] + change
+
+    def __move_subtree(self, w_minus: int, w_plus: int, shift):
+        # Siblings have consecutive numbers, so the difference is the amount of subtrees in between.
+        subtrees = w_plus - w_minus
+        self.change[w_plus] -= shift / subtrees
+        self.shift[w_plus] += shift
+        self.change[w_minus] += shift / subtrees
+        self.prelim[w_plus] += shift
+        self.mod[w_plus] += shift
+
+    def __ancestor(self, node_i_minus: int, node: int, default_ancestor: int):
+        ancestor_node = self.ancestor[node_i_minus]
+        if self.parent[ancestor_node] == self.parent[node] and ancestor_node != node:
+            return ancestor_node
+        else:
+            return default_ancestor
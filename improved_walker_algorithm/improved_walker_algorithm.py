@@ -1,65 +1,153 @@
-import networkx as nx
+from typing import TYPE_CHECKING
 
 from module_graph import Graph
 from module_graph import Node
+from module_instrumentation import get_instrumentation
+from module_instrumentation import instrument_stage
+
+if TYPE_CHECKING:
+    import networkx as nx
 
 
 class ImprovedWalkerAlgorithm:
     """
     Class Improved Walker Algorithm
+    Lays out the nodes of a graph in place. An instance keeps the graph of its last layout and the counters,
+    so it must not be shared between threads, the function layout lays out a tree without shared state.
+    Neighboring nodes are apart by the distance of the graph and half of the width of both labels, which is 0
+    unless it was set with Graph.set_label_widths.
     """
 
     def __init__(self):
         self.graph = Graph()
-        self.default_ancestor = None
+        self.contour_step_count = 0
+        self.move_subtree_count = 0
+        self.thread_assignment_count = 0
 
-    def run(self, nx_graph: nx.Graph, filename: str, scale_x=10, scale_y=10):
+    def run(self, nx_graph: 'nx.Graph', filename: str, scale_x=None, scale_y=None, dpi=None, image_format='png',
+            show=False):
         """
-        Starts the Improved Walker Algorithm
-        :param nx_graph: Networkx Graph, for which the algorithm should be run
+        Starts the Improved Walker Algorithm and draws the graph.
+        :param nx_graph: Networkx Graph or Graph, for which the algorithm should be run
         :param filename: str, Filename for the to be saved image
-        :param scale_x: int, x scale for the image
-        :param scale_y: int, y scale for the image
-        :return:
+        :param scale_x: ?int, x scale for the image, derived from the layout if missing
+        :param scale_y: ?int, y scale for the image, derived from the layout if missing
+        :param dpi: ?int, resolution of raster images, derived from the layout if missing
+        :param image_format: str, png, svg or pdf
+        :param show: bool, shows the image in a window
+        :return: Graph
         """
-        self.__tree_layout(nx_graph)
-        self.__first_walk(self.graph.root_node)
-        self.__second_walk(self.graph.root_node, self.graph.root_node.prelim)
-        self.graph.draw_graph(filename, scale_x=scale_x, scale_y=scale_y)
+        self.calculate_layout(nx_graph)
+        self.graph.draw_graph(filename, scale_x=scale_x, scale_y=scale_y, dpi=dpi, image_format=image_format,
+                              show=show)
 
-        self.__print_nodes_coordinates()
+        return self.graph
 
-    def __tree_layout(self, nx_graph: nx.Graph):
-        self.graph = Graph.create_graph_from_nx(nx_graph)
+    def calculate_layout(self, nx_graph: 'nx.Graph'):
+        """
+        Calculates the coordinates of the nodes without drawing the graph.
+        :param nx_graph: Networkx Graph or Graph, for which the algorithm should be run
+        :return: Graph
+        """
+        with instrument_stage('layout'):
+            self.__tree_layout(nx_graph)
+            self.contour_step_count = 0
+            self.move_subtree_count = 0
+            self.thread_assignment_count = 0
+            with instrument_stage('first_walk'):
+                self.__first_walk(self.graph.root_node)
+            with instrument_stage('second_walk'):
+                self.__second_walk(self.graph.root_node, self.graph.root_node.prelim)
 
-    def __first_walk(self, node_v: Node):
-        if not node_v.edges_to:
-            left_sibling = node_v.get_left_sibling()
-            if left_sibling:
-                node_v.prelim = left_sibling.prelim + self.graph.distance
-            else:
-                self.prelim = 0
+        instrumentation = get_instrumentation()
+        if instrumentation:
+            instrumentation.report_counters(type(self).__name__, self.get_counters())
+
+        return self.graph
+
+    def get_counters(self):
+        """
+        Returns the counters of the last layout. Many contour steps or subtree moves per node show
+        that the shape of the tree drives the apportion into its expensive cases.
+        :return: {str: int}
+        """
+        return {'nodes': len(self.graph.nodes), 'contour_steps': self.contour_step_count,
+                'move_subtree_calls': self.move_subtree_count, 'thread_assignments': self.thread_assignment_count}
+
+    def __tree_layout(self, nx_graph: 'nx.Graph'):
+        """
+        Takes the graph or converts the networkx graph. The state of the walks is reset on all nodes,
+        so a graph can be laid out again, e.g. after it was changed.
+        :param nx_graph: Networkx Graph or Graph
+        :return: None
+        """
+        if isinstance(nx_graph, Graph):
+            self.graph = nx_graph
+            for node in self.graph.nodes:
+                node.prelim = node.mod = node.shift = node.change = 0
+                node.thread = None
+                node.ancestor = node
         else:
-            default_ancestor = node_v.edges_to[0]
-            for i in range(len(node_v.edges_to)):
-                node_w = node_v.edges_to[i]
-                self.__first_walk(node_w)
-                default_ancestor = self.__apportion(node_w, default_ancestor)
+            self.graph = Graph.create_graph_from_nx(nx_graph)
+
+    def __first_walk(self, root_node: Node):
+        """
+        Computes the preliminary x coordinates in post-order.
+        The traversal uses an explicit stack, so the depth of the tree is not limited by the recursion limit.
+        Each stack entry holds the node, the position of the next child to visit and the default ancestor.
+        :param root_node: Node
+        :return: None
+        """
+        stack = [[root_node, 0, None]]
+        while stack:
+            frame = stack[-1]
+            node_v, position, default_ancestor = frame
+            if not node_v.children:
+                left_sibling = node_v.get_left_sibling()
+                if left_sibling:
+                    node_v.prelim = left_sibling.prelim + self.graph.distance + (left_sibling.width + node_v.width) / 2
+                else:
+                    node_v.prelim = 0
+                stack.pop()
+                continue
+
+            if position == 0:
+                frame[2] = node_v.children[0]
+            else:
+                frame[2] = self.__apportion(node_v.children[position - 1], default_ancestor)
+
+            if position < len(node_v.children):
+                frame[1] = position + 1
+                stack.append([node_v.children[position], 0, None])
+                continue
+
             self.__execute_shifts(node_v)
-            midpoint = (node_v.edges_to[0].prelim + node_v.edges_to[len(node_v.edges_to) - 1].prelim) / 2
+            midpoint = (node_v.children[0].prelim + node_v.children[-1].prelim) / 2
 
             left_sibling = node_v.get_left_sibling()
             if left_sibling:
-                node_v.prelim = left_sibling.prelim + self.graph.distance
+                node_v.prelim = left_sibling.prelim + self.graph.distance + (left_sibling.width + node_v.width) / 2
                 node_v.mod = node_v.prelim - midpoint
             else:
                 node_v.prelim = midpoint
+            stack.pop()
 
-    def __second_walk(self, node: Node, m: int):
-        node.x = node.prelim + m
-        node.y = self.graph.get_level(node)
-        for position, child in node.edges_to.items():
-            self.__second_walk(child, m + node.mod)
+    @staticmethod
+    def __second_walk(root_node: Node, m: int):
+        """
+        Computes the final coordinates in pre-order. The sum of the modifiers and the level are passed down
+        with the nodes on an explicit stack, so every node is visited exactly once.
+        :param root_node: Node
+        :param m: int, initial modifier of the root node
+        :return: None
+        """
+        stack = [(root_node, m, 1)]
+        while stack:
+            node, m, level = stack.pop()
+            node.x = node.prelim + m
+            node.y = level
+            for child in reversed(node.children):
+                stack.append((child, m + node.mod, level + 1))
 
     def __apportion(self, node_v: Node, default_ancestor: Node):
         left_sibling = node_v.get_left_sibling()
@@ -73,28 +161,36 @@ class ImprovedWalkerAlgorithm:
             s_i_minus = node_i_minus.mod
             s_o_minus = node_o_minus.mod
 
+            contour_steps = 0
             while self.__next_right(node_i_minus) and self.__next_left(node_i_plus):
+                contour_steps += 1
                 node_i_minus = self.__next_right(node_i_minus)
                 node_i_plus = self.__next_left(node_i_plus)
                 node_o_minus = self.__next_left(node_o_minus)
                 node_o_plus = self.__next_right(node_o_plus)
-                node_o_plus.__ancestor = node_v
-                shift = (node_i_minus.prelim + s_i_minus) - (node_i_plus.prelim + s_i_plus) + self.graph.distance
+                node_o_plus.ancestor = node_v
+                # The contours are apart by the distance and half of the label of each contour node.
+                shift = (node_i_minus.prelim + s_i_minus) - (node_i_plus.prelim + s_i_plus) + self.graph.distance \
+                    + (node_i_minus.width + node_i_plus.width) / 2
                 if shift > 0:
                     ancestor_node = self.__ancestor(node_i_minus, node_v, default_ancestor)
                     self.__move_subtree(ancestor_node, node_v, shift)
+                    self.move_subtree_count += 1
                     s_i_plus += shift
                     s_o_plus += shift
                 s_i_minus += node_i_minus.mod
                 s_i_plus += node_i_plus.mod
                 s_o_minus += node_o_minus.mod
                 s_o_plus += node_o_plus.mod
+            self.contour_step_count += contour_steps
             if self.__next_right(node_i_minus) and not self.__next_right(node_o_plus):
                 node_o_plus.thread = self.__next_right(node_i_minus)
                 node_o_plus.mod += s_i_minus - s_o_plus
+                self.thread_assignment_count += 1
             if self.__next_left(node_i_plus) and not self.__next_left(node_o_minus):
                 node_o_minus.thread = self.__next_left(node_i_plus)
-                node_o_minus.mod += s_i_plus + s_o_minus
+                node_o_minus.mod += s_i_plus - s_o_minus
+                self.thread_assignment_count += 1
                 default_ancestor = node_v
 
         return default_ancestor
@@ -123,15 +219,15 @@ class ImprovedWalkerAlgorithm:
 
     @staticmethod
     def __next_left(node: Node):
-        if node.edges_to:
-            return node.edges_to[0]
+        if node.children:
+            return node.children[0]
         else:
             return node.thread
 
     @staticmethod
     def __next_right(node: Node):
-        if node.edges_to:
-            return node.edges_to[len(node.edges_to) - 1]
+        if node.children:
+            return node.children[-1]
         else:
             return node.thread
 
@@ -139,8 +235,7 @@ class ImprovedWalkerAlgorithm:
     def __execute_shifts(node: Node):
         shift = 0
         change = 0
-        for descending_position in range(len(node.edges_to) - 1, -1, -1):
-            node_w = node.edges_to[descending_position]
+        for node_w in reversed(node.children):
             node_w.prelim += shift
             node_w.mod += shift
             change += node_w.change
@@ -157,8 +252,7 @@ class ImprovedWalkerAlgorithm:
 
     @staticmethod
     def __ancestor(node_i_minus: Node, node: Node, default_ancestor: Node):
-        siblings_names = [node.name for node in node.get_siblings().values()]
-        if node_i_minus.ancestor.name in siblings_names and node_i_minus is not node:
+        if node_i_minus.ancestor.parent is node.parent and node_i_minus.ancestor is not node:
             return node_i_minus.ancestor
         else:
             return default_ancestor
@@ -0,0 +1,289 @@
+from typing import TYPE_CHECKING
+
+from module_graph import Graph
+from module_graph import Node
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+
+class IncrementalImprovedWalkerAlgorithm:
+    """
+    Class Incremental Improved Walker Algorithm
+    Variant of the Improved Walker Algorithm for trees, which are changed with add_child, remove_subtree and
+    reorder_children of the graph. The first walk places the children of each node in one step and keeps a
+    journal of the threads, modifiers and ancestors this step changes deeper in the tree.
+    After a change the steps of the changed nodes and their ancestors are undone from the root downwards
+    and repeated from the bottom up, while all other subtrees keep their preliminary coordinates.
+    The second walk is only repeated for the subtrees whose position changed. It can be deferred,
+    so the coordinates of several changes are updated at once.
+    """
+
+    def __init__(self):
+        self.graph = Graph()
+        self.shifted_nodes = set()
+
+    def calculate_layout(self, nx_graph: 'nx.Graph'):
+        """
+        Calculates the coordinates of all nodes and the journals for later updates.
+        :param nx_graph: Networkx Graph or Graph, for which the algorithm should be run
+        :return: Graph
+        """
+        if isinstance(nx_graph, Graph):
+            self.graph = nx_graph
+        else:
+            self.graph = Graph.create_graph_from_nx(nx_graph)
+
+        root_node = self.graph.root_node
+        breadth_first_nodes = [root_node]
+        for node in breadth_first_nodes:
+            node.prelim = node.mod = node.shift = node.change = 0
+            node.thread = None
+            node.ancestor = node
+            breadth_first_nodes.extend(node.children)
+
+        # In reversed breadth first order all descendants of a node are placed before the node itself.
+        for node in reversed(breadth_first_nodes):
+            if node.children:
+                self.__place_children(node)
+            else:
+                node.journal = None
+        self.__place_root()
+        self.__second_walk(root_node, root_node.prelim, 1)
+        self.graph.changed_nodes.clear()
+        self.shifted_nodes.clear()
+
+        return self.graph
+
+    def update_layout(self, update_coordinates=True):
+        """
+        Updates the layout after the children of the changed nodes of the graph have been changed.
+        Only the preliminary coordinates along the paths from the changed nodes to the root node are computed again.
+        :param update_coordinates: bool, if False the coordinates are updated by a later call of update_coordinates
+        :return: int, amount of nodes with a new position
+        """
+        root_node = self.graph.root_node
+        depths = self.__get_changed_paths()
+        # New nodes have no level yet, so they are always handled by the second walk.
+        old_positions = {root_node: (root_node.prelim, root_node.mod)}
+        for node in depths:
+            for child in node.children:
+                old_positions[child] = (child.prelim, child.mod) if child.y else None
+
+        top_down_nodes = sorted(depths, key=depths.__getitem__)
+        for node in top_down_nodes:
+            self.__undo_place_children(node)
+        for node in reversed(top_down_nodes):
+            if node.children:
+                self.__place_children(node)
+        self.__place_root()
+        self.graph.changed_nodes.clear()
+
+        self.shifted_nodes.update(node for node, position in old_positions.items()
+                                  if (node.prelim, node.mod) != position
+                                  and (node is root_node or node.parent in depths))
+        if update_coordinates:
+            return self.update_coordinates()
+        return 0
+
+    def update_coordinates(self):
+        """
+        Repeats the second walk for the shifted nodes, which have no shifted ancestor and are still in the tree.
+        :return: int, amount of nodes with a new position
+        """
+        root_node = self.graph.root_node
+        updated_node_count = 0
+        for shifted_node in self.shifted_nodes:
+            # The sum of the modifiers of the ancestors starts with the preliminary x coordinate of the root node.
+            m = root_node.prelim
+            level = 1
+            top_node = shifted_node
+            node = shifted_node.parent
+            while node is not None and node not in self.shifted_nodes:
+                m += node.mod
+                level += 1
+                top_node = node
+                node = node.parent
+            if node is None and top_node is root_node:
+                updated_node_count += self.__second_walk(shifted_node, m, level)
+        self.shifted_nodes.clear()
+
+        return updated_node_count
+
+    def __get_changed_paths(self):
+        """
+        Collects the changed nodes, which are still part of the tree, and all their ancestors.
+        :return: {Node: int}, depth of each node, the root node has the depth 0
+        """
+        depths = {}
+        for changed_node in self.graph.changed_nodes:
+            path = []
+            node = changed_node
+            while node is not None and node not in depths:
+                path.append(node)
+                node = node.parent
+            if node is None and path[-1] is not self.graph.root_node:
+                continue
+
+            depth = depths[node] if node is not None else -1
+            for path_node in reversed(path):
+                depth += 1
+                depths[path_node] = depth
+
+        return depths
+
+    def __place_children(self, node_v: Node):
+        """
+        Places the children of the node next to each other, their subtrees have already been handled.
+        The changes of the apportion below the children are recorded in the journal of the node.
+        :param node_v: Node
+        :return: None
+        """
+        journal = ([], [])
+        default_ancestor = node_v.children[0]
+        for node_w in node_v.children:
+            self.__place(node_w)
+            default_ancestor = self.__apportion(node_w, default_ancestor, journal)
+        self.__execute_shifts(node_v)
+        node_v.midpoint = (node_v.children[0].prelim + node_v.children[-1].prelim) / 2
+        node_v.journal = journal
+
+    @staticmethod
+    def __undo_place_children(node_v: Node):
+        """
+        Restores the threads and modifiers from the journal of the node and resets its children,
+        so the state is the same as before the children were placed.
+        :param node_v: Node
+        :return: None
+        """
+        if node_v.journal:
+            thread_changes, ancestor_changes = node_v.journal
+            for node, thread, mod in reversed(thread_changes):
+                node.thread = thread
+                node.mod = mod
+            # Ancestors pointing deeper into the tree are ignored by __ancestor, so they are reset to the node.
+            for node in ancestor_changes:
+                node.ancestor = node
+        node_v.journal = None
+
+        for node_w in node_v.children:
+            node_w.prelim = node_w.mod = node_w.shift = node_w.change = 0
+
+    def __place(self, node_w: Node):
+        left_sibling = node_w.get_left_sibling()
+        separation = self.graph.distance + (left_sibling.width + node_w.width) / 2 if left_sibling else 0
+        if not node_w.children:
+            node_w.prelim = left_sibling.prelim + separation if left_sibling else 0
+        elif left_sibling:
+            node_w.prelim = left_sibling.prelim + separation
+            node_w.mod = node_w.prelim - node_w.midpoint
+        else:
+            node_w.prelim = node_w.midpoint
+
+    def __place_root(self):
+        root_node = self.graph.root_node
+        root_node.prelim = root_node.midpoint if root_node.children else 0
+
+    @staticmethod
+    def __second_walk(root_node: Node, m: float, level: int):
+        """
+        Computes the final coordinates of the subtree in pre-order.
+        :param root_node: Node
+        :param m: float, sum of the modifiers of the ancestors
+        :param level: int, level of the root of the subtree
+        :return: int, amount of nodes of the subtree
+        """
+        node_count = 0
+        stack = [(root_node, m, level)]
+        while stack:
+            node, m, level = stack.pop()
+            node.x = node.prelim + m
+            node.y = level
+            node_count += 1
+            for child in reversed(node.children):
+                stack.append((child, m + node.mod, level + 1))
+
+        return node_count
+
+    def __apportion(self, node_v: Node, default_ancestor: Node, journal):
+        left_sibling = node_v.get_left_sibling()
+        if left_sibling:
+            thread_changes, ancestor_changes = journal
+            node_i_plus = node_v
+            node_o_plus = node_v
+            node_i_minus = left_sibling
+            node_o_minus = node_i_plus.get_left_most_sibling()
+            s_i_plus = node_i_plus.mod
+            s_o_plus = node_o_plus.mod
+            s_i_minus = node_i_minus.mod
+            s_o_minus = node_o_minus.mod
+
+            while self.__next_right(node_i_minus) and self.__next_left(node_i_plus):
+                node_i_minus = self.__next_right(node_i_minus)
+                node_i_plus = self.__next_left(node_i_plus)
+                node_o_minus = self.__next_left(node_o_minus)
+                node_o_plus = self.__next_right(node_o_plus)
+                node_o_plus.ancestor = node_v
+                ancestor_changes.append(node_o_plus)
+                shift = (node_i_minus.prelim + s_i_minus) - (node_i_plus.prelim + s_i_plus) + self.graph.distance \
+                    + (node_i_minus.width + node_i_plus.width) / 2
+                if shift > 0:
+                    ancestor_node = self.__ancestor(node_i_minus, node_v, default_ancestor)
+                    self.__move_subtree(ancestor_node, node_v, shift)
+                    s_i_plus += shift
+                    s_o_plus += shift
+                s_i_minus += node_i_minus.mod
+                s_i_plus += node_i_plus.mod
+                s_o_minus += node_o_minus.mod
+                s_o_plus += node_o_plus.mod
+            if self.__next_right(node_i_minus) and not self.__next_right(node_o_plus):
+                thread_changes.append((node_o_plus, node_o_plus.thread, node_o_plus.mod))
+                node_o_plus.thread = self.__next_right(node_i_minus)
+                node_o_plus.mod += s_i_minus - s_o_plus
+            if self.__next_left(node_i_plus) and not self.__next_left(node_o_minus):
+                thread_changes.append((node_o_minus, node_o_minus.thread, node_o_minus.mod))
+                node_o_minus.thread = self.__next_left(node_i_plus)
+                node_o_minus.mod += s_i_plus - s_o_minus
+                default_ancestor = node_v
+
+        return default_ancestor
+
+    @staticmethod
+    def __next_left(node: Node):
+        if node.children:
+            return node.children[0]
+        else:
+            return node.thread
+
+    @staticmethod
+    def __next_right(node: Node):
+        if node.children:
+            return node.children[-1]
+        else:
+            return node.thread
+
+    @staticmethod
+    def __execute_shifts(node: Node):
+        shift = 0
+        change = 0
+        for node_w in reversed(node.children):
+            node_w.prelim += shift
+            node_w.mod += shift
+            change += node_w.change
+            shift += node_w.shift + change
+
+    @staticmethod
+    def __move_subtree(w_minus: Node, w_plus: Node, shift):
+        subtrees = w_plus.number - w_minus.number
+        w_plus.change -= shift / subtrees
+        w_plus.shift += shift
+        w_minus.change += shift / subtrees
+        w_plus.prelim += shift
+        w_plus.mod += shift
+
+    @staticmethod
+    def __ancestor(node_i_minus: Node, node: Node, default_ancestor: Node):
+        if node_i_minus.ancestor.parent is node.parent and node_i_minus.ancestor is not node:
+            return node_i_minus.ancestor
+        else:
+            return default_ancestor
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from module_graph import CompactTree
+from module_graph import Graph
+from module_instrumentation import instrument_stage
+from .compact_improved_walker_algorithm import CompactImprovedWalkerAlgorithm
+
+# Pool of layout_async, it is created on the first call without an own executor.
+_layout_executor = None
+# Event loops in several threads may call layout_async at once, only one of them may create the pool.
+_layout_executor_lock = threading.Lock()
+
+
+class LayoutOptions:
+    """
+    Class Layout Options
+    Parameters of one layout.
+    """
+
+    def __init__(self, distance=5, label_font=None):
+        """
+        :param distance: float, horizontal distance of neighboring nodes
+        :param label_font: ?str, font of the labels, with a font neighboring nodes are also apart by their labels
+        """
+        self.distance = distance
+        self.label_font = label_font
+
+
+class LayoutResult:
+    """
+    Class Layout Result
+    Coordinates of a laid out tree, independent of the input objects. The nodes are in breadth first order,
+    the root node first, and parent holds the number of the parent of each node, -1 for the root node.
+    """
+
+    def __init__(self, names, x, y, parent):
+        self.names = names
+        self.x = x
+        self.y = y
+        self.parent = parent
+
+    def __len__(self):
+        return len(self.names)
+
+    def get_coordinates(self):
+        """
+        Returns the coordinates by node name.
+        :return: {str: (float, float)}
+        """
+        return dict(zip(self.names, zip(self.x.tolist(), self.y.tolist())))
+
+    def apply_coordinates(self, graph: Graph):
+        """
+        Copies the coordinates to the nodes of the graph with the same names.
+        :param graph: Graph
+        :return: Graph
+        """
+        for name, x, y in zip(self.names, self.x.tolist(), self.y.tolist()):
+            node = graph.get_node_by_name(name)
+            if node:
+                node.x = x
+                node.y = y
+
+        return graph
+
+
+def layout(tree, options=None):
+    """
+    Lays out the tree with the Improved Walker Algorithm and returns its coordinates. The input is only read: the
+    walk runs on a CompactTree of its own with its own algorithm instance, so nothing is shared between two calls
+    and the function can be called from several threads at once, also for the same graph.
+    :param tree: Graph, CompactTree or ([str], [int]), names and parent numbers with -1 for the root node
+    :param options: ?LayoutOptions
+    :return: LayoutResult
+    """
+    options = options or LayoutOptions()
+    with instrument_stage('layout'):
+        compact_tree = CompactTree.from_parent_array(*get_parent_arrays(tree))
+        compact_tree.distance = options.distance
+        if options.label_font:
+            compact_tree.set_label_widths(options.label_font)
+        CompactImprovedWalkerAlgorithm().run(compact_tree)
+
+    return LayoutResult(compact_tree.names, compact_tree.x, compact_tree.y, compact_tree.parent.astype(np.int64))
+
+
+async def layout_async(tree, options=None, executor=None):
+    """
+    Runs layout in a worker process, so the event loop is not blocked and several trees are laid out at once.
+    The tree is sent as names and parent numbers, which are pickled without recursion into the nodes.
+    :param tree: Graph, CompactTree or ([str], [int]), see layout
+    :param options: ?LayoutOptions
+    :param executor: ?Executor, by default a process pool with one process per CPU, which is kept for the next calls
+    :return: LayoutResult
+    """
+    global _layout_executor
+    if executor is None:
+        with _layout_executor_lock:
+            if _layout_executor is None:
+                _layout_executor = ProcessPoolExecutor()
+            executor = _layout_executor
+
+    return await asyncio.get_running_loop().run_in_executor(executor, layout, get_parent_arrays(tree), options)
+
+
+def get_parent_arrays(tree):
+    """
+    Returns the names and parent numbers of the tree. For a graph only the nodes below its root node are used,
+    like in the ImprovedWalkerAlgorithm.
+    :param tree: Graph, CompactTree or ([str], [int])
+    :return: ([str], [int]), names and parent numbers with -1 for the root node
+    """
+    if isinstance(tree, Graph):
+        if tree.root_node is None:
+            raise ValueError('The graph has no root node')
+        tree = CompactTree.from_graph(tree)
+    if isinstance(tree, CompactTree):
+        return tree.names, tree.parent.tolist()
+
+    names, parents = tree
+    return names, parents
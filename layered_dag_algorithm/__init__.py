@@ -0,0 +1 @@
+from .layered_dag_algorithm import *
@@ -0,0 +1,470 @@
+import math
+import time
+from collections import deque
+
+from module_color import Color
+from module_graph import Graph
+from module_graph import Node
+
+
+class LayeredDagAlgorithm:
+    """
+    Class Layered Dag Algorithm
+    Sugiyama style layout for directed graphs, which are not trees. The layout is computed in four phases:
+    cycle removal by reversing the back edges of a depth first search, longest path layering,
+    barycentric crossing minimisation and the coordinate assignment of Brandes and Köpf.
+    Edges spanning more than one layer are split by dummy nodes, which become the bends of the edge.
+    The nodes are numbered internally, the real nodes first and the dummy nodes after them.
+    """
+
+    def __init__(self, node_distance=5, max_sweeps=8):
+        """
+        :param node_distance: float, minimal horizontal distance between two real nodes
+        :param max_sweeps: int, maximal amount of layer sweeps of the crossing minimisation
+        """
+        self.graph = Graph()
+        self.node_distance = node_distance
+        self.max_sweeps = max_sweeps
+        self.node_count = 0
+        self.layer = []
+        self.layers = []
+        self.position = []
+        self.upper = []
+        self.lower = []
+        self.edge_paths = {}
+        self.reversed_edge_count = 0
+        self.crossings = 0
+        self.runtime = 0
+
+    def run(self, node_names, edges, filename: str, scale_x=None, scale_y=None, dpi=None, image_format='png',
+            show=False):
+        """
+        Starts the Layered Dag Algorithm and draws the graph.
+        :param node_names: [str], names of the nodes
+        :param edges: [(str, str)], directed edges
+        :param filename: str, Filename for the to be saved image
+        :param scale_x: ?int, x scale for the image, derived from the layout if missing
+        :param scale_y: ?int, y scale for the image, derived from the layout if missing
+        :param dpi: ?int, resolution of raster images, derived from the layout if missing
+        :param image_format: str, png, svg or pdf
+        :param show: bool, shows the image in a window
+        :return: Graph
+        """
+        self.calculate_layout(node_names, edges)
+        self.graph.draw_graph(filename, scale_x=scale_x, scale_y=scale_y, dpi=dpi, image_format=image_format,
+                              show=show)
+        self.print_statistics(filename)
+
+        return self.graph
+
+    def calculate_layout(self, node_names, edges):
+        """
+        Calculates the coordinates of the nodes without drawing the graph.
+        Self loops and duplicate edges are ignored. The y coordinate is the layer of the node starting with 1.
+        The bends of the long edges are stored in the edge polylines of the graph.
+        :param node_names: [str], names of the nodes
+        :param edges: [(str, str)], directed edges, nodes which are not in node_names are added
+        :return: Graph
+        """
+        start = time.perf_counter()
+        names = list(dict.fromkeys(node_names))
+        node_numbers = {name: number for number, name in enumerate(names)}
+        numbered_edges = []
+        for edge_from, edge_to in dict.fromkeys(edges):
+            for name in (edge_from, edge_to):
+                if name not in node_numbers:
+                    node_numbers[name] = len(names)
+                    names.append(name)
+            if edge_from != edge_to:
+                numbered_edges.append((node_numbers[edge_from], node_numbers[edge_to]))
+
+        self.node_count = len(names)
+        oriented_edges = self.__remove_cycles(numbered_edges)
+        self.__assign_layers(oriented_edges)
+        self.__insert_dummy_nodes(oriented_edges)
+        self.__order_layers()
+        self.__minimize_crossings()
+        x = self.__assign_coordinates()
+        self.__create_graph(names, x)
+        self.runtime = time.perf_counter() - start
+
+        return self.graph
+
+    def print_statistics(self, filename: str):
+        """
+        Prints the size of the layout, the amount of crossings and the runtime.
+        :param filename: str
+        :return: None
+        """
+        print(Color.BOLD + filename + Color.END, 'nodes:', self.node_count, 'edges:', len(self.edge_paths),
+              'reversed edges:', self.reversed_edge_count, 'dummy nodes:', len(self.layer) - self.node_count,
+              'layers:', len(self.layers), 'crossings:', self.crossings,
+              'runtime:', '%.3f' % self.runtime, 'seconds')
+
+    def __remove_cycles(self, numbered_edges):
+        """
+        Reverses the back edges of an iterative depth first search, so the remaining edges form a DAG.
+        :param numbered_edges: [(int, int)]
+        :return: {(int, int): (int, int)}, original edge to edge with the direction used for the layout
+        """
+        successors = [[] for _ in range(self.node_count)]
+        for edge_from, edge_to in numbered_edges:
+            successors[edge_from].append(edge_to)
+
+        # 0: not visited, 1: on the stack of the search, 2: finished
+        state = [0] * self.node_count
+        oriented_edges = {}
+        self.reversed_edge_count = 0
+        for start_node in range(self.node_count):
+            if state[start_node]:
+                continue
+            state[start_node] = 1
+            stack = [(start_node, iter(successors[start_node]))]
+            while stack:
+                node, children = stack[-1]
+                for child in children:
+                    if state[child] == 1:
+                        oriented_edges[(node, child)] = (child, node)
+                        self.reversed_edge_count += 1
+                        continue
+                    oriented_edges[(node, child)] = (node, child)
+                    if state[child] == 0:
+                        state[child] = 1
+                        stack.append((child, iter(successors[child])))
+                        break
+                else:
+                    state[node] = 2
+                    stack.pop()
+
+        return oriented_edges
+
+    def __assign_layers(self, oriented_edges):
+        """
+        Assigns each node the length of the longest path from a source to it.
+        :param oriented_edges: {(int, int): (int, int)}
+        :return: None
+        """
+        successors = [[] for _ in range(self.node_count)]
+        in_degree = [0] * self.node_count
+        for edge_from, edge_to in set(oriented_edges.values()):
+            successors[edge_from].append(edge_to)
+            in_degree[edge_to] += 1
+
+        self.layer = [0] * self.node_count
+        queue = deque(node for node in range(self.node_count) if in_degree[node] == 0)
+        while queue:
+            node = queue.popleft()
+            for child in successors[node]:
+                self.layer[child] = max(self.layer[child], self.layer[node] + 1)
+                in_degree[child] -= 1
+                if in_degree[child] == 0:
+                    queue.append(child)
+
+    def __insert_dummy_nodes(self, oriented_edges):
+        """
+        Splits the edges spanning more than one layer by dummy nodes and fills the neighbor lists.
+        :param oriented_edges: {(int, int): (int, int)}
+        :return: None
+        """
+        self.upper = [[] for _ in range(self.node_count)]
+        self.lower = [[] for _ in range(self.node_count)]
+        paths = {}
+        for edge_from, edge_to in dict.fromkeys(oriented_edges.values()):
+            path = [edge_from]
+            for layer in range(self.layer[edge_from] + 1, self.layer[edge_to]):
+                self.layer.append(layer)
+                self.upper.append([])
+                self.lower.append([])
+                path.append(len(self.layer) - 1)
+            path.append(edge_to)
+            for upper_node, lower_node in zip(path, path[1:]):
+                self.lower[upper_node].append(lower_node)
+                self.upper[lower_node].append(upper_node)
+            paths[(edge_from, edge_to)] = path
+
+        self.edge_paths = {}
+        for edge, oriented_edge in oriented_edges.items():
+            path = paths[oriented_edge]
+            self.edge_paths[edge] = path if edge == oriented_edge else path[::-1]
+
+    def __order_layers(self):
+        """
+        Creates the initial order of the layers by a depth first search from the nodes of the first layer,
+        so connected nodes start close to each other.
+        :return: None
+        """
+        self.layers = [[] for _ in range(max(self.layer, default=-1) + 1)]
+        visited = [False] * len(self.layer)
+        for start_node in sorted(range(len(self.layer)), key=self.layer.__getitem__):
+            if visited[start_node]:
+                continue
+            visited[start_node] = True
+            stack = [start_node]
+            while stack:
+                node = stack.pop()
+                self.layers[self.layer[node]].append(node)
+                for child in reversed(self.lower[node]):
+                    if not visited[child]:
+                        visited[child] = True
+                        stack.append(child)
+
+        self.position = [0] * len(self.layer)
+        for layer in self.layers:
+            self.__update_positions(layer)
+
+    def __update_positions(self, layer):
+        position = self.position
+        for order, node in enumerate(layer):
+            position[node] = order
+
+    def __minimize_crossings(self):
+        """
+        Sorts the layers by the barycenter of their neighbors, alternating downwards and upwards.
+        The order with the fewest crossings is kept. The amount of sweeps is bounded by max_sweeps.
+        :return: None
+        """
+        best_layers = [list(layer) for layer in self.layers]
+        self.crossings = self.__count_crossings()
+        for sweep in range(self.max_sweeps):
+            if self.crossings == 0:
+                break
+            if sweep % 2 == 0:
+                for layer_number in range(1, len(self.layers)):
+                    self.__sort_layer_by_barycenter(self.layers[layer_number], self.upper)
+            else:
+                for layer_number in range(len(self.layers) - 2, -1, -1):
+                    self.__sort_layer_by_barycenter(self.layers[layer_number], self.lower)
+
+            crossings = self.__count_crossings()
+            if crossings < self.crossings:
+                self.crossings = crossings
+                best_layers = [list(layer) for layer in self.layers]
+
+        self.layers = best_layers
+        for layer in self.layers:
+            self.__update_positions(layer)
+
+    def __sort_layer_by_barycenter(self, layer, neighbors):
+        """
+        Sorts the layer by the average position of the neighbors in the fixed layer.
+        Nodes without neighbors keep their position.
+        :param layer: [int]
+        :param neighbors: [[int]], upper or lower neighbors of the nodes
+        :return: None
+        """
+        position = self.position
+        barycenters = {}
+        for node in layer:
+            node_neighbors = neighbors[node]
+            if node_neighbors:
+                barycenters[node] = sum([position[neighbor] for neighbor in node_neighbors]) / len(node_neighbors)
+            else:
+                barycenters[node] = position[node]
+        layer.sort(key=barycenters.__getitem__)
+        self.__update_positions(layer)
+
+    def __count_crossings(self):
+        """
+        Counts the crossings between all adjacent layers with the accumulator tree of Barth, Jünger and Mutzel.
+        :return: int
+        """
+        position = self.position
+        crossings = 0
+        for upper_layer, lower_layer in zip(self.layers, self.layers[1:]):
+            # The edges sorted by the upper and then the lower position, the crossings are the inversions.
+            lower_positions = []
+            for node in upper_layer:
+                lower_positions.extend(sorted([position[child] for child in self.lower[node]]))
+
+            first_leaf = 1
+            while first_leaf < len(lower_layer):
+                first_leaf *= 2
+            tree = [0] * (2 * first_leaf - 1)
+            first_leaf -= 1
+            for lower_position in lower_positions:
+                index = lower_position + first_leaf
+                tree[index] += 1
+                while index > 0:
+                    if index % 2:
+                        crossings += tree[index + 1]
+                    index = (index - 1) // 2
+                    tree[index] += 1
+
+        return crossings
+
+    def __assign_coordinates(self):
+        """
+        Assigns the x coordinates with the algorithm of Brandes and Köpf. Four layouts are computed by
+        aligning the nodes to their upper or lower median neighbors from the left or from the right.
+        They are aligned to the narrowest one and the coordinate of a node is the average of its two median values.
+        :return: [float]
+        """
+        conflicts = self.__find_type_1_conflicts()
+        layouts = []
+        for vertical in ('up', 'down'):
+            layering = self.layers if vertical == 'up' else self.layers[::-1]
+            neighbors = self.upper if vertical == 'up' else self.lower
+            for horizontal in ('left', 'right'):
+                if horizontal == 'right':
+                    layering = [layer[::-1] for layer in layering]
+                root = self.__vertical_alignment(layering, neighbors, conflicts)
+                x = self.__horizontal_compaction(layering, root)
+                if horizontal == 'right':
+                    x = [-value for value in x]
+                layouts.append((horizontal, x))
+
+        if not self.layer:
+            return []
+
+        narrowest = min((x for horizontal, x in layouts), key=lambda x: max(x) - min(x))
+        aligned_layouts = []
+        for horizontal, x in layouts:
+            delta = min(narrowest) - min(x) if horizontal == 'left' else max(narrowest) - max(x)
+            aligned_layouts.append([value + delta for value in x])
+
+        balanced = []
+        for values in zip(*aligned_layouts):
+            values = sorted(values)
+            balanced.append((values[1] + values[2]) / 2)
+        left = min(balanced)
+
+        return [value - left for value in balanced]
+
+    def __find_type_1_conflicts(self):
+        """
+        Finds the edges, which cross an inner segment between two dummy nodes.
+        Inner segments are preferred during the alignment, so long edges are drawn straight.
+        :return: {(int, int)}, pairs of upper and lower node
+        """
+        conflicts = set()
+        position = self.position
+        node_count = self.node_count
+        for upper_layer, layer in zip(self.layers, self.layers[1:]):
+            left_bound = 0
+            scan_position = 0
+            for order, node in enumerate(layer):
+                inner_node = None
+                if node >= node_count:
+                    inner_node = next((upper_node for upper_node in self.upper[node] if upper_node >= node_count),
+                                      None)
+                if inner_node is None and order != len(layer) - 1:
+                    continue
+
+                right_bound = position[inner_node] if inner_node is not None else len(upper_layer)
+                for scan_node in layer[scan_position:order + 1]:
+                    for upper_node in self.upper[scan_node]:
+                        upper_position = position[upper_node]
+                        if (upper_position < left_bound or right_bound < upper_position) \
+                                and not (upper_node >= node_count and scan_node >= node_count):
+                            conflicts.add((upper_node, scan_node))
+                scan_position = order + 1
+                left_bound = right_bound
+
+        return conflicts
+
+    def __vertical_alignment(self, layering, neighbors, conflicts):
+        """
+        Aligns each node with one of its median neighbors in the previous layer of the layering,
+        as long as the alignments do not cross. Aligned nodes form a block with the same x coordinate.
+        :param layering: [[int]]
+        :param neighbors: [[int]], neighbors in the previous layer
+        :param conflicts: {(int, int)}
+        :return: [int], root node of the block of each node
+        """
+        node_total = len(self.layer)
+        root = list(range(node_total))
+        align = list(range(node_total))
+        position = [0] * node_total
+        for layer in layering:
+            for order, node in enumerate(layer):
+                position[node] = order
+
+        for layer in layering:
+            previous_position = -1
+            for node in layer:
+                node_neighbors = neighbors[node]
+                if not node_neighbors:
+                    continue
+                node_neighbors = sorted(node_neighbors, key=position.__getitem__)
+                median = (len(node_neighbors) - 1) / 2
+                for neighbor in node_neighbors[math.floor(median):math.ceil(median) + 1]:
+                    if align[node] == node and previous_position < position[neighbor] \
+                            and (neighbor, node) not in conflicts and (node, neighbor) not in conflicts:
+                        align[neighbor] = node
+                        align[node] = root[node] = root[neighbor]
+                        previous_position = position[neighbor]
+
+        return root
+
+    def __horizontal_compaction(self, layering, root):
+        """
+        Places the blocks as far left as the separation to their left neighbors allows
+        and afterwards moves them right towards their right neighbors, if there is space.
+        :param layering: [[int]]
+        :param root: [int], root node of the block of each node
+        :return: [float]
+        """
+        separations = {}
+        for layer in layering:
+            for left_node, right_node in zip(layer, layer[1:]):
+                block_edge = (root[left_node], root[right_node])
+                separation = (self.__get_node_size(left_node) + self.__get_node_size(right_node)) / 2
+                if separations.get(block_edge, 0) < separation:
+                    separations[block_edge] = separation
+
+        roots = sorted(set(root))
+        in_edges = {block: [] for block in roots}
+        out_edges = {block: [] for block in roots}
+        in_degree = dict.fromkeys(roots, 0)
+        for (left_block, right_block), separation in separations.items():
+            in_edges[right_block].append((left_block, separation))
+            out_edges[left_block].append((right_block, separation))
+            in_degree[right_block] += 1
+
+        order = [block for block in roots if in_degree[block] == 0]
+        for block in order:
+            for right_block, separation in out_edges[block]:
+                in_degree[right_block] -= 1
+                if in_degree[right_block] == 0:
+                    order.append(right_block)
+
+        block_x = {}
+        for block in order:
+            block_x[block] = max([block_x[left_block] + separation for left_block, separation in in_edges[block]],
+                                 default=0)
+        for block in reversed(order):
+            if out_edges[block]:
+                block_x[block] = max(block_x[block], min([block_x[right_block] - separation
+                                                          for right_block, separation in out_edges[block]]))
+
+        return [block_x[root[node]] for node in range(len(self.layer))]
+
+    def __get_node_size(self, node: int):
+        """
+        Dummy nodes only need half the space of real nodes, so parallel edges may run closer together.
+        :param node: int
+        :return: float
+        """
+        return self.node_distance if node < self.node_count else self.node_distance / 2
+
+    def __create_graph(self, names, x):
+        """
+        Creates the graph with the real nodes and the original edges and stores the bends of the edges.
+        :param names: [str]
+        :param x: [float]
+        :return: None
+        """
+        self.graph = Graph()
+        self.graph.distance = self.node_distance
+        for number, name in enumerate(names):
+            node = self.graph.add_node(Node(name))
+            node.x = x[number]
+            node.y = self.layer[number] + 1
+        if self.graph.nodes:
+            self.graph.root_node = self.graph.nodes[self.layers[0][0]]
+
+        self.graph.edges = [(names[edge_from], names[edge_to]) for edge_from, edge_to in self.edge_paths]
+        for (edge_from, edge_to), path in self.edge_paths.items():
+            if len(path) > 2:
+                self.graph.edge_polylines[(names[edge_from], names[edge_to])] = [(x[node], self.layer[node] + 1)
+                                                                                  for node in path]
@@ -1,76 +1,274 @@
 import os
 import sys
 
-from improved_walker_algorithm import *
-from module_parse import *
+from module_benchmark import benchmark_graph_conversion, benchmark_compact_layout, benchmark_sibling_navigation, \
+    benchmark_render_batch, benchmark_incremental_layout, benchmark_stages, benchmark_tree_file, \
+    benchmark_import_time
+from module_batch import layout_graphml_file, layout_graphml_file_layered, layout_newick_file, run_batch, \
+    tile_newick_file, layout_newick_forest, convert_to_tree_file, layout_newick_phylogram
+from module_cli import COMMANDS, run_command_line
 from module_color import Color
+from module_graph import EXPORT_FORMATS, FOREST_ARRANGEMENTS, FOREST_EXPORT_FORMATS, PHYLOGRAM_EXPORT_FORMATS, \
+    PHYLOGRAM_PROJECTIONS
+from module_instrumentation import Instrumentation, PrintHook, ProfileCapture
 
 graph_directory = 'directed_graph_examples'
 
 
 def parse_parameters():
     if len(sys.argv) > 1:
+        jobs = max(1, int(parse_value_parameter('-j', 1, 'the amount of jobs - e.g. -j 4', str.isdigit)))
+        dpi = parse_value_parameter('-dpi', None, 'the resolution - e.g. -dpi 150', str.isdigit)
+        output_options = {
+            'dpi': None if dpi is None else int(dpi),
+            'image_format': parse_value_parameter('-format', 'png', 'one of png, svg or pdf - e.g. -format svg',
+                                                  lambda value: value in ('png', 'svg', 'pdf')),
+            'export_format': parse_value_parameter('-export', None,
+                                                   'one of svg, json, ndjson or npz - e.g. -export json',
+                                                   lambda value: value in EXPORT_FORMATS),
+            'use_cache': '--no-cache' not in sys.argv,
+            'level_of_detail': '--lod' in sys.argv,
+            'label_spacing': '--no-label-spacing' not in sys.argv
+        }
+        max_zoom = parse_value_parameter('-zoom', None, 'the highest zoom level of the tiles - e.g. -zoom 6',
+                                         str.isdigit)
+        max_zoom = None if max_zoom is None else int(max_zoom)
+        arrangement = parse_value_parameter('-pack', 'row', 'one of row or grid - e.g. -pack grid',
+                                            lambda value: value in FOREST_ARRANGEMENTS)
+        columns = parse_value_parameter('-columns', None, 'the amount of grid columns - e.g. -columns 10',
+                                        str.isdigit)
+        columns = None if columns is None else int(columns)
+        projection = parse_value_parameter('-projection', 'rectangular',
+                                           'one of rectangular or radial - e.g. -projection radial',
+                                           lambda value: value in PHYLOGRAM_PROJECTIONS)
         for argument in sys.argv:
             if '-' not in argument:
                 continue
 
             if argument == "-wn":
-                parse_and_draw_all_newick_files_with_improved_walker_algorithm('Phylogeny')
-                parse_and_draw_all_newick_files_with_improved_walker_algorithm('Phylogeny-Binaer')
+                parse_and_draw_all_newick_files_with_improved_walker_algorithm('Phylogeny', jobs, output_options)
+                parse_and_draw_all_newick_files_with_improved_walker_algorithm('Phylogeny-Binaer', jobs,
+                                                                               output_options)
+            if argument == '-forest':
+                if output_options['export_format'] not in (None,) + FOREST_EXPORT_FORMATS:
+                    print('The forest mode only exports', ' or '.join(FOREST_EXPORT_FORMATS))
+                    exit(1)
+                layout_all_newick_forests('Phylogeny', jobs, output_options, arrangement, columns)
+                layout_all_newick_forests('Phylogeny-Binaer', jobs, output_options, arrangement, columns)
+            if argument == '-phylogram':
+                if output_options['export_format'] not in (None,) + PHYLOGRAM_EXPORT_FORMATS:
+                    print('The phylogram mode only exports', ' or '.join(PHYLOGRAM_EXPORT_FORMATS))
+                    exit(1)
+                layout_all_newick_phylograms('Phylogeny', jobs, output_options, projection)
+                layout_all_newick_phylograms('Phylogeny-Binaer', jobs, output_options, projection)
+            if argument == '-tiles':
+                tile_all_newick_files('Phylogeny', jobs, output_options, max_zoom)
+                tile_all_newick_files('Phylogeny-Binaer', jobs, output_options, max_zoom)
+            if argument == '-convert':
+                convert_all_files_to_tree_files(('Phylogeny', 'Phylogeny-Binaer', 'graphml'), jobs)
             if argument == '-wg':
-                parse_and_draw_all_graphml_files_with_improved_walter_algorithm('graphml')
+                parse_and_draw_all_graphml_files_with_improved_walter_algorithm('graphml', jobs, output_options)
+            if argument == '-lg':
+                parse_and_draw_all_graphml_files_with_layered_dag_algorithm('graphml', jobs, output_options)
+            if argument == '-bc':
+                benchmark_graph_conversion()
+            if argument == '-bl':
+                benchmark_compact_layout()
+            if argument == '-bs':
+                benchmark_sibling_navigation()
+            if argument == '-br':
+                benchmark_render_batch()
+            if argument == '-bi':
+                benchmark_incremental_layout()
+            if argument == '-bp':
+                benchmark_stages()
+            if argument == '-bt':
+                benchmark_tree_file()
+            if argument == '-bimport':
+                benchmark_import_time()
 
     else:
         print('No Parameter specified - Don\'t know what to do!')
         exit(1)
 
 
-def parse_and_draw_all_newick_files_with_improved_walker_algorithm(directory: str):
+def parse_value_parameter(parameter: str, default, description: str, is_valid):
+    """
+    Reads the value following the parameter, e.g. '-j 4'. Without the parameter the default is returned.
+    :param parameter: str, e.g. '-j'
+    :param default: value if the parameter is missing
+    :param description: str, description of the expected value for the error message
+    :param is_valid: function, which checks the value string
+    :return: str or default
+    """
+    if parameter not in sys.argv:
+        return default
+
+    value_position = sys.argv.index(parameter) + 1
+    if value_position >= len(sys.argv) or not is_valid(sys.argv[value_position]):
+        print('The parameter', parameter, 'needs', description)
+        exit(1)
+
+    return sys.argv[value_position]
+
+
+def parse_and_draw_all_newick_files_with_improved_walker_algorithm(directory: str, jobs=1, output_options=None):
     """
     Parses and draws all newick files from the examples with the implemented Improved Walker Algorithm.
     :param directory: str, directory for the newick files
-    :return: None
+    :param jobs: int, amount of worker processes
+    :param output_options: ?dict, dpi, image_format, export_format, use_cache, level_of_detail and label_spacing,
+        see layout_newick_file
+    :return: [BatchResult]
     """
     print(Color.UNDERLINE + 'Parsing Files In', directory + ':', Color.END)
-    improved_walker_algorithm_object = ImprovedWalkerAlgorithm()
-    for filename in os.listdir(os.path.join(graph_directory, directory)):
-        print(Color.BOLD + os.path.join(graph_directory, directory, filename) + Color.END)
-        current_newick_graph = parse_newick_file(os.path.join(graph_directory, directory, filename))
-        scale_x = 20
-        scale_y = 20
-        if 'eboVir' in filename:
-            scale_x = 80
-            scale_y = 40
-        elif '7way' in filename:
-            scale_x = 5
-            scale_y = 10
-        elif 'hg38.100way' in filename or 'phyliptree' in filename:
-            scale_x = 60
-        elif 'hg38.100way.commonNames' in filename or 'hhg38.100way.scientificNames' in filename:
-            scale_x = 100
-        elif 'ce11.26way.commonNames' in filename or 'ce11.26way.scientificNames' in filename:
-            scale_x = 40
-        improved_walker_algorithm_object.run(current_newick_graph,
-                                             filename=os.path.join(graph_directory, directory, filename),
-                                             scale_x=scale_x,
-                                             scale_y=scale_y)
-
-
-def parse_and_draw_all_graphml_files_with_improved_walter_algorithm(directory: str):
+    tasks = []
+    for filename in sorted(os.listdir(os.path.join(graph_directory, directory))):
+        tasks.append((layout_newick_file, os.path.join(graph_directory, directory, filename),
+                      dict(output_options or {})))
+
+    return run_batch(tasks, jobs=jobs)
+
+
+def layout_all_newick_forests(directory: str, jobs=1, output_options=None, arrangement='row', columns=None):
+    """
+    Lays out all trees of each newick file from the examples together and packs them into one image per file.
+    :param directory: str, directory for the newick files
+    :param jobs: int, amount of worker processes
+    :param output_options: ?dict, dpi, image_format, export_format and level_of_detail, see layout_newick_forest
+    :param arrangement: str, row or grid
+    :param columns: ?int, amount of grid columns
+    :return: [BatchResult]
+    """
+    print(Color.UNDERLINE + 'Parsing Forests In', directory + ':', Color.END)
+    options = {key: value for key, value in (output_options or {}).items()
+               if key not in ('use_cache', 'label_spacing')}
+    tasks = []
+    for filename in sorted(os.listdir(os.path.join(graph_directory, directory))):
+        tasks.append((layout_newick_forest, os.path.join(graph_directory, directory, filename),
+                      dict(options, arrangement=arrangement, columns=columns)))
+
+    return run_batch(tasks, jobs=jobs)
+
+
+def layout_all_newick_phylograms(directory: str, jobs=1, output_options=None, projection='rectangular'):
+    """
+    Lays out the first tree of each newick file from the examples and draws it with its branch lengths.
+    :param directory: str, directory for the newick files
+    :param jobs: int, amount of worker processes
+    :param output_options: ?dict, dpi, image_format, export_format, level_of_detail and label_spacing,
+        see layout_newick_phylogram
+    :param projection: str, rectangular or radial
+    :return: [BatchResult]
+    """
+    print(Color.UNDERLINE + 'Parsing Phylograms In', directory + ':', Color.END)
+    options = {key: value for key, value in (output_options or {}).items() if key != 'use_cache'}
+    tasks = []
+    for filename in sorted(os.listdir(os.path.join(graph_directory, directory))):
+        tasks.append((layout_newick_phylogram, os.path.join(graph_directory, directory, filename),
+                      dict(options, projection=projection)))
+
+    return run_batch(tasks, jobs=jobs)
+
+
+def convert_all_files_to_tree_files(directories, jobs=1):
+    """
+    Converts all newick and graphml files from the examples into tree files with their layout.
+    :param directories: [str], directories for the newick and graphml files
+    :param jobs: int, amount of worker processes
+    :return: [BatchResult]
+    """
+    print(Color.UNDERLINE + 'Converting Files In', ', '.join(directories) + ':', Color.END)
+    tasks = []
+    for directory in directories:
+        for filename in sorted(os.listdir(os.path.join(graph_directory, directory))):
+            tasks.append((convert_to_tree_file, os.path.join(graph_directory, directory, filename),
+                          {'with_layout': True}))
+
+    return run_batch(tasks, jobs=jobs)
+
+
+def tile_all_newick_files(directory: str, jobs=1, output_options=None, max_zoom=None):
+    """
+    Renders all newick files from the examples as tile pyramids. The files are handled one after another,
+    the tiles of each file are rendered by the worker processes.
+    :param directory: str, directory for the newick files
+    :param jobs: int, amount of worker processes
+    :param output_options: ?dict, image_format, use_cache and label_spacing, see tile_newick_file
+    :param max_zoom: ?int, highest rendered zoom level
+    :return: [BatchResult]
+    """
+    print(Color.UNDERLINE + 'Tiling Files In', directory + ':', Color.END)
+    options = {key: value for key, value in (output_options or {}).items()
+               if key in ('image_format', 'use_cache', 'label_spacing')}
+    tasks = []
+    for filename in sorted(os.listdir(os.path.join(graph_directory, directory))):
+        tasks.append((tile_newick_file, os.path.join(graph_directory, directory, filename),
+                      dict(options, jobs=jobs, max_zoom=max_zoom)))
+
+    return run_batch(tasks, jobs=1)
+
+
+def parse_and_draw_all_graphml_files_with_improved_walter_algorithm(directory: str, jobs=1, output_options=None):
     """
     Parses and draws all graphml files from the examples with the implemented Improved Walker Algorithm.
     (The current examples are not suitable for the Improved Walker Algorithm.
     :param directory: str, directory for the graphml files
-    :return: None
+    :param jobs: int, amount of worker processes
+    :param output_options: ?dict, dpi, image_format, export_format, use_cache, level_of_detail and label_spacing,
+        see layout_newick_file
+    :return: [BatchResult]
     """
     print(Color.UNDERLINE + 'Parsing Files In', directory, ':' + Color.END)
-    improved_walker_algorithm_object = ImprovedWalkerAlgorithm()
-    for filename in os.listdir(os.path.join(graph_directory, directory)):
-        print(Color.BOLD + os.path.join(graph_directory, directory, filename) + Color.END)
-        current_graphml_graph = parse_graphml_file_newick_format(os.path.join(graph_directory, directory, filename))
-        improved_walker_algorithm_object.run(current_graphml_graph,
-                                             filename=os.path.join(graph_directory, directory, filename))
+    tasks = []
+    for filename in sorted(os.listdir(os.path.join(graph_directory, directory))):
+        tasks.append((layout_graphml_file, os.path.join(graph_directory, directory, filename),
+                      dict(output_options or {})))
+
+    return run_batch(tasks, jobs=jobs)
+
+
+def parse_and_draw_all_graphml_files_with_layered_dag_algorithm(directory: str, jobs=1, output_options=None):
+    """
+    Parses and draws all graphml files from the examples with the Layered Dag Algorithm.
+    The layout cache and the level of detail renderer are not used, because the layouts are not trees.
+    :param directory: str, directory for the graphml files
+    :param jobs: int, amount of worker processes
+    :param output_options: ?dict, dpi, image_format and export_format, see layout_graphml_file_layered
+    :return: [BatchResult]
+    """
+    print(Color.UNDERLINE + 'Parsing Files In', directory, ':' + Color.END)
+    options = {key: value for key, value in (output_options or {}).items()
+               if key not in ('use_cache', 'level_of_detail', 'label_spacing')}
+    tasks = []
+    for filename in sorted(os.listdir(os.path.join(graph_directory, directory))):
+        tasks.append((layout_graphml_file_layered, os.path.join(graph_directory, directory, filename),
+                      dict(options)))
+
+    return run_batch(tasks, jobs=jobs)
+
+
+def parse_parameters_with_instrumentation():
+    """
+    Runs parse_parameters with the instrumentation options. '--instrument' prints the runtime and the peak
+    memory of each stage and the counters of the algorithms, '--profile' records the run with cProfile and
+    '--trace-memory' with tracemalloc. With '-j' greater than 1 only the main process is instrumented.
+    :return: None
+    """
+    profile = '--profile' in sys.argv
+    trace_memory = '--trace-memory' in sys.argv
+    if not (profile or trace_memory or '--instrument' in sys.argv):
+        parse_parameters()
+        return
+
+    with ProfileCapture(name='main', profile=profile, trace_memory=trace_memory), \
+            Instrumentation([PrintHook()]).activate():
+        parse_parameters()
 
 
 if __name__ == '__main__':
-    parse_parameters()
+    # The subcommands use argparse, the flags without subcommand are read by parse_parameters.
+    if any(argument in COMMANDS + ('-h', '--help') for argument in sys.argv[1:]):
+        run_command_line()
+    else:
+        parse_parameters_with_instrumentation()
@@ -0,0 +1 @@
+from .batch_layout import *
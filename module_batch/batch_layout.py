@@ -0,0 +1,399 @@
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+
+from improved_walker_algorithm import CompactImprovedWalkerAlgorithm
+from improved_walker_algorithm import ImprovedWalkerAlgorithm
+from layered_dag_algorithm import LayeredDagAlgorithm
+from module_cache import LayoutCache
+from module_color import Color
+from module_graph import Graph
+from module_graph import LABEL_UNITS_PER_EM
+from module_graph import Phylogram
+from module_graph import TREE_FILE_EXTENSION
+from module_graph import TreeFile
+from module_instrumentation import instrument_stage
+from module_parse import parse_graphml_file_edge_list
+from module_parse import parse_graphml_file_to_compact_tree
+from module_parse import parse_graphml_file_to_graph
+from module_parse import parse_newick_file_to_compact_tree
+from module_parse import parse_newick_file_to_forest
+from module_parse import parse_newick_file_to_graph
+from module_render import GraphRenderer
+from module_render import LevelOfDetailRenderer
+from module_render import export_tile_pyramid
+
+
+class BatchResult:
+    """
+    Class Batch Result
+    Runtime and error of one file of a batch.
+    """
+
+    def __init__(self, filename: str, seconds: float, error=None):
+        self.filename = filename
+        self.seconds = seconds
+        self.error = error
+
+
+def layout_newick_file(filename: str, scale_x=None, scale_y=None, dpi=None, image_format='png',
+                       export_format=None, use_cache=True, level_of_detail=False, label_spacing=True):
+    """
+    Parses, lays out and draws one newick file with its own Improved Walker Algorithm instance.
+    With an export format only the coordinates are written and nothing is drawn.
+    :param filename: str; full path of the newick file
+    :param scale_x: ?int, x scale for the image, derived from the layout if missing
+    :param scale_y: ?int, y scale for the image, derived from the layout if missing
+    :param dpi: ?int, resolution of raster images, derived from the layout if missing
+    :param image_format: str, png, svg or pdf
+    :param export_format: ?str, svg, json, ndjson or npz
+    :param use_cache: bool, reuses the layout of an unchanged file from the layout cache
+    :param level_of_detail: bool, draws with the LevelOfDetailRenderer
+    :param label_spacing: bool, keeps the labels of neighboring nodes apart
+    :return: None
+    """
+    graph = load_or_calculate_layout(filename, parse_newick_file_to_graph, use_cache, label_spacing)
+    write_layout_output(graph, filename, scale_x, scale_y, dpi, image_format, export_format, level_of_detail)
+
+
+def layout_graphml_file(filename: str, dpi=None, image_format='png', export_format=None, use_cache=True,
+                        level_of_detail=False, label_spacing=True):
+    """
+    Parses, lays out and draws one graphml file with its own Improved Walker Algorithm instance.
+    With an export format only the coordinates are written and nothing is drawn.
+    :param filename: str; full path of the graphml file
+    :param dpi: int, resolution of raster images
+    :param image_format: str, png, svg or pdf
+    :param export_format: ?str, svg, json, ndjson or npz
+    :param use_cache: bool, reuses the layout of an unchanged file from the layout cache
+    :param level_of_detail: bool, draws with the LevelOfDetailRenderer
+    :param label_spacing: bool, keeps the labels of neighboring nodes apart
+    :return: None
+    """
+    graph = load_or_calculate_layout(filename, parse_graphml_file_to_graph, use_cache, label_spacing)
+    write_layout_output(graph, filename, None, None, dpi, image_format, export_format, level_of_detail)
+
+
+def layout_file(filename: str, dpi=None, image_format='png', export_format=None, use_cache=True,
+                level_of_detail=False, label_spacing=True):
+    """
+    Lays out and draws one newick, graphml or tree file, the format is chosen by the extension of the file:
+    .graphml is read as graphml, .gvt as tree file and all other files as newick.
+    :param filename: str; full path of the file
+    :param dpi: ?int, resolution of raster images, derived from the layout if missing
+    :param image_format: str, png, svg or pdf
+    :param export_format: ?str, svg, json, ndjson or npz
+    :param use_cache: bool, reuses the layout of an unchanged newick or graphml file from the layout cache
+    :param level_of_detail: bool, draws with the LevelOfDetailRenderer
+    :param label_spacing: bool, keeps the labels of neighboring nodes apart
+    :return: None
+    """
+    if filename.endswith(TREE_FILE_EXTENSION):
+        layout_tree_file(filename, dpi=dpi, image_format=image_format, export_format=export_format,
+                         level_of_detail=level_of_detail, label_spacing=label_spacing)
+    elif filename.endswith('.graphml'):
+        layout_graphml_file(filename, dpi, image_format, export_format, use_cache, level_of_detail, label_spacing)
+    else:
+        layout_newick_file(filename, dpi=dpi, image_format=image_format, export_format=export_format,
+                           use_cache=use_cache, level_of_detail=level_of_detail, label_spacing=label_spacing)
+
+
+def layout_graphml_file_layered(filename: str, dpi=None, image_format='png', export_format=None, max_sweeps=8):
+    """
+    Parses, lays out and draws one graphml file with its own Layered Dag Algorithm instance
+    and prints the amount of crossings and the runtime of the layout.
+    With an export format only the coordinates are written and nothing is drawn.
+    :param filename: str; full path of the graphml file
+    :param dpi: int, resolution of raster images
+    :param image_format: str, png, svg or pdf
+    :param export_format: ?str, svg, json, ndjson or npz
+    :param max_sweeps: int, maximal amount of layer sweeps of the crossing minimisation
+    :return: None
+    """
+    layered_dag_algorithm = LayeredDagAlgorithm(max_sweeps=max_sweeps)
+    graph = layered_dag_algorithm.calculate_layout(*parse_graphml_file_edge_list(filename))
+    layered_dag_algorithm.print_statistics(filename)
+    write_layout_output(graph, filename, None, None, dpi, image_format, export_format)
+
+
+def layout_newick_forest(filename: str, arrangement='row', columns=None, dpi=None, image_format='png',
+                         export_format=None, level_of_detail=False):
+    """
+    Parses all trees of one newick file, lays them out together in one run of the Compact Improved Walker Algorithm
+    and packs them side by side or in a grid into one image or coordinate file named like the file with '_forest'.
+    :param filename: str; full path of the newick file
+    :param arrangement: str, row or grid
+    :param columns: ?int, amount of columns of the grid
+    :param dpi: ?int, resolution of raster images, derived from the layout if missing
+    :param image_format: str, png, svg or pdf
+    :param export_format: ?str, svg or npz
+    :param level_of_detail: bool, draws with the LevelOfDetailRenderer
+    :return: CompactForest
+    """
+    forest = parse_newick_file_to_forest(filename)
+    with instrument_stage('layout'):
+        CompactImprovedWalkerAlgorithm().run(forest.tree)
+        forest.pack(arrangement, columns)
+    print(Color.BOLD + 'Forest:' + Color.END, filename, 'Trees:', forest.tree_count, 'Nodes:', len(forest))
+    write_layout_output(forest, filename + '_forest', None, None, dpi, image_format, export_format, level_of_detail)
+    return forest
+
+
+def layout_newick_phylogram(filename: str, projection='rectangular', scale_x=None, scale_y=None, dpi=None,
+                            image_format='png', export_format=None, level_of_detail=False, label_spacing=True):
+    """
+    Parses the first tree of one newick file with its branch lengths, lays it out with the Compact Improved Walker
+    Algorithm and draws it as phylogram into one image or coordinate file named like the file with '_phylogram',
+    or with '_radial_phylogram' for the radial projection.
+    :param filename: str; full path of the newick file
+    :param projection: str, rectangular or radial
+    :param scale_x: ?int, x scale for the image, derived from the layout if missing
+    :param scale_y: ?int, y scale for the image, derived from the layout if missing
+    :param dpi: ?int, resolution of raster images, derived from the layout if missing
+    :param image_format: str, png, svg or pdf
+    :param export_format: ?str, svg or npz
+    :param level_of_detail: bool, draws a rectangular phylogram with the LevelOfDetailRenderer
+    :param label_spacing: bool, keeps the labels of neighboring nodes apart
+    :return: Phylogram
+    """
+    tree = parse_newick_file_to_compact_tree(filename)
+    with instrument_stage('layout'):
+        if label_spacing:
+            tree.set_label_widths()
+        CompactImprovedWalkerAlgorithm().run(tree)
+        phylogram = Phylogram(tree, projection)
+    suffix = '_phylogram' if projection == 'rectangular' else '_' + projection + '_phylogram'
+    write_layout_output(phylogram, filename + suffix, scale_x, scale_y, dpi, image_format, export_format,
+                        level_of_detail and projection == 'rectangular')
+    return phylogram
+
+
+def tile_newick_file(filename: str, image_format='png', jobs=1, max_zoom=None, use_cache=True, label_spacing=True):
+    """
+    Parses and lays out one newick file and renders it as tile pyramid into the output directory.
+    Only the tiles with changed content are rendered again.
+    :param filename: str; full path of the newick file
+    :param image_format: str, png or svg
+    :param jobs: int, amount of worker processes for the tiles
+    :param max_zoom: ?int, highest rendered zoom level
+    :param use_cache: bool, reuses the layout of an unchanged file from the layout cache
+    :param label_spacing: bool, keeps the labels of neighboring nodes apart
+    :return: (int, int, int), amount of tiles, rendered tiles and removed tiles
+    """
+    graph = load_or_calculate_layout(filename, parse_newick_file_to_graph, use_cache, label_spacing)
+    return export_tile_pyramid(graph, filename + '_tiles', image_format=image_format, jobs=jobs, max_zoom=max_zoom)
+
+
+def convert_to_tree_file(filename: str, with_layout=False, label_spacing=True):
+    """
+    Parses a newick or graphml file into a tree file in the output directory, which is named like the file
+    with the extension .gvt. Files ending with .graphml are read as graphml, all others as newick.
+    :param filename: str; full path of the newick or graphml file
+    :param with_layout: bool, also lays out the tree and stores its coordinates
+    :param label_spacing: bool, keeps the labels of neighboring nodes apart in the stored layout
+    :return: str, path of the tree file
+    """
+    if filename.endswith('.graphml'):
+        tree = parse_graphml_file_to_compact_tree(filename)
+    else:
+        tree = parse_newick_file_to_compact_tree(filename)
+    if with_layout:
+        with instrument_stage('layout'):
+            if label_spacing:
+                tree.set_label_widths()
+            CompactImprovedWalkerAlgorithm().run(tree)
+
+    path = os.path.join('output', filename + TREE_FILE_EXTENSION)
+    Graph.create_missing_dir(os.path.dirname(path))
+    with instrument_stage('export'):
+        TreeFile.write(path, tree, with_layout)
+    print(Color.BOLD + 'Tree File:' + Color.END, path, 'Nodes:', len(tree))
+    return path
+
+
+def load_tree_file_layout(filename: str, distance=None, label_spacing=True):
+    """
+    Opens a tree file and returns its tree with coordinates. The stored layout is used if the file has one with
+    the same distance and label spacing, otherwise the tree is laid out with its own Compact Improved Walker
+    Algorithm instance.
+    :param filename: str; full path of the tree file
+    :param distance: ?float, distance of neighboring nodes, by default the distance stored in the file
+    :param label_spacing: bool, keeps the labels of neighboring nodes apart
+    :return: CompactTree
+    """
+    tree_file = TreeFile(filename)
+    tree = tree_file.get_tree()
+    label_units_per_em = LABEL_UNITS_PER_EM if label_spacing else None
+    if not tree_file.has_layout or distance not in (None, tree.distance) \
+            or tree_file.label_units_per_em != label_units_per_em:
+        tree.distance = tree.distance if distance is None else distance
+        with instrument_stage('layout'):
+            if label_spacing:
+                tree.set_label_widths()
+            CompactImprovedWalkerAlgorithm().run(tree)
+
+    return tree
+
+
+def layout_tree_file(filename: str, scale_x=None, scale_y=None, dpi=None, image_format='png', export_format=None,
+                     level_of_detail=False, label_spacing=True):
+    """
+    Draws the tree of a tree file, which is laid out only if the file has no layout.
+    The output is named like the tree file without its extension, relative to the output directory if the tree file
+    lies in it.
+    :param filename: str; full path of the tree file
+    :param scale_x: ?int, x scale for the image, derived from the layout if missing
+    :param scale_y: ?int, y scale for the image, derived from the layout if missing
+    :param dpi: ?int, resolution of raster images, derived from the layout if missing
+    :param image_format: str, png, svg or pdf
+    :param export_format: ?str, svg, json, ndjson or npz
+    :param level_of_detail: bool, draws with the LevelOfDetailRenderer
+    :param label_spacing: bool, keeps the labels of neighboring nodes apart
+    :return: None
+    """
+    graph = load_tree_file_layout(filename, label_spacing=label_spacing).to_graph()
+    output_name = os.path.splitext(filename)[0]
+    if not os.path.relpath(output_name, 'output').startswith(os.pardir):
+        output_name = os.path.relpath(output_name, 'output')
+    write_layout_output(graph, output_name, scale_x, scale_y, dpi, image_format, export_format,
+                        level_of_detail)
+
+
+def load_or_calculate_layout(filename: str, parse_function, use_cache: bool, label_spacing=True):
+    """
+    Returns the layout of the file from the layout cache. If it is not cached, the file is parsed and laid out
+    with its own Improved Walker Algorithm instance and the layout is stored in the cache.
+    :param filename: str; full path of the input file
+    :param parse_function: function, which parses the file into a graph
+    :param use_cache: bool
+    :param label_spacing: bool, keeps the labels of neighboring nodes apart
+    :return: Graph
+    """
+    if not use_cache:
+        return calculate_layout(parse_function(filename), label_spacing)
+
+    layout_cache = LayoutCache()
+    key = layout_cache.get_key(filename, parser=parse_function.__name__, distance=Graph().distance,
+                               label_units_per_em=LABEL_UNITS_PER_EM if label_spacing else None)
+    graph = layout_cache.load(key)
+    if graph is None:
+        graph = calculate_layout(parse_function(filename), label_spacing)
+        layout_cache.store(key, graph)
+
+    return graph
+
+
+def calculate_layout(graph: Graph, label_spacing=True):
+    """
+    Lays out the graph with its own Improved Walker Algorithm instance.
+    With label spacing the widths of the labels are estimated first, so the labels of neighboring nodes do not
+    overlap in the image without scaling it up.
+    :param graph: Graph
+    :param label_spacing: bool
+    :return: Graph
+    """
+    if label_spacing:
+        graph.set_label_widths()
+    return ImprovedWalkerAlgorithm().calculate_layout(graph)
+
+
+def write_layout_output(graph: Graph, filename: str, scale_x, scale_y, dpi, image_format: str, export_format,
+                        level_of_detail=False):
+    """
+    Draws the graph or exports its coordinates if an export format is given.
+    The level of detail renderer collapses subtrees, which are too narrow to be seen in the image.
+    :param graph: Graph, CompactForest or Phylogram
+    :param filename: str; full path of the input file
+    :param scale_x: ?int, x scale for the image, derived from the layout if missing
+    :param scale_y: ?int, y scale for the image, derived from the layout if missing
+    :param dpi: ?int, resolution of raster images, derived from the layout if missing
+    :param image_format: str, png, svg or pdf
+    :param export_format: ?str, svg, json, ndjson or npz
+    :param level_of_detail: bool, draws with the LevelOfDetailRenderer
+    :return: None
+    """
+    if export_format:
+        graph.export_layout(filename, export_format)
+    elif level_of_detail:
+        # Like draw_graph the level of detail renderer is measured as the draw stage.
+        with instrument_stage('draw'):
+            figure_size = GraphRenderer.get_figure_size(graph, scale_x, scale_y, dpi)
+            width, height = figure_size.get_pixels()
+            renderer = LevelOfDetailRenderer(graph, dpi=figure_size.dpi, image_format=image_format,
+                                             font_size=figure_size.font_size, with_labels=figure_size.with_labels)
+            renderer.render_overview(filename, width=width, height=height)
+    else:
+        graph.draw_graph(filename, scale_x=scale_x, scale_y=scale_y, dpi=dpi, image_format=image_format)
+
+
+def run_layout_task(task):
+    """
+    Runs one task of a batch. Exceptions are caught, so a failing file does not abort the batch.
+    :param task: (function, str, dict), layout function, filename and keyword arguments
+    :return: BatchResult
+    """
+    function, filename, keyword_arguments = task
+    start = time.perf_counter()
+    try:
+        function(filename, **keyword_arguments)
+    except Exception:
+        return BatchResult(filename, time.perf_counter() - start, traceback.format_exc())
+
+    return BatchResult(filename, time.perf_counter() - start)
+
+
+def run_batch(tasks, jobs=1):
+    """
+    Runs the tasks in a pool of worker processes. Each task creates its own algorithm instance.
+    With one job the tasks run in the current process.
+    :param tasks: [(function, str, dict)], layout function, filename and keyword arguments
+    :param jobs: int, amount of worker processes
+    :return: [BatchResult]
+    """
+    start = time.perf_counter()
+    results = []
+    if jobs <= 1:
+        for task in tasks:
+            results.append(run_layout_task(task))
+            print_batch_result(results[-1])
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(run_layout_task, task) for task in tasks]
+            for future in as_completed(futures):
+                results.append(future.result())
+                print_batch_result(results[-1])
+
+    print_batch_summary(results, time.perf_counter() - start, jobs)
+    return results
+
+
+def print_batch_result(result: BatchResult):
+    """
+    Prints the runtime of one file of a batch and the error if there is one.
+    :param result: BatchResult
+    :return: None
+    """
+    if result.error:
+        print(Color.RED + 'Failed', result.filename, round(result.seconds, 3), 's' + Color.END)
+        print(result.error)
+    else:
+        print(Color.GREEN + 'Done', result.filename, round(result.seconds, 3), 's' + Color.END)
+
+
+def print_batch_summary(results, wall_seconds: float, jobs: int):
+    """
+    Prints the amount of done and failed files, the summed runtime of the files and the wall time.
+    :param results: [BatchResult]
+    :param wall_seconds: float
+    :param jobs: int
+    :return: None
+    """
+    failed_results = [result for result in results if result.error]
+    print(Color.BOLD + 'Batch Summary:' + Color.END,
+          len(results) - len(failed_results), 'done,', len(failed_results), 'failed,',
+          'file seconds:', round(sum(result.seconds for result in results), 3),
+          'wall seconds:', round(wall_seconds, 3), 'jobs:', jobs)
+    for result in failed_results:
+        print(Color.RED + result.filename + Color.END)
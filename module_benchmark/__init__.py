@@ -0,0 +1,9 @@
+from .tree_generators import *
+from .graph_conversion_benchmark import *
+from .compact_layout_benchmark import *
+from .sibling_navigation_benchmark import *
+from .render_benchmark import *
+from .incremental_layout_benchmark import *
+from .stage_benchmark import *
+from .tree_file_benchmark import *
+from .import_benchmark import *
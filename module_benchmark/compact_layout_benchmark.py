@@ -0,0 +1,60 @@
+import gc
+import time
+import tracemalloc
+
+from improved_walker_algorithm import CompactImprovedWalkerAlgorithm
+from improved_walker_algorithm import ImprovedWalkerAlgorithm
+from module_color import Color
+from module_graph import CompactTree
+from module_graph import Graph
+from .tree_generators import random_recursive_nx_tree
+
+
+def benchmark_compact_layout(sizes=(1000, 10000, 100000, 1000000), seed=0):
+    """
+    Compares the memory of the node graph with the compact tree and the runtime of both layout variants
+    for random recursive trees of the given sizes. The names are shared and not counted for both variants.
+    :param sizes: [int], node counts of the benchmarked trees
+    :param seed: int, seed for the tree generator
+    :return: [dict], measurements per size
+    """
+    print(Color.UNDERLINE + 'Benchmark Compact Layout:' + Color.END)
+    results = []
+    for size in sizes:
+        nx_graph = random_recursive_nx_tree(size, seed=seed)
+
+        graph, graph_bytes = _measure_memory(Graph.create_graph_from_nx, nx_graph)
+        tree, tree_bytes = _measure_memory(CompactTree.from_graph, graph)
+        del nx_graph
+
+        node_seconds = _measure_time(ImprovedWalkerAlgorithm().calculate_layout, graph)
+        compact_seconds = _measure_time(CompactImprovedWalkerAlgorithm().run, tree)
+
+        result = {'nodes': size, 'graph_bytes': graph_bytes, 'compact_bytes': tree_bytes,
+                  'graph_seconds': node_seconds, 'compact_seconds': compact_seconds}
+        results.append(result)
+        print('Nodes:', size,
+              'Bytes per Node:', round(graph_bytes / size), '->', round(tree_bytes / size),
+              'Layout Seconds:', round(node_seconds, 3), '->', round(compact_seconds, 3))
+
+    return results
+
+
+def _measure_memory(function, *args):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = function(*args)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def _measure_time(function, *args):
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    function(*args)
+    duration = time.perf_counter() - start
+    gc.enable()
+    return duration
@@ -0,0 +1,52 @@
+import gc
+import math
+import time
+
+from module_color import Color
+from module_graph import Graph
+from .tree_generators import random_recursive_nx_tree
+
+
+def benchmark_graph_conversion(sizes=(1000, 10000, 100000, 1000000), seed=0):
+    """
+    Measures the runtime of Graph.create_graph_from_nx for random recursive trees of the given sizes.
+    Prints the runtime per node and the fitted scaling exponent, which should be close to 1 for linear behaviour.
+    Like timeit the garbage collector is disabled while measuring.
+    :param sizes: [int], node counts of the benchmarked trees
+    :param seed: int, seed for the tree generator
+    :return: [(int, float)], node count and runtime in seconds
+    """
+    print(Color.UNDERLINE + 'Benchmark Graph Conversion:' + Color.END)
+    results = []
+    for size in sizes:
+        nx_graph = random_recursive_nx_tree(size, seed=seed)
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        Graph.create_graph_from_nx(nx_graph)
+        duration = time.perf_counter() - start
+        gc.enable()
+        results.append((size, duration))
+        print('Nodes:', size, 'Seconds:', round(duration, 4), 'Microseconds per Node:', round(duration / size * 1e6, 3))
+
+    print(Color.BOLD + 'Scaling Exponent:', round(scaling_exponent(results), 3), Color.END)
+    return results
+
+
+def scaling_exponent(results):
+    """
+    Fits runtime = c * size^k with least squares on the log-log values and returns k.
+    :param results: [(int, float)], sizes and runtimes
+    :return: float
+    """
+    if len(results) < 2:
+        return float('nan')
+
+    log_sizes = [math.log(size) for size, duration in results]
+    log_durations = [math.log(duration) for size, duration in results]
+    mean_size = sum(log_sizes) / len(log_sizes)
+    mean_duration = sum(log_durations) / len(log_durations)
+    covariance = sum((s - mean_size) * (d - mean_duration) for s, d in zip(log_sizes, log_durations))
+    variance = sum((s - mean_size) ** 2 for s in log_sizes)
+
+    return covariance / variance
@@ -0,0 +1,49 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from module_color import Color
+
+HEAVY_MODULES = ('matplotlib', 'networkx', 'newick')
+
+IMPORT_STATEMENTS = {
+    'interpreter': 'pass',
+    'numpy': 'import numpy',
+    'main': 'import main',
+    'layout_api': 'from improved_walker_algorithm import layout',
+    'main_with_plotting': 'import main, matplotlib.pyplot, networkx, newick'
+}
+
+
+def benchmark_import_time(statements=None, repeats=5):
+    """
+    Measures the cold start of a new interpreter, which runs each import statement, as a short lived worker process
+    does. Each statement runs repeats times in a new process, the median of the wall times is reported together
+    with the imported heavy modules. 'main_with_plotting' imports matplotlib and networkx like main did before
+    they were imported lazily, so its difference to 'main' is the saved time per process.
+    :param statements: ?{str: str}, name and import statement, by default IMPORT_STATEMENTS
+    :param repeats: int, amount of processes per statement
+    :return: {str: dict}, seconds and imported heavy modules per statement
+    """
+    print(Color.UNDERLINE + 'Benchmark Import Time:' + Color.END)
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (os.getcwd(),
+                                                                            os.environ.get('PYTHONPATH')))))
+    results = {}
+    for name, statement in (statements or IMPORT_STATEMENTS).items():
+        script = (statement + '\nimport json, sys\nprint(json.dumps([name for name in ' + repr(HEAVY_MODULES)
+                  + ' if name in sys.modules]))')
+        seconds = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            completed = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                                       env=environment)
+            seconds.append(time.perf_counter() - start)
+
+        results[name] = {'seconds': statistics.median(seconds), 'heavy_modules': json.loads(completed.stdout)}
+        print(Color.BOLD + name + ':' + Color.END, round(results[name]['seconds'], 3), 'Seconds',
+              'Heavy Modules:', ', '.join(results[name]['heavy_modules']) or '-')
+
+    return results
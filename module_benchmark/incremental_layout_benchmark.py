@@ -0,0 +1,46 @@
+import random
+import statistics
+import time
+
+from improved_walker_algorithm import IncrementalImprovedWalkerAlgorithm
+from module_color import Color
+from module_graph import Graph
+
+
+def benchmark_incremental_layout(node_count=1000000, insertion_count=100, seed=0):
+    """
+    Inserts leaves at random nodes of a random recursive tree and measures each incremental update.
+    The first walk is repaired after every insertion, the coordinates are updated once at the end.
+    :param node_count: int, amount of nodes of the tree
+    :param insertion_count: int, amount of inserted leaves
+    :param seed: int, seed of the random generator
+    :return: (float, [float], float), full layout, first walk repair per insertion and coordinate update in seconds
+    """
+    print(Color.UNDERLINE + 'Benchmark Incremental Layout:' + Color.END)
+    random_generator = random.Random(seed)
+    parents = [-1] + [random_generator.randrange(node_number) for node_number in range(1, node_count)]
+    graph = Graph.create_graph_from_parent_array([str(node_number) for node_number in range(node_count)], parents)
+
+    incremental_walker_algorithm = IncrementalImprovedWalkerAlgorithm()
+    start = time.perf_counter()
+    incremental_walker_algorithm.calculate_layout(graph)
+    full_layout_seconds = time.perf_counter() - start
+    print('Nodes:', node_count, 'Full Layout Seconds:', round(full_layout_seconds, 3))
+
+    insertion_seconds = []
+    for insertion in range(insertion_count):
+        parent = graph.nodes[random_generator.randrange(len(graph.nodes))]
+        start = time.perf_counter()
+        graph.add_child(parent, 'inserted_' + str(insertion))
+        incremental_walker_algorithm.update_layout(update_coordinates=False)
+        insertion_seconds.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    updated_node_count = incremental_walker_algorithm.update_coordinates()
+    coordinate_seconds = time.perf_counter() - start
+
+    print('Insertions:', insertion_count,
+          'Median Milliseconds:', round(statistics.median(insertion_seconds) * 1000, 3),
+          'Max Milliseconds:', round(max(insertion_seconds) * 1000, 3))
+    print('Updated Coordinates:', updated_node_count, 'Seconds:', round(coordinate_seconds, 3))
+    return full_layout_seconds, insertion_seconds, coordinate_seconds
@@ -0,0 +1,37 @@
+import resource
+import time
+
+from improved_walker_algorithm import ImprovedWalkerAlgorithm
+from module_color import Color
+from module_graph import Graph
+from module_render import GraphRenderer
+from .tree_generators import random_recursive_nx_tree
+
+
+def benchmark_render_batch(file_count=1000, node_count=200, dpi=100, report_every=100):
+    """
+    Renders the same tree file_count times like a batch run and reports the render time and the peak
+    resident memory after every report_every files. Both should stay flat over the batch.
+    :param file_count: int, amount of rendered images
+    :param node_count: int, amount of nodes of the tree
+    :param dpi: int, resolution of the images
+    :param report_every: int, amount of images between two reports
+    :return: [(int, float, int)], rendered images, average seconds per image and peak memory in kilobytes
+    """
+    print(Color.UNDERLINE + 'Benchmark Render Batch:' + Color.END)
+    graph = Graph.create_graph_from_nx(random_recursive_nx_tree(node_count))
+    ImprovedWalkerAlgorithm().calculate_layout(graph)
+    renderer = GraphRenderer(dpi=dpi)
+    results = []
+    start = time.perf_counter()
+    for file_number in range(1, file_count + 1):
+        renderer.render(graph, 'benchmark/render_batch', scale_x=10, scale_y=10)
+        if file_number % report_every == 0:
+            seconds_per_image = (time.perf_counter() - start) / report_every
+            peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            results.append((file_number, seconds_per_image, peak_memory))
+            print('Images:', file_number, 'Seconds per Image:', round(seconds_per_image, 4),
+                  'Peak Memory (kB):', peak_memory)
+            start = time.perf_counter()
+
+    return results
@@ -0,0 +1,33 @@
+import gc
+import time
+
+from improved_walker_algorithm import ImprovedWalkerAlgorithm
+from module_color import Color
+from module_graph import Graph
+from .graph_conversion_benchmark import scaling_exponent
+from .tree_generators import star_nx_tree
+
+
+def benchmark_sibling_navigation(sizes=(1000, 2500, 5000, 10000, 20000)):
+    """
+    Measures the layout runtime for star like trees, where the root node has the given amount of children.
+    Every child has two children, so each apportion step walks the contours.
+    The fitted scaling exponent should be close to 1 for linear behaviour.
+    :param sizes: [int], amount of children of the root node
+    :return: [(int, float)], amount of children and runtime in seconds
+    """
+    print(Color.UNDERLINE + 'Benchmark Sibling Navigation:' + Color.END)
+    results = []
+    for size in sizes:
+        graph = Graph.create_graph_from_nx(star_nx_tree(size))
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        ImprovedWalkerAlgorithm().calculate_layout(graph)
+        duration = time.perf_counter() - start
+        gc.enable()
+        results.append((size, duration))
+        print('Children:', size, 'Seconds:', round(duration, 4))
+
+    print(Color.BOLD + 'Scaling Exponent:', round(scaling_exponent(results), 3), Color.END)
+    return results
@@ -0,0 +1,225 @@
+import gc
+import json
+import os
+import time
+import tracemalloc
+
+from improved_walker_algorithm import ImprovedWalkerAlgorithm
+from module_color import Color
+from module_graph import Graph
+from module_parse import parse_graphml_file_newick_format
+from module_parse import parse_graphml_file_to_graph
+from module_parse import parse_newick_file
+from module_parse import parse_newick_file_to_graph
+from module_parse import write_newick_file
+from module_render import GraphRenderer
+from .graph_conversion_benchmark import scaling_exponent
+from .tree_generators import balanced_nx_tree
+from .tree_generators import caterpillar_nx_tree
+from .tree_generators import random_recursive_nx_tree
+from .tree_generators import star_nx_tree
+
+STAGES = ('parse', 'convert', 'stream_parse', 'layout', 'render')
+
+
+def star_nx_tree_with_node_count(node_count: int):
+    """
+    Creates a star like tree from star_nx_tree with about node_count nodes.
+    :param node_count: int, amount of nodes in the tree
+    :return: nx.DiGraph
+    """
+    return star_nx_tree(max(1, (node_count - 1) // 3))
+
+
+TREE_SHAPES = {
+    'balanced': balanced_nx_tree,
+    'caterpillar': caterpillar_nx_tree,
+    'random_recursive': random_recursive_nx_tree,
+    'star': star_nx_tree_with_node_count
+}
+
+
+def benchmark_stages(sizes=(100, 1000, 10000, 100000, 1000000), shapes=tuple(TREE_SHAPES), include_examples=True,
+                     dpi=50, result_path=os.path.join('output', 'benchmark', 'stage_benchmark.json')):
+    """
+    Measures the runtime and the memory of each stage for synthetic trees of the given shapes and sizes
+    and for the example files. The stages are parsing into networkx, the conversion into a graph, parsing
+    directly into a graph with the stream parser, the layout and the rendering.
+    Each tree is written as newick file first, so the parse stages read the same file.
+    The stages run twice, once timed with disabled garbage collector and once with tracemalloc for the peak memory.
+    Each renderer draws one untimed image first, so the import of matplotlib and the loading of the fonts are not
+    measured as part of the first render stage.
+    A failing stage is recorded with its error, e.g. the recursion limit of the newick library for deep trees.
+    Synthetic trees are rendered without labels.
+    :param sizes: [int], node counts of the synthetic trees
+    :param shapes: [str], keys of TREE_SHAPES
+    :param include_examples: bool, also measures the files in directed_graph_examples
+    :param dpi: int, resolution of the rendered images
+    :param result_path: str, path of the JSON file with the results
+    :return: dict, the written results
+    """
+    print(Color.UNDERLINE + 'Benchmark Stages:' + Color.END)
+    results = []
+    tree_directory = os.path.join('output', 'benchmark', 'trees')
+    Graph.create_missing_dir(tree_directory)
+    synthetic_renderer = GraphRenderer(dpi=dpi, with_labels=False)
+    warm_up_renderer(synthetic_renderer)
+    for shape in shapes:
+        for size in sizes:
+            filename = os.path.join(tree_directory, shape + '_' + str(size) + '.nh')
+            write_newick_file(Graph.create_graph_from_nx(TREE_SHAPES[shape](size)), filename)
+            results.extend(benchmark_file_stages(filename, shape, 'synthetic', parse_newick_file,
+                                                 parse_newick_file_to_graph, synthetic_renderer,
+                                                 lambda: TREE_SHAPES[shape](size)))
+
+    if include_examples:
+        example_renderer = GraphRenderer(dpi=dpi)
+        warm_up_renderer(example_renderer)
+        example_files = []
+        for directory, parse_function, stream_parse_function in (
+                ('Phylogeny', parse_newick_file, parse_newick_file_to_graph),
+                ('Phylogeny-Binaer', parse_newick_file, parse_newick_file_to_graph),
+                ('graphml', parse_graphml_file_newick_format, parse_graphml_file_to_graph)):
+            directory = os.path.join('directed_graph_examples', directory)
+            for filename in sorted(os.listdir(directory)):
+                example_files.append((os.path.join(directory, filename), parse_function, stream_parse_function))
+        for filename, parse_function, stream_parse_function in example_files:
+            results.extend(benchmark_file_stages(filename, os.path.basename(filename), 'example', parse_function,
+                                                 stream_parse_function, example_renderer))
+
+    benchmark = {'stages': STAGES, 'sizes': list(sizes), 'results': results,
+                 'scaling_exponents': get_scaling_exponents(results, shapes)}
+    Graph.create_missing_dir(os.path.dirname(result_path))
+    with open(result_path, 'w', encoding='utf-8') as result_file:
+        json.dump(benchmark, result_file, indent=1)
+
+    print(Color.BOLD + 'Scaling Exponents:' + Color.END)
+    for shape, exponents in benchmark['scaling_exponents'].items():
+        print(shape, ' '.join(stage + ': ' + str(round(exponent, 3)) for stage, exponent in exponents.items()))
+    print('Results written to', result_path)
+    return benchmark
+
+
+def warm_up_renderer(renderer: GraphRenderer):
+    """
+    Draws a tree of two nodes and removes the image again, so matplotlib is imported and its fonts are loaded.
+    :param renderer: GraphRenderer
+    :return: None
+    """
+    graph = Graph.create_graph_from_parent_array(['root', 'leaf'], [-1, 0])
+    ImprovedWalkerAlgorithm().calculate_layout(graph)
+    os.remove(renderer.render(graph, 'benchmark/warm_up', 1, 1))
+
+
+def benchmark_file_stages(filename: str, name: str, source: str, parse_function, stream_parse_function,
+                          renderer: GraphRenderer, create_nx_graph=None):
+    """
+    Runs the stages for one file twice, once for the runtime and once for the peak memory.
+    :param filename: str; full path of the file
+    :param name: str, name of the tree in the results
+    :param source: str, synthetic or example
+    :param parse_function: function, which parses the file into a networkx graph
+    :param stream_parse_function: ?function, which parses the file directly into a graph
+    :param renderer: GraphRenderer
+    :param create_nx_graph: ?function, creates the networkx graph if the parse stage fails
+    :return: [dict], one result per stage
+    """
+    seconds, node_count = run_stages(filename, parse_function, stream_parse_function, renderer, create_nx_graph,
+                                     measure_memory=False)
+    peak_bytes, _ = run_stages(filename, parse_function, stream_parse_function, renderer, create_nx_graph,
+                               measure_memory=True)
+
+    results = []
+    for stage in STAGES:
+        if stage not in seconds:
+            continue
+        stage_seconds, error = seconds[stage]
+        results.append({'name': name, 'source': source, 'file': filename, 'nodes': node_count, 'stage': stage,
+                        'seconds': stage_seconds, 'peak_bytes': peak_bytes[stage][0], 'error': error})
+
+    print(name, 'Nodes:', node_count, ' '.join(
+        result['stage'] + ': ' + ('failed' if result['error'] else str(round(result['seconds'], 3)) + 's/'
+                                  + str(round(result['peak_bytes'] / 2 ** 20, 1)) + 'MB') for result in results))
+    return results
+
+
+def run_stages(filename: str, parse_function, stream_parse_function, renderer: GraphRenderer, create_nx_graph,
+               measure_memory: bool):
+    """
+    Runs the stages one after another. Each stage gets the result of the previous one.
+    :param filename: str; full path of the file
+    :param parse_function: function, which parses the file into a networkx graph
+    :param stream_parse_function: ?function, which parses the file directly into a graph
+    :param renderer: GraphRenderer
+    :param create_nx_graph: ?function, creates the networkx graph if the parse stage fails
+    :param measure_memory: bool, measures the peak memory with tracemalloc instead of the runtime
+    :return: ({str: (float, ?str)}, int), seconds or peak bytes and error per stage, amount of nodes
+    """
+    measurements = {}
+    if measure_memory:
+        tracemalloc.start()
+
+    def measure(stage, function, *args):
+        gc.collect()
+        if measure_memory:
+            start_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        else:
+            gc.disable()
+        start = time.perf_counter()
+        result = None
+        error = None
+        try:
+            result = function(*args)
+        except Exception as exception:
+            error = type(exception).__name__ + ': ' + str(exception)[:200]
+        value = time.perf_counter() - start
+        gc.enable()
+        if measure_memory:
+            value = tracemalloc.get_traced_memory()[1] - start_bytes
+        measurements[stage] = (value, error)
+        return result
+
+    node_count = 0
+    try:
+        nx_graph = measure('parse', parse_function, filename)
+        if nx_graph is None and create_nx_graph:
+            nx_graph = create_nx_graph()
+        if nx_graph is None:
+            return measurements, node_count
+
+        graph = measure('convert', Graph.create_graph_from_nx, nx_graph)
+        del nx_graph
+        if graph is None:
+            return measurements, node_count
+        node_count = len(graph.nodes)
+
+        if stream_parse_function:
+            measure('stream_parse', stream_parse_function, filename)
+        measure('layout', ImprovedWalkerAlgorithm().calculate_layout, graph)
+        measure('render', renderer.render, graph, 'benchmark/stage_render', 10, 10)
+    finally:
+        if measure_memory:
+            tracemalloc.stop()
+
+    return measurements, node_count
+
+
+def get_scaling_exponents(results, shapes):
+    """
+    Fits the scaling exponent of the runtime for each shape and stage over the sizes without errors.
+    :param results: [dict], results of benchmark_file_stages
+    :param shapes: [str]
+    :return: {str: {str: float}}
+    """
+    scaling_exponents = {}
+    for shape in shapes:
+        scaling_exponents[shape] = {}
+        for stage in STAGES:
+            runtimes = [(result['nodes'], result['seconds']) for result in results
+                        if result['source'] == 'synthetic' and result['name'] == shape and result['stage'] == stage
+                        and not result['error'] and result['seconds'] > 0]
+            if len(runtimes) > 1:
+                scaling_exponents[shape][stage] = scaling_exponent(runtimes)
+
+    return scaling_exponents
@@ -0,0 +1,58 @@
+import gc
+import os
+import random
+import time
+
+from improved_walker_algorithm import CompactImprovedWalkerAlgorithm
+from module_color import Color
+from module_graph import Graph
+from module_graph import TREE_FILE_EXTENSION
+from module_graph import TreeFile
+from module_parse import parse_newick_file_to_compact_tree
+from module_parse import write_newick_file
+
+
+def benchmark_tree_file(node_count=1000000, seed=0, directory=os.path.join('output', 'benchmark', 'trees')):
+    """
+    Compares the time to open a random recursive tree as compact tree from a newick file and from a tree file
+    with and without layout. The layout of the opened tree is measured too, opening a tree file should only add
+    little to it, while parsing the newick file takes about as long as the layout.
+    :param node_count: int, amount of nodes in the tree
+    :param seed: int, seed for the tree generator
+    :param directory: str, directory for the written files
+    :return: dict, seconds of each way to open the tree and of the layout
+    """
+    print(Color.UNDERLINE + 'Benchmark Tree File:' + Color.END)
+    random_generator = random.Random(seed)
+    parents = [-1] + [random_generator.randrange(node_number) for node_number in range(1, node_count)]
+    graph = Graph.create_graph_from_parent_array(['n' + str(node_number) for node_number in range(node_count)],
+                                                 parents)
+    Graph.create_missing_dir(directory)
+    newick_path = os.path.join(directory, 'random_recursive_' + str(node_count) + '.nh')
+    write_newick_file(graph, newick_path)
+    del graph
+
+    tree = parse_newick_file_to_compact_tree(newick_path)
+    tree_path = TreeFile.write(newick_path + TREE_FILE_EXTENSION, tree)
+    CompactImprovedWalkerAlgorithm().run(tree)
+    layout_path = TreeFile.write(newick_path + '.layout' + TREE_FILE_EXTENSION, tree, with_layout=True)
+    del tree
+
+    results = {
+        'parse_newick': _measure_seconds(lambda: parse_newick_file_to_compact_tree(newick_path)),
+        'open_tree_file': _measure_seconds(lambda: TreeFile(tree_path).get_tree()),
+        'open_tree_file_with_layout': _measure_seconds(lambda: TreeFile(layout_path).get_tree()),
+        'layout': _measure_seconds(lambda: CompactImprovedWalkerAlgorithm().run(TreeFile(tree_path).get_tree()))
+    }
+    print('Nodes:', node_count, 'Bytes:', os.path.getsize(newick_path), '->', os.path.getsize(tree_path))
+    for name, seconds in results.items():
+        print(Color.BOLD + name + ':' + Color.END, round(seconds, 3), 'Seconds')
+
+    return results
+
+
+def _measure_seconds(function):
+    gc.collect()
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
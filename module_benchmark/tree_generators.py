@@ -0,0 +1,105 @@
+import random
+
+
+def random_recursive_nx_tree(node_count: int, seed=0):
+    """
+    Creates a random recursive tree as networkx graph in the format of the newick parser.
+    Every new node is attached to a uniformly chosen node which was created before.
+    :param node_count: int, amount of nodes in the tree
+    :param seed: int, seed for the random generator
+    :return: nx.DiGraph
+    """
+    import networkx as nx
+    import newick
+
+    random_generator = random.Random(seed)
+    nx_graph = nx.DiGraph()
+    nodes = [newick.Node('n0')]
+    child_counter = [0]
+    nx_graph.add_node(nodes[0], child_position=0)
+    for node_number in range(1, node_count):
+        parent_number = random_generator.randrange(node_number)
+        new_node = newick.Node('n' + str(node_number))
+        nx_graph.add_node(new_node, child_position=child_counter[parent_number])
+        nx_graph.add_edge(nodes[parent_number], new_node)
+        child_counter[parent_number] += 1
+        nodes.append(new_node)
+        child_counter.append(0)
+
+    return nx_graph
+
+
+def star_nx_tree(children_count: int, grandchildren_count=2):
+    """
+    Creates a star like tree as networkx graph in the format of the newick parser.
+    The root node has children_count children, which have grandchildren_count children each.
+    :param children_count: int, amount of children of the root node
+    :param grandchildren_count: int, amount of children of each child
+    :return: nx.DiGraph
+    """
+    import networkx as nx
+    import newick
+
+    nx_graph = nx.DiGraph()
+    root_node = newick.Node('root')
+    nx_graph.add_node(root_node, child_position=0)
+    for child_position in range(children_count):
+        child_node = newick.Node('c' + str(child_position))
+        nx_graph.add_node(child_node, child_position=child_position)
+        nx_graph.add_edge(root_node, child_node)
+        for grandchild_position in range(grandchildren_count):
+            grandchild_node = newick.Node('c' + str(child_position) + '_' + str(grandchild_position))
+            nx_graph.add_node(grandchild_node, child_position=grandchild_position)
+            nx_graph.add_edge(child_node, grandchild_node)
+
+    return nx_graph
+
+
+def balanced_nx_tree(node_count: int, arity=2):
+    """
+    Creates a complete tree with node_count nodes as networkx graph in the format of the newick parser.
+    The nodes are filled in breadth first order, so every inner node except the last one has arity children.
+    :param node_count: int, amount of nodes in the tree
+    :param arity: int, amount of children of the inner nodes
+    :return: nx.DiGraph
+    """
+    import networkx as nx
+    import newick
+
+    nx_graph = nx.DiGraph()
+    nodes = []
+    for node_number in range(node_count):
+        new_node = newick.Node('n' + str(node_number))
+        nx_graph.add_node(new_node, child_position=(node_number - 1) % arity if node_number else 0)
+        if node_number:
+            nx_graph.add_edge(nodes[(node_number - 1) // arity], new_node)
+        nodes.append(new_node)
+
+    return nx_graph
+
+
+def caterpillar_nx_tree(node_count: int):
+    """
+    Creates a caterpillar tree as networkx graph in the format of the newick parser.
+    The inner nodes form a path and each of them has one leaf as first child, so the depth is about node_count / 2.
+    :param node_count: int, amount of nodes in the tree
+    :return: nx.DiGraph
+    """
+    import networkx as nx
+    import newick
+
+    nx_graph = nx.DiGraph()
+    spine_node = newick.Node('s0')
+    nx_graph.add_node(spine_node, child_position=0)
+    for node_number in range(1, node_count):
+        if node_number % 2:
+            new_node = newick.Node('l' + str(node_number // 2))
+            nx_graph.add_node(new_node, child_position=0)
+            nx_graph.add_edge(spine_node, new_node)
+        else:
+            new_node = newick.Node('s' + str(node_number // 2))
+            nx_graph.add_node(new_node, child_position=1)
+            nx_graph.add_edge(spine_node, new_node)
+            spine_node = new_node
+
+    return nx_graph
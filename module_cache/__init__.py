@@ -0,0 +1 @@
+from .layout_cache import *
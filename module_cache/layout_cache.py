@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from module_graph import Graph
+
+LAYOUT_CACHE_VERSION = 2
+
+
+class LayoutCache:
+    """
+    Class Layout Cache
+    Stores computed layouts on disk. An entry is identified by the hash of the input file contents and the
+    layout parameters. The coordinates and the structure are stored as arrays in an npz file.
+    When the cache gets larger than max_bytes the least recently used entries are removed.
+    """
+
+    def __init__(self, directory='.layout_cache', max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def get_key(self, filename: str, **parameters):
+        """
+        Hashes the contents of the file together with the layout parameters.
+        :param filename: str, full path of the input file
+        :param parameters: layout parameters, e.g. distance and scale
+        :return: str
+        """
+        file_hash = hashlib.sha256()
+        with open(filename, 'rb') as input_file:
+            for block in iter(lambda: input_file.read(1 << 20), b''):
+                file_hash.update(block)
+        file_hash.update(json.dumps(dict(parameters, version=LAYOUT_CACHE_VERSION), sort_keys=True).encode())
+
+        return file_hash.hexdigest()
+
+    def load(self, key: str):
+        """
+        Returns the cached graph with its coordinates or None if there is no entry for the key.
+        :param key: str
+        :return: ?Graph
+        """
+        path = self.get_path(key)
+        try:
+            with np.load(path) as arrays:
+                graph = LayoutCache.graph_from_arrays(arrays)
+            os.utime(path)
+        except (FileNotFoundError, ValueError, KeyError, OSError):
+            return None
+
+        return graph
+
+    def store(self, key: str, graph: Graph):
+        """
+        Stores the graph with its coordinates. The file is written under a temporary name and then renamed,
+        so parallel processes never read a half written entry.
+        :param key: str
+        :param graph: Graph
+        :return: None
+        """
+        Graph.create_missing_dir(self.directory)
+        temporary_path = self.get_path(key) + '.' + str(os.getpid()) + '.tmp'
+        with open(temporary_path, 'wb') as cache_file:
+            np.savez(cache_file, **LayoutCache.graph_to_arrays(graph))
+        os.replace(temporary_path, self.get_path(key))
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache is not larger than max_bytes.
+        :return: None
+        """
+        entries = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith('.npz'):
+                continue
+            try:
+                status = os.stat(os.path.join(self.directory, filename))
+            except FileNotFoundError:
+                continue
+            entries.append((status.st_mtime, status.st_size, filename))
+
+        cache_bytes = sum(size for modified, size, filename in entries)
+        for modified, size, filename in sorted(entries):
+            if cache_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, filename))
+            except FileNotFoundError:
+                pass
+            cache_bytes -= size
+
+    def get_path(self, key: str):
+        return os.path.join(self.directory, key + '.npz')
+
+    @staticmethod
+    def graph_to_arrays(graph: Graph):
+        """
+        Converts the graph into arrays. The names are stored as one UTF-8 byte array with offsets.
+        :param graph: Graph
+        :return: dict
+        """
+        names, coordinates, edge_indices = graph.get_coordinate_arrays()
+        node_positions = {node: position for position, node in enumerate(graph.nodes)}
+        encoded_names = [name.encode('utf-8') for name in names]
+
+        return {
+            'name_bytes': np.frombuffer(b''.join(encoded_names), dtype=np.uint8),
+            'name_offsets': np.cumsum([0] + [len(name) for name in encoded_names], dtype=np.int64),
+            'parents': np.array([node_positions[node.parent] if node.parent else -1 for node in graph.nodes],
+                                dtype=np.int32),
+            'x': coordinates[:, 0],
+            'y': coordinates[:, 1],
+            'edges': edge_indices.astype(np.int32),
+            'distance': np.array(graph.distance, dtype=float),
+            'label_units_per_em': np.array(graph.label_units_per_em or 0, dtype=float)
+        }
+
+    @staticmethod
+    def graph_from_arrays(arrays):
+        """
+        Creates the graph with its coordinates from the arrays of graph_to_arrays.
+        :param arrays: dict like
+        :return: Graph
+        """
+        name_bytes = arrays['name_bytes'].tobytes()
+        name_offsets = arrays['name_offsets'].tolist()
+        names = [name_bytes[name_offsets[position]:name_offsets[position + 1]].decode('utf-8')
+                 for position in range(len(name_offsets) - 1)]
+
+        graph = Graph.create_graph_from_parent_array(names, arrays['parents'].tolist())
+        graph.distance = float(arrays['distance'])
+        graph.label_units_per_em = float(arrays['label_units_per_em']) or None
+        # Only edges, which are not the parent links, have to be stored in the graph.
+        if len(arrays['edges']) != len(graph.edges):
+            graph.edges = [(names[edge_from], names[edge_to]) for edge_from, edge_to in arrays['edges'].tolist()]
+        for node, x, y in zip(graph.nodes, arrays['x'].tolist(), arrays['y'].tolist()):
+            node.x = x
+            node.y = y
+
+        return graph
@@ -0,0 +1 @@
+from .command_line import *
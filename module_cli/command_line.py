@@ -0,0 +1,168 @@
+import argparse
+import os
+
+from module_batch import convert_to_tree_file
+from module_batch import layout_file
+from module_batch import layout_newick_phylogram
+from module_batch import run_batch
+from module_graph import EXPORT_FORMATS
+from module_graph import PHYLOGRAM_EXPORT_FORMATS
+from module_graph import PHYLOGRAM_PROJECTIONS
+from module_graph import TREE_FILE_EXTENSION
+from module_instrumentation import Instrumentation
+from module_instrumentation import PrintHook
+from module_instrumentation import ProfileCapture
+from module_render import IMAGE_FORMATS
+
+COMMANDS = ('parse', 'layout', 'render', 'batch')
+# Files with these extensions have no branch lengths, so the phylogram mode only reads the other files as newick.
+NON_NEWICK_EXTENSIONS = ('.graphml', TREE_FILE_EXTENSION)
+
+
+def build_argument_parser():
+    """
+    Creates the parser of the subcommands:
+    parse writes tree files, layout only writes coordinates, render draws images and batch lays out and draws
+    all files of directories.
+    :return: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog='main.py', description='Lays out and draws trees from newick, graphml '
+                                                                 'and tree files.')
+    parser.add_argument('--instrument', action='store_true', help='prints the runtime and memory of each stage')
+    parser.add_argument('--profile', action='store_true', help='records the run with cProfile')
+    parser.add_argument('--trace-memory', action='store_true', help='traces the allocations with tracemalloc')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    parse_parser = subparsers.add_parser('parse', help='parses files into tree files in the output directory')
+    parse_parser.add_argument('files', nargs='+', help='newick or graphml files')
+    parse_parser.add_argument('--with-layout', action='store_true', help='also stores the layout in the tree file')
+    add_label_spacing_argument(parse_parser)
+    add_batch_arguments(parse_parser)
+
+    layout_parser = subparsers.add_parser('layout', help='lays out files and writes only their coordinates')
+    layout_parser.add_argument('files', nargs='+', help='newick, graphml or tree files')
+    layout_parser.add_argument('--export', choices=EXPORT_FORMATS, default='npz', help='format of the coordinates')
+    add_layout_arguments(layout_parser)
+
+    render_parser = subparsers.add_parser('render', help='lays out files and draws them')
+    render_parser.add_argument('files', nargs='+', help='newick, graphml or tree files')
+    add_image_arguments(render_parser)
+    add_layout_arguments(render_parser)
+
+    batch_parser = subparsers.add_parser('batch', help='lays out and draws all files of directories')
+    batch_parser.add_argument('directories', nargs='+', help='directories with newick, graphml or tree files')
+    batch_parser.add_argument('--export', choices=EXPORT_FORMATS, help='only writes the coordinates')
+    add_image_arguments(batch_parser)
+    add_layout_arguments(batch_parser)
+    return parser
+
+
+def add_batch_arguments(parser: argparse.ArgumentParser):
+    """
+    Adds the amount of jobs to a subcommand.
+    :param parser: argparse.ArgumentParser
+    :return: None
+    """
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='amount of worker processes')
+
+
+def add_label_spacing_argument(parser: argparse.ArgumentParser):
+    """
+    Adds the switch to lay out without the widths of the labels to a subcommand.
+    :param parser: argparse.ArgumentParser
+    :return: None
+    """
+    parser.add_argument('--no-label-spacing', action='store_true',
+                        help='keeps neighboring nodes only the distance apart, regardless of their labels')
+
+
+def add_layout_arguments(parser: argparse.ArgumentParser):
+    """
+    Adds the arguments of the layout to a subcommand: jobs, the layout cache, the label spacing and the phylogram
+    mode.
+    :param parser: argparse.ArgumentParser
+    :return: None
+    """
+    add_batch_arguments(parser)
+    parser.add_argument('--no-cache', action='store_true', help='neither reads nor writes the layout cache')
+    add_label_spacing_argument(parser)
+    parser.add_argument('--phylogram', choices=PHYLOGRAM_PROJECTIONS,
+                        help='uses the branch lengths of newick files with the given projection')
+
+
+def add_image_arguments(parser: argparse.ArgumentParser):
+    """
+    Adds the arguments of the drawing to a subcommand: image format, resolution and level of detail.
+    :param parser: argparse.ArgumentParser
+    :return: None
+    """
+    parser.add_argument('--format', choices=IMAGE_FORMATS, default='png', help='format of the images')
+    parser.add_argument('--dpi', type=int, help='resolution, derived from the layout by default')
+    parser.add_argument('--lod', action='store_true', help='draws with the level of detail renderer')
+
+
+def run_command_line(arguments=None):
+    """
+    Parses the arguments and runs the subcommand, optionally instrumented or profiled.
+    :param arguments: ?[str], arguments without the program name, by default sys.argv[1:]
+    :return: [BatchResult]
+    """
+    parser = build_argument_parser()
+    options = parser.parse_args(arguments)
+    export_format = getattr(options, 'export', None)
+    if getattr(options, 'phylogram', None) and export_format not in (None,) + PHYLOGRAM_EXPORT_FORMATS:
+        parser.error('the phylogram mode only exports ' + ' or '.join(PHYLOGRAM_EXPORT_FORMATS))
+    if getattr(options, 'phylogram', None):
+        non_newick_files = [filename for filename in get_filenames(options) if filename.endswith(NON_NEWICK_EXTENSIONS)]
+        if non_newick_files:
+            parser.error('the phylogram mode only reads newick files, not ' + ', '.join(non_newick_files))
+
+    if not (options.instrument or options.profile or options.trace_memory):
+        return run_command(options)
+
+    with ProfileCapture(name=options.command, profile=options.profile, trace_memory=options.trace_memory), \
+            Instrumentation([PrintHook()]).activate():
+        return run_command(options)
+
+
+def get_filenames(options: argparse.Namespace):
+    """
+    Returns the files of the subcommand, the batch subcommand takes all files of its directories.
+    :param options: argparse.Namespace, parsed arguments
+    :return: [str]
+    """
+    if options.command == 'batch':
+        return [os.path.join(directory, filename) for directory in options.directories
+                for filename in sorted(os.listdir(directory))]
+
+    return options.files
+
+
+def run_command(options: argparse.Namespace):
+    """
+    Runs the subcommand for each file as one task of a batch.
+    :param options: argparse.Namespace, parsed arguments
+    :return: [BatchResult]
+    """
+    if options.command == 'parse':
+        tasks = [(convert_to_tree_file, filename, {'with_layout': options.with_layout,
+                                                   'label_spacing': not options.no_label_spacing})
+                 for filename in options.files]
+        return run_batch(tasks, jobs=options.jobs)
+
+    filenames = get_filenames(options)
+    output_options = {
+        'dpi': getattr(options, 'dpi', None),
+        'image_format': getattr(options, 'format', 'png'),
+        'export_format': getattr(options, 'export', None),
+        'level_of_detail': getattr(options, 'lod', False),
+        'label_spacing': not options.no_label_spacing
+    }
+    if options.phylogram:
+        tasks = [(layout_newick_phylogram, filename, dict(output_options, projection=options.phylogram))
+                 for filename in filenames]
+    else:
+        tasks = [(layout_file, filename, dict(output_options, use_cache=not options.no_cache))
+                 for filename in filenames]
+
+    return run_batch(tasks, jobs=options.jobs)
@@ -1,2 +1,9 @@
 from .graph import *
-from .node import *
\ No newline at end of file
+from .node import *
+from .label_width import *
+from .tree_index import *
+from .compact_tree import *
+from .compact_forest import *
+from .phylogram import *
+from .graph_export import *
+from .tree_file import *
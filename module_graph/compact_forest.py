@@ -0,0 +1,184 @@
+import os
+
+import numpy as np
+
+from module_instrumentation import instrumented_stage
+from . import graph_export
+from .compact_tree import CompactTree
+from .graph import Graph
+
+FOREST_ARRANGEMENTS = ('row', 'grid')
+FOREST_EXPORT_FORMATS = ('svg', 'npz')
+
+
+class CompactForest:
+    """
+    Class Compact Forest
+    Many trees in one CompactTree, so all of them are laid out in one run without objects per tree. The roots of
+    the trees are the children of a virtual root node 0, which is left out of the coordinates and the drawings.
+    After the layout the trees are packed side by side or in a grid by an offset per tree, so each tree keeps
+    its own shape. The nodes of the forest are numbered like the nodes of the tree without the virtual root.
+    """
+
+    def __init__(self, tree: CompactTree, tree_count: int):
+        """
+        :param tree: CompactTree, with the virtual root node 0 above the roots of the trees
+        :param tree_count: int, amount of trees, the roots of the trees are the nodes 1 to tree_count
+        """
+        self.tree = tree
+        self.tree_count = tree_count
+        self.names = tree.names[1:]
+        self.parent = tree.parent[1:].astype(np.int64) - 1
+        self.tree_numbers = self.__get_tree_numbers()
+        self.tree_offsets = np.zeros((tree_count, 2))
+        self.x = np.full(len(self.names), -1.0)
+        self.y = np.zeros(len(self.names))
+        self.distance = tree.distance
+        self.edge_polylines = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def from_parent_arrays(trees):
+        """
+        Creates the forest from the names and parent numbers of each tree.
+        :param trees: iterable of ([str], [int]), names and parent numbers of a tree, -1 for its root node
+        :return: CompactForest
+        """
+        names = [None]
+        parents = [-1]
+        tree_count = 0
+        for tree_names, tree_parents, *_ in trees:
+            # The parent numbers of the tree become numbers in the forest, its root is attached to the virtual root.
+            offset = len(names)
+            names.extend(tree_names)
+            parents.extend([parent + offset if parent >= 0 else 0 for parent in tree_parents])
+            tree_count += 1
+
+        return CompactForest(CompactTree.from_parent_array(names, parents), tree_count)
+
+    def __get_tree_numbers(self):
+        """
+        Finds the tree of each node by jumping along the parents, each step doubles the length of the jump.
+        :return: np.ndarray
+        """
+        top = self.tree.parent.astype(np.int64)
+        top[0] = 0
+        top[1:self.tree_count + 1] = np.arange(1, self.tree_count + 1)
+        while True:
+            next_top = top[top]
+            if np.array_equal(next_top, top):
+                break
+            top = next_top
+
+        return top[1:] - 1
+
+    def pack(self, arrangement='row', columns=None):
+        """
+        Moves the laid out trees next to each other. In a row the trees are placed side by side, in a grid the
+        columns are as wide as their widest tree and the rows as high as their deepest tree. Neighboring trees are
+        one distance or one level apart. The root nodes of the first row are on level 1.
+        :param arrangement: str, row or grid
+        :param columns: ?int, amount of columns of the grid, by default about the square root of the tree count
+        :return: CompactForest
+        """
+        if arrangement not in FOREST_ARRANGEMENTS:
+            raise ValueError('Unknown arrangement ' + arrangement + ', expected one of ' + str(FOREST_ARRANGEMENTS))
+        if not self.tree_count:
+            return self
+
+        x = self.tree.x[1:]
+        # The virtual root is on level 1, so the roots of the trees are on level 2.
+        y = self.tree.y[1:] - 1
+        min_x = np.full(self.tree_count, np.inf)
+        max_x = np.full(self.tree_count, -np.inf)
+        max_y = np.zeros(self.tree_count)
+        np.minimum.at(min_x, self.tree_numbers, x)
+        np.maximum.at(max_x, self.tree_numbers, x)
+        np.maximum.at(max_y, self.tree_numbers, y)
+        widths = max_x - min_x + self.distance
+
+        if arrangement == 'row':
+            offsets_x = np.cumsum(widths) - widths
+            offsets_y = np.zeros(self.tree_count)
+        else:
+            columns = max(1, columns or int(np.ceil(np.sqrt(self.tree_count))))
+            tree_columns = np.arange(self.tree_count) % columns
+            tree_rows = np.arange(self.tree_count) // columns
+            column_widths = np.zeros(columns)
+            row_heights = np.zeros(int(tree_rows[-1]) + 1)
+            np.maximum.at(column_widths, tree_columns, widths)
+            np.maximum.at(row_heights, tree_rows, max_y + 1)
+            offsets_x = (np.cumsum(column_widths) - column_widths)[tree_columns]
+            offsets_y = (np.cumsum(row_heights) - row_heights)[tree_rows]
+
+        self.tree_offsets = np.column_stack((offsets_x - min_x, offsets_y))
+        self.x = x + self.tree_offsets[self.tree_numbers, 0]
+        self.y = y + self.tree_offsets[self.tree_numbers, 1]
+        return self
+
+    def get_coordinate_arrays(self):
+        """
+        Collects the names, the coordinates and the edges of the forest as arrays, like Graph.get_coordinate_arrays.
+        :return: ([str], np.ndarray, np.ndarray), names, n x 2 coordinates and m x 2 node indices of the edges
+        """
+        children = np.flatnonzero(self.parent >= 0)
+        return self.names, np.column_stack((self.x, self.y)), np.column_stack((self.parent[children], children))
+
+    def get_tree_arrays(self):
+        """
+        Collects the names, the coordinates and the parent of each node as arrays, like Graph.get_tree_arrays.
+        :return: ([str], np.ndarray, np.ndarray), names, n x 2 coordinates and parent numbers, -1 for root nodes
+        """
+        return self.names, np.column_stack((self.x, self.y)), self.parent
+
+    def get_layout_metrics(self):
+        """
+        Describes the packed layout for sizing its image, see Graph.get_coordinate_metrics.
+        :return: dict, min_x, max_x, min_y, max_y, levels, max_level_width, label_length and max_label_length
+        """
+        return Graph.get_coordinate_metrics(self.names, self.x, self.y)
+
+    @instrumented_stage('export')
+    def export_layout(self, filename: str, export_format='npz'):
+        """
+        Writes the coordinates of the forest into the output directory with the specified filename. The names of
+        different trees may be equal, so the edges are only written as node indices: the svg draws them and the
+        npz contains the arrays names, x, y, edges, tree (tree of each node) and offsets (offset of each tree).
+        :param filename: str, Filename without extension
+        :param export_format: str, svg or npz
+        :return: str, path of the written file
+        """
+        if export_format not in FOREST_EXPORT_FORMATS:
+            raise ValueError('Unknown forest export format ' + export_format + ', expected one of '
+                             + str(FOREST_EXPORT_FORMATS))
+        path = os.path.join('output', filename + '.' + export_format)
+        Graph.create_missing_dir(os.path.dirname(path))
+        if export_format == 'svg':
+            return graph_export.write_svg(self, path)
+
+        names, coordinates, edge_indices = self.get_coordinate_arrays()
+        with open(path, 'wb') as npz_file:
+            np.savez(npz_file, names=np.array(names, dtype=str), x=coordinates[:, 0], y=coordinates[:, 1],
+                     edges=edge_indices, tree=self.tree_numbers, offsets=self.tree_offsets)
+
+        return path
+
+    @instrumented_stage('draw')
+    def draw_graph(self, filename: str, scale_x=None, scale_y=None, dpi=None, image_format='png'):
+        """
+        Draws all trees of the forest into one image, like Graph.draw_graph.
+        :param filename: str, Filename for the image
+        :param scale_x: ?int
+        :param scale_y: ?int
+        :param dpi: ?int, resolution of raster images
+        :param image_format: str, png, svg or pdf
+        :return: str, path of the saved image
+        """
+        from module_render import GraphRenderer
+
+        figure_size = GraphRenderer.get_figure_size(self, scale_x, scale_y, dpi)
+        renderer = GraphRenderer(dpi=figure_size.dpi, image_format=image_format, node_size=figure_size.node_size,
+                                 font_size=figure_size.font_size, with_labels=figure_size.with_labels)
+        return renderer.render(self, filename, scale_x=figure_size.scale_x, scale_y=figure_size.scale_y)
@@ -0,0 +1,165 @@
+from collections import deque
+
+import numpy as np
+
+from .graph import Graph
+from .label_width import DEFAULT_FONT
+from .label_width import LABEL_UNITS_PER_EM
+from .label_width import get_label_width_estimator
+
+
+class CompactTree:
+    """
+    Class Compact Tree
+    Array representation of a tree in compressed sparse row form. The nodes are numbered in breadth first
+    order, so the children of node i are the consecutive nodes child_offsets[i] to child_offsets[i + 1] - 1
+    and the root node has the number 0. The branch lengths are optional, missing lengths are NaN.
+    The optional label widths are in layout units, the layout keeps the labels of neighboring nodes apart by them.
+    """
+
+    def __init__(self, names, parent, child_offsets=None, lengths=None):
+        """
+        Creates the tree from names and parent numbers, which already have to be in breadth first order.
+        :param names: [str], names of the nodes
+        :param parent: array-like of int, parent number of each node, -1 for the root node
+        :param child_offsets: ?array-like of int, offsets of the children, derived from the parents if missing
+        :param lengths: ?array-like of float, branch length of each node to its parent
+        """
+        self.names = names
+        self.parent = np.asarray(parent, dtype=np.int32)
+        if child_offsets is None:
+            child_counts = np.bincount(self.parent[1:], minlength=len(self.parent)) if len(self.parent) else []
+            child_offsets = np.empty(len(self.parent) + 1, dtype=np.int32)
+            child_offsets[0] = 1
+            child_offsets[1:] = 1 + np.cumsum(child_counts)
+        self.child_offsets = np.asarray(child_offsets, dtype=np.int32)
+        self.lengths = None if lengths is None else np.asarray(lengths, dtype=float)
+        self.prelim = np.zeros(len(self.parent))
+        self.mod = np.zeros(len(self.parent))
+        self.shift = np.zeros(len(self.parent))
+        self.change = np.zeros(len(self.parent))
+        self.x = np.full(len(self.parent), -1.0)
+        self.y = np.zeros(len(self.parent))
+        self.distance = 5
+        self.widths = None
+        self.label_units_per_em = None
+
+    def __len__(self):
+        return len(self.parent)
+
+    @staticmethod
+    def from_graph(graph: Graph):
+        """
+        Creates the compact tree from the nodes reachable from the root node of the graph, with the label widths
+        of the nodes if the graph has them.
+        :param graph: Graph
+        :return: CompactTree
+        """
+        names = []
+        parent = []
+        widths = []
+        queue = deque([(graph.root_node, -1)])
+        while queue:
+            node, parent_number = queue.popleft()
+            names.append(node.name)
+            parent.append(parent_number)
+            widths.append(node.width)
+            node_number = len(names) - 1
+            for child in node.children:
+                queue.append((child, node_number))
+
+        tree = CompactTree(names, parent)
+        tree.distance = graph.distance
+        if graph.label_units_per_em is not None:
+            tree.widths = np.array(widths, dtype=float)
+            tree.label_units_per_em = graph.label_units_per_em
+        return tree
+
+    @staticmethod
+    def from_parent_array(names, parent, lengths=None):
+        """
+        Creates the compact tree from names and parent numbers in any order.
+        The children of a node keep their relative order.
+        :param names: [str], names of the nodes
+        :param parent: array-like of int, parent number of each node, -1 for the root node
+        :param lengths: ?[?float], branch length of each node, None for a missing length
+        :return: CompactTree
+        """
+        parent = np.asarray(parent, dtype=np.int64)
+        order = np.argsort(parent, kind='stable')
+        child_counts = np.bincount(parent[parent >= 0], minlength=len(parent))
+        child_starts = np.concatenate(([0], np.cumsum(child_counts)))
+        children = order[np.count_nonzero(parent < 0):].tolist()
+        child_starts = child_starts.tolist()
+
+        breadth_first_order = [int(np.flatnonzero(parent < 0)[0])]
+        for node_number in breadth_first_order:
+            breadth_first_order.extend(children[child_starts[node_number]:child_starts[node_number + 1]])
+
+        new_numbers = np.empty(len(parent), dtype=np.int64)
+        new_numbers[breadth_first_order] = np.arange(len(breadth_first_order))
+        old_parents = parent[breadth_first_order]
+        new_parents = np.where(old_parents >= 0, new_numbers[np.maximum(old_parents, 0)], -1)
+
+        if lengths is not None:
+            lengths = np.array([np.nan if length is None else length for length in lengths], dtype=float)
+            lengths = lengths[breadth_first_order]
+        return CompactTree([names[number] for number in breadth_first_order], new_parents, lengths=lengths)
+
+    def get_children(self, node_number: int):
+        """
+        Returns the range of the child numbers of the node.
+        :param node_number: int
+        :return: range
+        """
+        return range(self.child_offsets[node_number], self.child_offsets[node_number + 1])
+
+    def set_label_widths(self, font=DEFAULT_FONT, units_per_em=LABEL_UNITS_PER_EM):
+        """
+        Sets the widths to the estimated width of the label of each node, see Graph.set_label_widths.
+        :param font: ?str, font of the labels, None removes the widths
+        :param units_per_em: float, layout units per em of the font
+        :return: None
+        """
+        if font is None:
+            self.widths = self.label_units_per_em = None
+        else:
+            self.widths = get_label_width_estimator(font).get_widths(self.names) * units_per_em
+            self.label_units_per_em = units_per_em
+
+    def nbytes(self):
+        """
+        Returns the amount of bytes used by the arrays of the tree. The names are not included.
+        :return: int
+        """
+        arrays = (self.parent, self.child_offsets, self.prelim, self.mod, self.shift, self.change, self.x, self.y,
+                  self.lengths, self.widths)
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    def to_graph(self):
+        """
+        Creates a graph with node objects from the tree. The coordinates are copied to the nodes.
+        :return: Graph
+        """
+        graph = Graph.create_graph_from_parent_array(self.names, self.parent.tolist())
+        graph.distance = self.distance
+        graph.label_units_per_em = self.label_units_per_em
+        widths = [0] * len(self) if self.widths is None else self.widths.tolist()
+        for node, x, y, width in zip(graph.nodes, self.x.tolist(), self.y.tolist(), widths):
+            node.x = x
+            node.y = y
+            node.width = width
+
+        return graph
+
+    def apply_coordinates(self, graph: Graph):
+        """
+        Copies the coordinates of the tree to the nodes of the graph with the same names.
+        :param graph: Graph
+        :return: None
+        """
+        for name, x, y in zip(self.names, self.x.tolist(), self.y.tolist()):
+            node = graph.get_node_by_name(name)
+            if node:
+                node.x = x
+                node.y = y
@@ -1,9 +1,18 @@
 import os
+from typing import TYPE_CHECKING
 
-import networkx as nx
-import matplotlib.pyplot as plt
+import numpy as np
 
+from module_instrumentation import instrumented_stage
+from . import graph_export
+from .label_width import DEFAULT_FONT
+from .label_width import LABEL_UNITS_PER_EM
+from .label_width import get_label_width_estimator
 from .node import Node
+from .tree_index import TreeIndex
+
+if TYPE_CHECKING:
+    import networkx as nx
 
 
 class Graph:
@@ -13,48 +22,265 @@ class Graph:
 
     def __init__(self):
         self.nodes = []
-        self.edges = []
+        # Edges which are not the parent links of a tree, e.g. of a layered graph. None for trees.
+        self.explicit_edges = None
+        self.__node_index = None
+        self.__tree_index = None
         self.root_node = None
         self.distance = 5
+        # Layout units per em of the label widths of the nodes, None if the layout ignores the labels.
+        self.label_units_per_em = None
+        # Bends of edges as lists of (x, y) points from the start to the end node, straight edges are missing.
+        self.edge_polylines = {}
+        # Nodes whose children changed since the last layout, used as ordered set for the incremental layout.
+        self.changed_nodes = {}
+
+    @staticmethod
+    @instrumented_stage('convert')
+    def create_graph_from_nx(nx_graph: 'nx.Graph'):
+        """
+        Creates a graph from a networkx graph in one pass over the nodes and one pass over the edges,
+        see create_graph_from_edge_list. The children are ordered by their 'child_position'.
+        :param nx_graph: nx.Graph, nodes have to provide a name attribute
+        :return: Graph
+        """
+        names = []
+        child_positions = []
+        for nx_node, attributes in nx_graph.nodes(data=True):
+            names.append(nx_node.name)
+            child_positions.append(attributes.get('child_position', 0))
+
+        return Graph.create_graph_from_edge_list(names, ((edge_from.name, edge_to.name)
+                                                         for edge_from, edge_to in nx_graph.edges()), child_positions)
 
     @staticmethod
-    def create_graph_from_nx(nx_graph: nx.Graph):
+    def create_graph_from_edge_list(names, edges, child_positions=None):
+        """
+        Creates a graph from node names and (name, name) edges. Nodes are identified by their name, so nodes and
+        edges with the same names are merged, names which only occur in the edges are added in the order of the
+        edges. Self loops are skipped. Like in create_graph_from_parent_array equal names share one string: the
+        stored edges use the names of their nodes, so the name index is the table of the shared names.
+        Each node keeps the last parent it is connected to. The children are ordered by their child positions
+        and else by the order of the nodes. The edges are only stored if they are not exactly the parent links.
+        :param names: [str]
+        :param edges: iterable of (str, str)
+        :param child_positions: ?[int], position of each node within the children of its parent
+        :return: Graph
+        """
         graph = Graph()
-        graph_nodes = []
-        new_edges = []
-        for node in nx_graph.nodes.items():
-            new_node = Node(name=node[0].name)
-            new_node.number = node[1]['child_position']
-            edges_to = {}
-            parent = None
-            for edge in nx_graph.edges:
-                try:
-                    edge_from, edge_to, weight = edge
-                except ValueError:
-                    edge_from, edge_to = edge
-                new_edges.append((edge_from.name, edge_to.name))
-                if edge_from.name is node[0].name:
-                    child_pos = [node[1]['child_position'] for node in nx_graph.nodes.items() if node[0] == edge_to][0]
-                    edges_to[child_pos] = edge_to.name
-                elif edge_to.name is node[0].name:
-                    parent = edge_from.name
-
-            new_node.edges_to = edges_to
-            new_node.parent = parent
-
-            if not parent:
-                new_node.root = True
-                graph.root_node = new_node
-
-            graph_nodes.append(new_node)
-
-        graph.nodes = graph_nodes
-        graph.edges = new_edges
-
-        graph.replace_node_names_with_node_objects()
+        node_index = graph.node_index
+        for position, name in enumerate(names):
+            if name in node_index:
+                continue
+            new_node = Node(name=name)
+            if child_positions is not None:
+                new_node.number = child_positions[position]
+            graph.add_node(new_node)
+
+        known_edges = set()
+        edge_list = []
+        for edge_from, edge_to in edges:
+            for name in (edge_from, edge_to):
+                if name not in node_index:
+                    graph.add_node(Node(name=name))
+            edge = (node_index[edge_from].name, node_index[edge_to].name)
+            if edge in known_edges or edge_from == edge_to:
+                continue
+            known_edges.add(edge)
+            edge_list.append(edge)
+            node_index[edge_to].parent = node_index[edge_from]
+        del known_edges
+
+        children = {}
+        for node in graph.nodes:
+            if node.parent:
+                children.setdefault(node.parent, []).append(node)
+            else:
+                graph.root_node = node
+
+        for parent, child_nodes in children.items():
+            child_nodes.sort(key=lambda child: child.number)
+            parent.set_children(child_nodes)
+            parent.link_children()
+
+        if len(edge_list) != len(graph.nodes) - sum(1 for node in graph.nodes if node.parent is None):
+            graph.explicit_edges = edge_list
 
         return graph
 
+    @staticmethod
+    def create_graph_from_parent_array(names, parents):
+        """
+        Creates a graph from node names and parent numbers. The parent number of the root node is -1.
+        The children of a node are ordered by their numbers. Equal names share one string, the table of the
+        shared names is dropped afterwards, so unique names do not pay for it like with sys.intern.
+        :param names: [str]
+        :param parents: [int]
+        :return: Graph
+        """
+        graph = Graph()
+        shared_names = {}
+        nodes = [graph.add_node(Node(name=shared_names.setdefault(name, name))) for name in names]
+        del shared_names
+        children = {}
+        for node, parent_number in zip(nodes, parents):
+            if parent_number < 0:
+                graph.root_node = node
+            else:
+                node.parent = nodes[parent_number]
+                children.setdefault(parent_number, []).append(node)
+
+        for parent_number, child_nodes in children.items():
+            nodes[parent_number].set_children(child_nodes)
+            nodes[parent_number].link_children()
+
+        return graph
+
+    @property
+    def node_index(self):
+        """
+        Returns the nodes by name. The index is built on the first access and kept up to date afterwards.
+        :return: {str: Node}
+        """
+        if self.__node_index is None:
+            self.__node_index = {node.name: node for node in self.nodes}
+        return self.__node_index
+
+    def get_tree_index(self):
+        """
+        Returns the structural index of the tree below the root node: levels, subtree sizes, pre- and post-order
+        numbers and lowest common ancestors. It is built on the first call and dropped by every change of the tree
+        through the graph. Changes of the children of a node outside of the graph are not noticed.
+        :return: TreeIndex
+        """
+        if self.__tree_index is None or self.__tree_index.root_node is not self.root_node:
+            if self.root_node is None:
+                raise ValueError('The graph has no root node')
+            self.__tree_index = TreeIndex(self.root_node)
+        return self.__tree_index
+
+    def add_node(self, node: Node):
+        """
+        Adds the node to the graph and registers it in the name index if the index has been built.
+        :param node: Node
+        :return: Node
+        """
+        self.nodes.append(node)
+        if self.__node_index is not None:
+            self.__node_index[node.name] = node
+        return node
+
+    @property
+    def edges(self):
+        """
+        Returns the edges as (name, name) pairs. For trees they are derived from the parent links on each call.
+        :return: [(str, str)]
+        """
+        if self.explicit_edges is not None:
+            return self.explicit_edges
+        return [(node.parent.name, node.name) for node in self.nodes if node.parent is not None]
+
+    @edges.setter
+    def edges(self, edges):
+        self.explicit_edges = list(edges)
+
+    def add_child(self, parent: Node, child, position=None):
+        """
+        Adds a new child to the parent node. The child may be a name or a node with its own subtree,
+        which is grafted in as a whole. The nodes are added to the node list and the name index.
+        The coordinates of the new nodes are unset until the next layout.
+        :param parent: Node, node of the graph
+        :param child: str or Node, name of the new leaf or root of the new subtree
+        :param position: ?int, position within the children of the parent, the child is appended if None
+        :return: Node, the added child
+        """
+        if not isinstance(child, Node):
+            child = Node(name=child)
+        # All names of the subtree are checked before the graph is changed, so a failed graft changes nothing.
+        subtree_nodes = [child]
+        subtree_names = set()
+        for node in subtree_nodes:
+            if node.name in self.node_index or node.name in subtree_names:
+                raise ValueError('The graph already contains a node named ' + str(node.name))
+            subtree_names.add(node.name)
+            subtree_nodes.extend(node.children)
+        del subtree_names
+
+        children = list(parent.children)
+        children.insert(len(children) if position is None else position, child)
+        child.parent = parent
+        self.__set_children(parent, children)
+
+        for node in subtree_nodes:
+            node.x = -1
+            node.y = 0
+            self.add_node(node)
+            if self.explicit_edges is not None:
+                self.explicit_edges.append((node.parent.name, node.name))
+            if node.children:
+                node.link_children()
+                self.changed_nodes[node] = None
+                for node_child in node.children:
+                    node_child.parent = node
+
+        return child
+
+    def remove_subtree(self, node: Node):
+        """
+        Removes the node and all its descendants from the graph. The root node cannot be removed.
+        The node and edge lists are filtered once, so the cost is linear in the size of the graph.
+        :param node: Node, node of the graph
+        :return: [Node], removed nodes in breadth first order
+        """
+        if node.parent is None:
+            raise ValueError('The root node ' + str(node.name) + ' cannot be removed')
+
+        parent = node.parent
+        self.__set_children(parent, [child for child in parent.children if child is not node])
+        node.parent = None
+
+        removed_nodes = [node]
+        for removed_node in removed_nodes:
+            removed_nodes.extend(removed_node.children)
+        removed_names = set()
+        for removed_node in removed_nodes:
+            removed_names.add(removed_node.name)
+            del self.node_index[removed_node.name]
+            self.changed_nodes.pop(removed_node, None)
+
+        self.nodes = [graph_node for graph_node in self.nodes if graph_node.name not in removed_names]
+        if self.explicit_edges is not None:
+            self.explicit_edges = [edge for edge in self.explicit_edges if edge[1] not in removed_names]
+        for edge in [edge for edge in self.edge_polylines if edge[1] in removed_names]:
+            del self.edge_polylines[edge]
+
+        return removed_nodes
+
+    def reorder_children(self, parent: Node, children):
+        """
+        Sets a new order for the children of the parent node.
+        :param parent: Node, node of the graph
+        :param children: [Node], the current children of the parent in the new order
+        :return: None
+        """
+        current_children = parent.children
+        if len(children) != len(current_children) or set(map(id, children)) != set(map(id, current_children)):
+            raise ValueError('The new order has to contain exactly the children of ' + str(parent.name))
+
+        self.__set_children(parent, list(children))
+
+    def __set_children(self, parent: Node, children):
+        """
+        Replaces the children of the parent node and marks it as changed for the incremental layout.
+        :param parent: Node
+        :param children: [Node]
+        :return: None
+        """
+        parent.set_children(children)
+        parent.link_children()
+        self.changed_nodes[parent] = None
+        self.__tree_index = None
+
     @staticmethod
     def create_missing_dir(path):
         """
@@ -72,6 +298,8 @@ class Graph:
         :param fig_name: str; Filename for the saved figure
         :return: None
         """
+        import matplotlib.pyplot as plt
+
         directories = '/'.join(fig_name.split('/')[:-1])
         Graph.create_missing_dir('output/' + directories)
         plt.savefig('output/' + fig_name + '.png', dpi=500, bbox_inches=None, format=None)
@@ -86,13 +314,17 @@ class Graph:
     def replace_node_names_with_node_objects(self):
         """
         Iterates over the node list and replaces the name strings with the node objects.
+        Entries which already are node objects are kept.
         :return: None
         """
         for node in self.nodes:
-            for key, node_to in node.edges_to.items():
-                node.edges_to[key] = self.get_node_by_name(node_to)
+            if any(isinstance(node_to, str) for node_to in node.children):
+                node.set_children(self.get_node_by_name(node_to) if isinstance(node_to, str) else node_to
+                                  for node_to in node.children)
 
-            node.parent = self.get_node_by_name(node.parent)
+            if isinstance(node.parent, str):
+                node.parent = self.get_node_by_name(node.parent)
+        self.__tree_index = None
 
     def get_node_by_name(self, node_name):
         """
@@ -100,22 +332,41 @@ class Graph:
         :param node_name: str
         :return: ?Node
         """
-        for node in self.nodes:
-            if node_name == node.name:
-                return node
-
-        return None
+        return self.node_index.get(node_name)
 
     def get_level(self, node: Node):
         """
-        Returns the level of the node. The level is the length of the pass to the root node.
+        Returns the level of the node, the root node is on level 1.
         :param node: Node
         :return: int
         """
-        if node == self.root_node:
-            return 1
+        return self.get_tree_index().get_level(node)
 
-        return 1 + self.get_level(node.parent)
+    def get_subtree_size(self, node: Node):
+        """
+        Returns the amount of nodes in the subtree of the node, including the node itself.
+        :param node: Node
+        :return: int
+        """
+        return self.get_tree_index().get_subtree_size(node)
+
+    def is_ancestor(self, ancestor: Node, node: Node):
+        """
+        Tests if the first node is an ancestor of the second one. A node is its own ancestor.
+        :param ancestor: Node
+        :param node: Node
+        :return: bool
+        """
+        return self.get_tree_index().is_ancestor(ancestor, node)
+
+    def get_lowest_common_ancestor(self, node_a: Node, node_b: Node):
+        """
+        Returns the deepest node, which is an ancestor of both nodes, e.g. the root of the clade of both.
+        :param node_a: Node
+        :param node_b: Node
+        :return: Node
+        """
+        return self.get_tree_index().get_lowest_common_ancestor(node_a, node_b)
 
     def count_roots(self):
         """
@@ -164,49 +415,124 @@ class Graph:
 
         return node_dict
 
-    def draw_graph(self, filename: str, scale_x=10, scale_y=10):
+    def get_coordinate_arrays(self):
         """
-        Draws the current graph from top to bottom. The image is then shown and
-        also saved in the output directory with the specified filename.
-        The scale parameters define the size of the image.
-        :param filename: str, Filename for the images
-        :param scale_x: int
-        :param scale_y: int
+        Collects the names, the coordinates and the edges of the graph as arrays.
+        :return: ([str], np.ndarray, np.ndarray), names, n x 2 coordinates and m x 2 node indices of the edges
+        """
+        names = [node.name for node in self.nodes]
+        coordinates = np.array([(node.x, node.y) for node in self.nodes], dtype=float).reshape(-1, 2)
+        node_positions = {name: position for position, name in enumerate(names)}
+        edge_indices = np.array([(node_positions[edge_from], node_positions[edge_to])
+                                 for edge_from, edge_to in self.edges], dtype=np.int64).reshape(-1, 2)
+
+        return names, coordinates, edge_indices
+
+    def get_tree_arrays(self):
+        """
+        Collects the names, the coordinates and the parent of each node as arrays. Only the parent links are
+        described, other edges of the graph are left out.
+        :return: ([str], np.ndarray, np.ndarray), names, n x 2 coordinates and parent numbers, -1 for root nodes
+        """
+        node_numbers = {id(node): number for number, node in enumerate(self.nodes)}
+        names = [node.name for node in self.nodes]
+        coordinates = np.array([(node.x, node.y) for node in self.nodes], dtype=float).reshape(-1, 2)
+        parent = np.array([node_numbers.get(id(node.parent), -1) for node in self.nodes], dtype=np.int64)
+
+        return names, coordinates, parent
+
+    def set_label_widths(self, font=DEFAULT_FONT, units_per_em=LABEL_UNITS_PER_EM):
+        """
+        Sets the width of each node to the estimated width of its label, so the next layout keeps the labels of
+        neighboring nodes apart. Nodes added afterwards have no width until this is called again.
+        :param font: ?str, font of the labels, None removes the widths
+        :param units_per_em: float, layout units per em of the font
         :return: None
         """
-        node_dict = self.get_node_names_with_pos()
-        nx_graph = nx.DiGraph()
-        nx_graph.add_nodes_from(node_dict.keys())
+        if font is None:
+            widths = [0] * len(self.nodes)
+            self.label_units_per_em = None
+        else:
+            widths = (get_label_width_estimator(font).get_widths(node.name for node in self.nodes)
+                      * units_per_em).tolist()
+            self.label_units_per_em = units_per_em
+        for node, width in zip(self.nodes, widths):
+            node.width = width
+
+    def get_layout_metrics(self):
+        """
+        Describes the computed layout for sizing its image, see get_coordinate_metrics.
+        :return: dict, min_x, max_x, min_y, max_y, levels, max_level_width, label_length, max_label_length
+            and label_units_per_em
+        """
+        return dict(Graph.get_coordinate_metrics([node.name for node in self.nodes],
+                                                 np.array([node.x for node in self.nodes], dtype=float),
+                                                 np.array([node.y for node in self.nodes], dtype=float)),
+                    label_units_per_em=self.label_units_per_em)
 
-        nx_graph.add_edges_from(self.edges)
+    @staticmethod
+    def get_coordinate_metrics(names, x, y):
+        """
+        Describes a computed layout for sizing its image: the extent, the amount of levels, the amount of nodes
+        on the widest level and the label lengths. The typical label length is the 90th percentile,
+        so single long labels do not widen the whole image. Nodes between two levels count to the nearest one.
+        :param names: [str]
+        :param x: np.ndarray
+        :param y: np.ndarray
+        :return: dict, min_x, max_x, min_y, max_y, levels, max_level_width, label_length and max_label_length
+        """
+        if not len(names):
+            return {'min_x': 0.0, 'max_x': 0.0, 'min_y': 0.0, 'max_y': 0.0, 'levels': 0, 'max_level_width': 0,
+                    'label_length': 0, 'max_label_length': 0}
 
-        plt.figure(1, figsize=(scale_x, scale_y))
-        nx.draw(nx_graph, node_dict, with_labels=True)
-        plt.gca().invert_yaxis()
-        Graph.save_fig(filename)
-        plt.show()
+        label_lengths = np.array([len(str(name)) for name in names])
+        level_widths = np.unique(np.rint(y), return_counts=True)[1]
+
+        return {'min_x': float(x.min()), 'max_x': float(x.max()), 'min_y': float(y.min()), 'max_y': float(y.max()),
+                'levels': len(level_widths), 'max_level_width': int(level_widths.max()),
+                'label_length': int(np.percentile(label_lengths, 90)), 'max_label_length': int(label_lengths.max())}
+
+    @instrumented_stage('export')
+    def export_layout(self, filename: str, export_format='json'):
+        """
+        Writes the coordinates and edges of the graph into the output directory with the specified filename.
+        No plotting library is used.
+        :param filename: str, Filename without extension
+        :param export_format: str, svg, json, ndjson or npz
+        :return: str, path of the written file
+        """
+        path = os.path.join('output', filename + '.' + export_format)
+        Graph.create_missing_dir(os.path.dirname(path))
+        return graph_export.write_layout(self, path, export_format)
+
+    @instrumented_stage('draw')
+    def draw_graph(self, filename: str, scale_x=None, scale_y=None, dpi=None, image_format='png', show=False):
+        """
+        Draws the current graph from top to bottom. The image is saved in the output directory
+        with the specified filename and only shown if requested.
+        The scale parameters define the size of the image, without them it is derived from the layout.
+        :param filename: str, Filename for the images
+        :param scale_x: ?int
+        :param scale_y: ?int
+        :param dpi: ?int, resolution of raster images
+        :param image_format: str, png, svg or pdf
+        :param show: bool, shows the image in a window, which blocks until it is closed
+        :return: str, path of the saved image
+        """
+        from module_render import GraphRenderer
+
+        figure_size = GraphRenderer.get_figure_size(self, scale_x, scale_y, dpi)
+        renderer = GraphRenderer(dpi=figure_size.dpi, image_format=image_format, node_size=figure_size.node_size,
+                                 font_size=figure_size.font_size, with_labels=figure_size.with_labels)
+        return renderer.render(self, filename, scale_x=figure_size.scale_x, scale_y=figure_size.scale_y, show=show)
 
     def print_breadth_first_search(self, node: Node):
         """
-        Prints a list for each level with the belonging node names. The tree is traversed with Breadth First Search.
+        Prints a list for each level of the subtree of the node with the belonging node names from left to right.
         :param node: node
         :return: None
         """
-        queue = [node]
-        labeled_queue = [node]
-        level_dict = {}
-        while queue:
-            current_node = queue[0]
-            queue.remove(current_node)
-            current_level = self.get_level(current_node)
-            if current_level in level_dict:
-                level_dict[current_level].append(current_node.name)
-            else:
-                level_dict[current_level] = [current_node.name]
-            for pos, child in current_node.edges_to.items():
-                if child not in labeled_queue:
-                    labeled_queue.append(child)
-                    queue.append(child)
-
-        for i in range(1, len(level_dict) + 1):
-            print(i, level_dict[i])
+        level = self.get_level(node)
+        for level_nodes in self.get_tree_index().get_subtree_levels(node):
+            print(level, [level_node.name for level_node in level_nodes])
+            level += 1
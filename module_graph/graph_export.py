@@ -0,0 +1,111 @@
+import json
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+EXPORT_FORMATS = ('svg', 'json', 'ndjson', 'npz')
+
+
+def write_svg(graph, path: str, scale_x=10, scale_y=50, margin=20, node_radius=3, font_size=8):
+    """
+    Writes the layout of the graph as SVG. The nodes are written one by one, so the overhead per node is constant.
+    :param graph: Graph or CompactForest
+    :param path: str, path of the file
+    :param scale_x: float, pixels per x unit
+    :param scale_y: float, pixels per level
+    :param margin: float, margin around the drawing in pixels
+    :param node_radius: float, radius of the node circles in pixels
+    :param font_size: float, font size of the labels in pixels
+    :return: str, path of the file
+    """
+    names, coordinates, edge_indices = graph.get_coordinate_arrays()
+    minimum = coordinates.min(axis=0) if len(coordinates) else np.zeros(2)
+    maximum = coordinates.max(axis=0) if len(coordinates) else np.zeros(2)
+    width = (maximum[0] - minimum[0]) * scale_x + 2 * margin
+    height = (maximum[1] - minimum[1]) * scale_y + 2 * margin
+    pixels = ((coordinates - minimum) * (scale_x, scale_y) + margin).tolist()
+
+    with open(path, 'w', encoding='utf-8') as svg_file:
+        svg_file.write('<svg xmlns="http://www.w3.org/2000/svg" width="%g" height="%g" viewBox="0 0 %g %g">\n'
+                       % (width, height, width, height))
+        svg_file.write('<g stroke="black" stroke-width="1">\n')
+        for edge_from, edge_to in edge_indices.tolist():
+            svg_file.write('<line x1="%g" y1="%g" x2="%g" y2="%g"/>\n' % tuple(pixels[edge_from] + pixels[edge_to]))
+        svg_file.write('</g>\n<g fill="#1f78b4">\n')
+        for x, y in pixels:
+            svg_file.write('<circle cx="%g" cy="%g" r="%g"/>\n' % (x, y, node_radius))
+        svg_file.write('</g>\n<g font-size="%g" text-anchor="middle" font-family="sans-serif">\n' % font_size)
+        for name, (x, y) in zip(names, pixels):
+            svg_file.write('<text x="%g" y="%g">%s</text>\n' % (x, y - node_radius - 2, escape(str(name))))
+        svg_file.write('</g>\n</svg>\n')
+
+    return path
+
+
+def write_json(graph, path: str):
+    """
+    Writes the layout of the graph as one JSON object with a list of nodes and a list of edges.
+    The elements are written one by one instead of building the whole document in memory.
+    :param graph: Graph
+    :param path: str, path of the file
+    :return: str, path of the file
+    """
+    with open(path, 'w', encoding='utf-8') as json_file:
+        json_file.write('{"nodes": [')
+        for position, node in enumerate(graph.nodes):
+            json_file.write((',\n' if position else '\n')
+                            + json.dumps({'name': node.name, 'x': node.x, 'y': node.y}))
+        json_file.write('\n], "edges": [')
+        for position, edge in enumerate(graph.edges):
+            json_file.write((',\n' if position else '\n') + json.dumps(edge))
+        json_file.write('\n]}\n')
+
+    return path
+
+
+def write_ndjson(graph, path: str):
+    """
+    Writes the layout of the graph as newline delimited JSON. Each node is one line {"node", "x", "y"},
+    followed by one line {"edge": [from, to]} for each edge.
+    :param graph: Graph
+    :param path: str, path of the file
+    :return: str, path of the file
+    """
+    with open(path, 'w', encoding='utf-8') as ndjson_file:
+        for node in graph.nodes:
+            ndjson_file.write(json.dumps({'node': node.name, 'x': node.x, 'y': node.y}) + '\n')
+        for edge in graph.edges:
+            ndjson_file.write(json.dumps({'edge': edge}) + '\n')
+
+    return path
+
+
+def write_npz(graph, path: str):
+    """
+    Writes the layout of the graph as NumPy archive with the arrays names, x, y and edges.
+    The edges are an m x 2 array of indices into the other arrays.
+    :param graph: Graph
+    :param path: str, path of the file
+    :return: str, path of the file
+    """
+    names, coordinates, edge_indices = graph.get_coordinate_arrays()
+    with open(path, 'wb') as npz_file:
+        np.savez(npz_file, names=np.array(names, dtype=str), x=coordinates[:, 0], y=coordinates[:, 1],
+                 edges=edge_indices)
+
+    return path
+
+
+def write_layout(graph, path: str, export_format: str):
+    """
+    Writes the layout of the graph in the export format.
+    :param graph: Graph
+    :param path: str, path of the file
+    :param export_format: str, svg, json, ndjson or npz
+    :return: str, path of the file
+    """
+    writers = {'svg': write_svg, 'json': write_json, 'ndjson': write_ndjson, 'npz': write_npz}
+    if export_format not in writers:
+        raise ValueError('Unknown export format ' + export_format + ', expected one of ' + str(EXPORT_FORMATS))
+
+    return writers[export_format](graph, path)
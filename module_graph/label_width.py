@@ -0,0 +1,92 @@
+import functools
+
+import numpy as np
+
+DEFAULT_FONT = 'DejaVu Sans'
+# Layout units per em of the label font, with the distance of 5 the labels of neighboring nodes are two em apart.
+LABEL_UNITS_PER_EM = 2.5
+# Advance of the printable ASCII characters from ' ' to '~' in em, read from the fonts shipped with matplotlib.
+FONT_GLYPH_ADVANCES = {
+    'DejaVu Sans': (
+        0.318, 0.401, 0.46, 0.838, 0.636, 0.95, 0.78, 0.275, 0.39, 0.39, 0.5, 0.838, 0.318, 0.361, 0.318, 0.337,
+        0.636, 0.636, 0.636, 0.636, 0.636, 0.636, 0.636, 0.636, 0.636, 0.636, 0.337, 0.337, 0.838, 0.838, 0.838,
+        0.531, 1.0, 0.684, 0.686, 0.698, 0.77, 0.632, 0.575, 0.775, 0.752, 0.295, 0.295, 0.656, 0.557, 0.863,
+        0.748, 0.787, 0.603, 0.787, 0.695, 0.635, 0.611, 0.732, 0.684, 0.989, 0.685, 0.611, 0.685, 0.39, 0.337,
+        0.39, 0.838, 0.5, 0.5, 0.613, 0.635, 0.55, 0.635, 0.615, 0.352, 0.635, 0.634, 0.278, 0.278, 0.579, 0.278,
+        0.974, 0.634, 0.612, 0.635, 0.635, 0.411, 0.521, 0.392, 0.634, 0.592, 0.818, 0.592, 0.592, 0.525, 0.636,
+        0.337, 0.636, 0.838
+    ),
+    'DejaVu Sans Mono': (0.602,) * 95
+}
+_FIRST_CHARACTER = 32
+
+
+class LabelWidthEstimator:
+    """
+    Class Label Width Estimator
+    Estimates the width of labels in em from the advance of each glyph of a font, without loading the font or
+    a plotting library. Characters outside of the table, like other scripts, get the fallback advance, kerning is
+    ignored. Single labels are measured through a least recently used cache, a list of labels is measured at once
+    with array operations on the code points of all labels.
+    """
+
+    def __init__(self, font=DEFAULT_FONT, fallback_advance=1.0, cache_size=65536):
+        """
+        :param font: str, name of a font in FONT_GLYPH_ADVANCES
+        :param fallback_advance: float, advance in em of the characters which are not in the table
+        :param cache_size: int, amount of labels whose width is kept
+        """
+        if font not in FONT_GLYPH_ADVANCES:
+            raise ValueError('Unknown font ' + font + ', expected one of ' + str(tuple(FONT_GLYPH_ADVANCES)))
+        self.font = font
+        self.fallback_advance = fallback_advance
+        # One entry per code point below 128 and a last entry for all other code points.
+        self.advances = np.full(129, float(fallback_advance))
+        self.advances[_FIRST_CHARACTER:_FIRST_CHARACTER + len(FONT_GLYPH_ADVANCES[font])] = FONT_GLYPH_ADVANCES[font]
+        self.__advance_list = self.advances.tolist()
+        self.__cached_width = functools.lru_cache(maxsize=cache_size)(self.__measure_width)
+
+    def get_width(self, label):
+        """
+        Returns the width of one label in em, repeated labels are taken from the cache.
+        :param label: ?str, None has no width
+        :return: float
+        """
+        return self.__cached_width('' if label is None else str(label))
+
+    def get_widths(self, labels):
+        """
+        Returns the width of each label in em. All labels are encoded as one array of code points, whose advances
+        are summed up per label.
+        :param labels: iterable of ?str, None has no width
+        :return: np.ndarray
+        """
+        labels = ['' if label is None else str(label) for label in labels]
+        lengths = np.fromiter(map(len, labels), dtype=np.int64, count=len(labels))
+        code_points = np.frombuffer(''.join(labels).encode('utf-32-le'), dtype='<u4')
+        advance_sums = np.zeros(len(code_points) + 1)
+        np.cumsum(self.advances[np.minimum(code_points, len(self.advances) - 1)], out=advance_sums[1:])
+        ends = np.cumsum(lengths)
+        return advance_sums[ends] - advance_sums[ends - lengths]
+
+    def get_cache_info(self):
+        """
+        Returns the hits, misses and size of the cache of single labels.
+        :return: functools._CacheInfo
+        """
+        return self.__cached_width.cache_info()
+
+    def __measure_width(self, label: str):
+        advances = self.__advance_list
+        last = len(advances) - 1
+        return sum([advances[min(ord(character), last)] for character in label])
+
+
+@functools.lru_cache(maxsize=None)
+def get_label_width_estimator(font=DEFAULT_FONT):
+    """
+    Returns the estimator of the font, which is shared within the process, so its cache is kept between layouts.
+    :param font: str, name of a font in FONT_GLYPH_ADVANCES
+    :return: LabelWidthEstimator
+    """
+    return LabelWidthEstimator(font)
@@ -1,19 +1,42 @@
+# Children of all leaves, so a leaf allocates no container of its own.
+LEAF = ()
+
+
 class Node:
+    """
+    Class Node
+    The attributes are slots, so a node has no __dict__. The children are a tuple of exactly their size,
+    leaves share the empty tuple LEAF.
+    """
+
+    __slots__ = ('name', 'children', 'parent', 'mod', 'thread', 'prelim', 'ancestor', 'change', 'shift', 'number',
+                 'midpoint', 'journal', 'x', 'y', 'width')
 
     def __init__(self, name):
         self.name = name
-        self.edges_to = {}
+        self.children = LEAF
         self.parent = None
         self.mod = 0
         self.thread = None
-        self.root = False
         self.prelim = 0
         self.ancestor = self
         self.change = 0
         self.shift = 0
         self.number = 0
+        self.midpoint = 0
+        self.journal = None
         self.x = -1
         self.y = 0
+        # Width of the label in layout units, the layout keeps the labels of neighboring nodes apart by it.
+        self.width = 0
+
+    @property
+    def root(self):
+        """
+        A node without parent is a root node.
+        :return: bool
+        """
+        return self.parent is None
 
     def get_x_or_y(self, position):
         """
@@ -28,32 +51,30 @@ class Node:
 
     def get_siblings(self):
         """
-        Returns the dictionary of all siblings from the current node.
-        :return: dict
+        Returns the children of the parent of the current node, including the node itself.
+        :return: [Node]
         """
         if self.parent:
-            return self.parent.edges_to
+            return self.parent.children
 
-        return {}
+        return LEAF
 
     def get_left_most_sibling(self):
         """
         Returns the left most sibling of the current node. If the left most is the node self None is returned.
         :return: ?Node
         """
-        if self.parent:
-            left_most_node = self.parent.edges_to[0]
-            if left_most_node is not self:
-                return left_most_node
-
+        if self.number > 0 and self.parent is not None:
+            return self.parent.children[0]
         return None
 
     def get_position(self):
-
+        """
+        Returns the position of the node within the children of its parent. -1 is returned for the root node.
+        :return: int
+        """
         if self.parent:
-            for position, node in self.parent.edges_to.items():
-                if node is self:
-                    return position
+            return self.number
         return -1
 
     def get_left_sibling(self):
@@ -61,14 +82,24 @@ class Node:
         Returns the left sibling of the node. If the node has no left sibling None is returned
         :return: ?Node
         """
-        node_position = self.get_position()
-
-        if node_position == 0 or node_position == -1:
-            return None
+        if self.number > 0 and self.parent is not None:
+            return self.parent.children[self.number - 1]
+        return None
 
-        siblings = self.get_siblings()
-        for position, node_name in siblings.items():
-            if position == node_position - 1:
-                    return siblings[position]
+    def set_children(self, children):
+        """
+        Replaces the children, without children the node is a leaf again.
+        :param children: [Node]
+        :return: None
+        """
+        children = tuple(children)
+        self.children = children if children else LEAF
 
-        return None
+    def link_children(self):
+        """
+        Stores the position of each child, the siblings are found by it.
+        Has to be called whenever the children of the node change.
+        :return: None
+        """
+        for position, child in enumerate(self.children):
+            child.number = position
@@ -0,0 +1,150 @@
+import os
+
+import numpy as np
+
+from module_instrumentation import instrumented_stage
+from . import graph_export
+from .compact_tree import CompactTree
+from .graph import Graph
+
+PHYLOGRAM_PROJECTIONS = ('rectangular', 'radial')
+PHYLOGRAM_EXPORT_FORMATS = ('svg', 'npz')
+
+
+class Phylogram:
+    """
+    Class Phylogram
+    Drawing of a laid out CompactTree, in which the distance of a node from the root node is the sum of the branch
+    lengths on its path instead of its level. The x coordinates of the Walker layout are kept. The root distances
+    are scaled, so the farthest node is as far from the root node as the deepest level of the cladogram.
+    In the rectangular projection the root distance is the y coordinate. In the radial projection the x coordinate
+    becomes the angle and the root distance the radius, the leaves on the outer circle keep the distance of the
+    layout. All coordinates are computed with whole array operations on the nodes.
+    """
+
+    def __init__(self, tree: CompactTree, projection='rectangular', missing_length=1.0):
+        """
+        :param tree: CompactTree, with calculated coordinates
+        :param projection: str, rectangular or radial
+        :param missing_length: float, branch length of the nodes without length, also used for trees without lengths
+        """
+        if projection not in PHYLOGRAM_PROJECTIONS:
+            raise ValueError('Unknown projection ' + projection + ', expected one of ' + str(PHYLOGRAM_PROJECTIONS))
+        self.tree = tree
+        self.projection = projection
+        self.names = tree.names
+        self.parent = tree.parent.astype(np.int64)
+        self.distance = tree.distance
+        self.edge_polylines = {}
+        self.root_distances = self.__get_root_distances(missing_length)
+
+        levels = float(tree.y.max(initial=1)) - 1
+        max_root_distance = float(self.root_distances.max(initial=0))
+        radius = self.root_distances * (levels / max_root_distance) if max_root_distance > 0 else tree.y - 1
+        if projection == 'rectangular':
+            self.x = tree.x
+            self.y = radius + 1
+        else:
+            min_x = float(tree.x.min(initial=0))
+            circumference = float(tree.x.max(initial=0)) - min_x + self.distance
+            angles = (tree.x - min_x) * (2 * np.pi / circumference)
+            # One level is as long as the outer circle holds distances, so the leaves are one distance apart.
+            radius = radius * (circumference / (2 * np.pi * max(levels, 1)))
+            self.x = radius * np.cos(angles)
+            self.y = radius * np.sin(angles)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __get_root_distances(self, missing_length: float):
+        """
+        Sums the branch lengths from each node up to the root node by jumping along the ancestors, each step doubles
+        the length of the jump, so the amount of steps only grows with the logarithm of the depth of the tree.
+        :param missing_length: float
+        :return: np.ndarray
+        """
+        if self.tree.lengths is None:
+            lengths = np.full(len(self.parent), float(missing_length))
+        else:
+            lengths = np.where(np.isnan(self.tree.lengths), missing_length, self.tree.lengths)
+        # The root node points to itself with the length 0, so the jumps stop at the root node.
+        top = np.where(self.parent >= 0, self.parent, np.arange(len(self.parent)))
+        lengths[self.parent < 0] = 0
+        while True:
+            lengths = lengths + lengths[top]
+            next_top = top[top]
+            if np.array_equal(next_top, top):
+                break
+            top = next_top
+
+        return lengths
+
+    def get_coordinate_arrays(self):
+        """
+        Collects the names, the coordinates and the edges of the phylogram as arrays, like Graph.get_coordinate_arrays.
+        :return: ([str], np.ndarray, np.ndarray), names, n x 2 coordinates and m x 2 node indices of the edges
+        """
+        children = np.flatnonzero(self.parent >= 0)
+        return self.names, np.column_stack((self.x, self.y)), np.column_stack((self.parent[children], children))
+
+    def get_tree_arrays(self):
+        """
+        Collects the names, the coordinates and the parent of each node as arrays, like Graph.get_tree_arrays.
+        :return: ([str], np.ndarray, np.ndarray), names, n x 2 coordinates and parent numbers, -1 for the root node
+        """
+        return self.names, np.column_stack((self.x, self.y)), self.parent
+
+    def get_layout_metrics(self):
+        """
+        Describes the phylogram for sizing its image, see Graph.get_coordinate_metrics.
+        A radial phylogram is marked as square, it has no levels.
+        :return: dict, min_x, max_x, min_y, max_y, levels, max_level_width, label_length, max_label_length,
+            label_units_per_em and square
+        """
+        return dict(Graph.get_coordinate_metrics(self.names, self.x, self.y),
+                    label_units_per_em=self.tree.label_units_per_em, square=self.projection == 'radial')
+
+    @instrumented_stage('export')
+    def export_layout(self, filename: str, export_format='npz'):
+        """
+        Writes the coordinates of the phylogram into the output directory with the specified filename. The svg of
+        a radial phylogram is scaled equally in both directions. The npz contains the arrays names, x, y, edges and
+        root_distance, the unscaled sum of the branch lengths up to the root node.
+        :param filename: str, Filename without extension
+        :param export_format: str, svg or npz
+        :return: str, path of the written file
+        """
+        if export_format not in PHYLOGRAM_EXPORT_FORMATS:
+            raise ValueError('Unknown phylogram export format ' + export_format + ', expected one of '
+                             + str(PHYLOGRAM_EXPORT_FORMATS))
+        path = os.path.join('output', filename + '.' + export_format)
+        Graph.create_missing_dir(os.path.dirname(path))
+        if export_format == 'svg':
+            if self.projection == 'radial':
+                return graph_export.write_svg(self, path, scale_y=10)
+            return graph_export.write_svg(self, path)
+
+        names, coordinates, edge_indices = self.get_coordinate_arrays()
+        with open(path, 'wb') as npz_file:
+            np.savez(npz_file, names=np.array(list(names), dtype=str), x=coordinates[:, 0], y=coordinates[:, 1],
+                     edges=edge_indices, root_distance=self.root_distances)
+
+        return path
+
+    @instrumented_stage('draw')
+    def draw_graph(self, filename: str, scale_x=None, scale_y=None, dpi=None, image_format='png'):
+        """
+        Draws the phylogram, like Graph.draw_graph.
+        :param filename: str, Filename for the image
+        :param scale_x: ?int
+        :param scale_y: ?int
+        :param dpi: ?int, resolution of raster images
+        :param image_format: str, png, svg or pdf
+        :return: str, path of the saved image
+        """
+        from module_render import GraphRenderer
+
+        figure_size = GraphRenderer.get_figure_size(self, scale_x, scale_y, dpi)
+        renderer = GraphRenderer(dpi=figure_size.dpi, image_format=image_format, node_size=figure_size.node_size,
+                                 font_size=figure_size.font_size, with_labels=figure_size.with_labels)
+        return renderer.render(self, filename, scale_x=figure_size.scale_x, scale_y=figure_size.scale_y)
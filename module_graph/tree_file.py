@@ -0,0 +1,176 @@
+import mmap
+import struct
+from collections.abc import Sequence
+
+import numpy as np
+
+from .compact_tree import CompactTree
+
+TREE_FILE_MAGIC = b'GVTREE\0\0'
+TREE_FILE_VERSION = 1
+TREE_FILE_EXTENSION = '.gvt'
+
+# magic, version, flags, node count, size of the name table in bytes, the distance of the layout and its layout units
+# per em of the labels, 0 if the layout ignores the labels. Files written without the last field have 0 there.
+_HEADER = struct.Struct('<8sIIqqdd')
+_HEADER_SIZE = 64
+_ALIGNMENT = 64
+_HAS_LENGTHS = 1
+_HAS_LAYOUT = 2
+
+
+class TreeFileNames(Sequence):
+    """
+    Class Tree File Names
+    Names of a tree file as a read only sequence. The names stay encoded in the mapped file and a name is only
+    decoded when it is accessed, so opening a tree file does not create a string per node.
+    """
+
+    def __init__(self, buffer, offsets: np.ndarray):
+        """
+        :param buffer: memoryview or bytes, the UTF-8 encoded names one after another
+        :param offsets: np.ndarray, start of each name in the buffer and the end of the last one
+        """
+        self.__buffer = buffer
+        self.__offsets = offsets
+
+    def __len__(self):
+        return len(self.__offsets) - 1
+
+    def __getitem__(self, number):
+        if isinstance(number, slice):
+            return [self[position] for position in range(*number.indices(len(self)))]
+        if number < 0:
+            number += len(self)
+        if not 0 <= number < len(self):
+            raise IndexError('name index out of range')
+        return str(self.__buffer[int(self.__offsets[number]):int(self.__offsets[number + 1])], 'utf-8')
+
+    def __iter__(self):
+        offsets = self.__offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield str(self.__buffer[start:end], 'utf-8')
+
+    def __reduce__(self):
+        # The mapped file cannot be pickled, so the names are sent to other processes as a list.
+        return list, (list(self),)
+
+
+class TreeFile:
+    """
+    Class Tree File
+    Binary file of a parsed tree, which is mapped into memory instead of being read. The file starts with a
+    header of 64 bytes, followed by the sections in this order, each starting at a multiple of 64 bytes:
+    parent numbers (int32), child offsets (int32, one more than nodes), name offsets (int64, one more than nodes),
+    names (UTF-8), the optional branch lengths (float64, NaN if missing) and the optional x and y coordinates
+    (float64). The nodes are in breadth first order like in the CompactTree and all numbers are little endian.
+    The arrays of the tree are views into the mapped file, so nothing is copied or parsed when the file is opened.
+    """
+
+    def __init__(self, path: str):
+        """
+        Opens the file and reads its header.
+        :param path: str, path of the tree file
+        """
+        self.path = path
+        with open(path, 'rb') as tree_file:
+            header = tree_file.read(_HEADER_SIZE)
+            if len(header) < _HEADER_SIZE or header[:len(TREE_FILE_MAGIC)] != TREE_FILE_MAGIC:
+                raise ValueError(path + ' is no tree file')
+            self.__buffer = mmap.mmap(tree_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        _, self.version, flags, self.node_count, self.name_bytes, self.distance, label_units_per_em = \
+            _HEADER.unpack_from(header)
+        if self.version != TREE_FILE_VERSION:
+            raise ValueError(path + ' has the tree file version ' + str(self.version) + ', expected '
+                             + str(TREE_FILE_VERSION))
+        self.has_lengths = bool(flags & _HAS_LENGTHS)
+        self.has_layout = bool(flags & _HAS_LAYOUT)
+        self.label_units_per_em = label_units_per_em or None
+        self.__sections, file_size = TreeFile.__get_sections(self.node_count, self.name_bytes, flags)
+        if len(self.__buffer) < file_size:
+            raise ValueError(path + ' is truncated')
+
+    def __len__(self):
+        return self.node_count
+
+    def get_tree(self):
+        """
+        Creates the compact tree of the file. Its parent numbers, child offsets, branch lengths and coordinates
+        are read only views into the file. Without a layout in the file the coordinates are like in a new tree.
+        :return: CompactTree
+        """
+        arrays = {}
+        for name, offset, dtype, count in self.__sections:
+            if dtype is None:
+                arrays[name] = memoryview(self.__buffer)[offset:offset + count]
+            else:
+                arrays[name] = np.frombuffer(self.__buffer, dtype=dtype, count=count, offset=offset)
+
+        tree = CompactTree(TreeFileNames(arrays['names'], arrays['name_offsets']), arrays['parent'],
+                           child_offsets=arrays['child_offsets'], lengths=arrays.get('lengths'))
+        tree.distance = self.distance
+        if self.has_layout:
+            tree.x = arrays['x']
+            tree.y = arrays['y']
+            tree.label_units_per_em = self.label_units_per_em
+        return tree
+
+    @staticmethod
+    def write(path: str, tree: CompactTree, with_layout=False):
+        """
+        Writes the tree into a tree file. The names are written as strings.
+        :param path: str, path of the tree file
+        :param tree: CompactTree
+        :param with_layout: bool, also writes the coordinates, the distance and the label units per em of the tree
+        :return: str, path of the written file
+        """
+        encoded_names = [str(name).encode() for name in tree.names]
+        name_offsets = np.zeros(len(encoded_names) + 1, dtype='<i8')
+        np.cumsum(np.fromiter(map(len, encoded_names), dtype=np.int64, count=len(encoded_names)),
+                  out=name_offsets[1:])
+        flags = (_HAS_LENGTHS if tree.lengths is not None else 0) | (_HAS_LAYOUT if with_layout else 0)
+        contents = {
+            'parent': tree.parent, 'child_offsets': tree.child_offsets, 'name_offsets': name_offsets,
+            'names': b''.join(encoded_names), 'lengths': tree.lengths, 'x': tree.x, 'y': tree.y
+        }
+        del encoded_names
+
+        sections, _ = TreeFile.__get_sections(len(tree), int(name_offsets[-1]), flags)
+        with open(path, 'wb') as tree_file:
+            label_units_per_em = (tree.label_units_per_em or 0) if with_layout else 0
+            tree_file.write(_HEADER.pack(TREE_FILE_MAGIC, TREE_FILE_VERSION, flags, len(tree), int(name_offsets[-1]),
+                                         tree.distance, label_units_per_em).ljust(_HEADER_SIZE, b'\0'))
+            for name, offset, dtype, count in sections:
+                tree_file.write(b'\0' * (offset - tree_file.tell()))
+                if dtype is None:
+                    tree_file.write(contents[name])
+                else:
+                    tree_file.write(np.ascontiguousarray(contents[name], dtype=dtype).data)
+
+        return path
+
+    @staticmethod
+    def __get_sections(node_count: int, name_bytes: int, flags: int):
+        """
+        Returns the position of each section in the file.
+        :param node_count: int
+        :param name_bytes: int, size of the name table in bytes
+        :param flags: int
+        :return: ([(str, int, ?str, int)], int), name, offset, dtype (None for bytes) and amount of entries
+            of each section and the size of the file
+        """
+        sections = [('parent', '<i4', node_count), ('child_offsets', '<i4', node_count + 1),
+                    ('name_offsets', '<i8', node_count + 1), ('names', None, name_bytes)]
+        if flags & _HAS_LENGTHS:
+            sections.append(('lengths', '<f8', node_count))
+        if flags & _HAS_LAYOUT:
+            sections.extend((('x', '<f8', node_count), ('y', '<f8', node_count)))
+
+        positions = []
+        end = _HEADER_SIZE
+        for name, dtype, count in sections:
+            offset = -(-end // _ALIGNMENT) * _ALIGNMENT
+            end = offset + count * (1 if dtype is None else np.dtype(dtype).itemsize)
+            positions.append((name, offset, dtype, count))
+        return positions, end
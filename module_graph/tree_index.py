@@ -0,0 +1,158 @@
+import numpy as np
+
+from .node import Node
+
+
+class TreeIndex:
+    """
+    Class Tree Index
+    Structure of the tree below a root node, built in one depth first pass. The nodes are numbered in pre-order,
+    so the subtree of a node are the numbers from its own number to its number plus its subtree size and
+    a node is an ancestor of another one if the number of the other one lies in this range. The post-order
+    number follows from the pre-order number, the subtree size and the depth.
+    The lowest common ancestor of two nodes is the parent of the least deep node between them in pre-order,
+    it is found in constant time with a sparse table of range minima, which is built on the first query.
+    The index describes the tree at the time it was built, the graph drops it whenever its tree changes.
+    """
+
+    def __init__(self, root_node: Node):
+        """
+        :param root_node: Node
+        """
+        self.root_node = root_node
+        self.nodes = []
+        self.numbers = {}
+        parents = []
+        depths = []
+        stack = [(root_node, -1, 0)]
+        while stack:
+            node, parent_number, depth = stack.pop()
+            self.numbers[node] = len(self.nodes)
+            self.nodes.append(node)
+            parents.append(parent_number)
+            depths.append(depth)
+            number = len(self.nodes) - 1
+            for child in reversed(node.children):
+                stack.append((child, number, depth + 1))
+
+        self.parent = np.array(parents, dtype=np.int64)
+        self.depth = np.array(depths, dtype=np.int64)
+        # The numbers of a level are sorted, so each level lists its nodes from left to right.
+        order = np.argsort(self.depth, kind='stable')
+        level_starts = np.searchsorted(self.depth[order], np.arange(int(self.depth.max(initial=-1)) + 2))
+        self.levels = [order[level_starts[depth]:level_starts[depth + 1]] for depth in range(len(level_starts) - 1)]
+
+        self.subtree_size = np.ones(len(self.nodes), dtype=np.int64)
+        for level_numbers in reversed(self.levels[1:]):
+            np.add.at(self.subtree_size, self.parent[level_numbers], self.subtree_size[level_numbers])
+        self.post_order = np.arange(len(self.nodes)) + self.subtree_size - 1 - self.depth
+        self.__minimum_table = None
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, node: Node):
+        return node in self.numbers
+
+    def get_number(self, node: Node):
+        """
+        Returns the pre-order number of the node.
+        :param node: Node
+        :return: int
+        """
+        number = self.numbers.get(node)
+        if number is None:
+            raise ValueError('The node ' + str(node.name) + ' is not below the root node')
+        return number
+
+    def get_level(self, node: Node):
+        """
+        Returns the level of the node, the root node is on level 1.
+        :param node: Node
+        :return: int
+        """
+        return int(self.depth[self.get_number(node)]) + 1
+
+    def get_level_nodes(self, level: int):
+        """
+        Returns the nodes of the level from left to right.
+        :param level: int, the root node is on level 1
+        :return: [Node]
+        """
+        if not 1 <= level <= len(self.levels):
+            return []
+        return [self.nodes[number] for number in self.levels[level - 1].tolist()]
+
+    def get_subtree_levels(self, node: Node):
+        """
+        Returns the nodes of the subtree for each level below the node, each level from left to right.
+        The level numbers start with the level of the node.
+        :param node: Node
+        :return: [[Node]]
+        """
+        number = self.get_number(node)
+        end = number + self.subtree_size[number]
+        subtree_levels = []
+        for level_numbers in self.levels[self.depth[number]:]:
+            level_numbers = level_numbers[np.searchsorted(level_numbers, number):np.searchsorted(level_numbers, end)]
+            if not len(level_numbers):
+                break
+            subtree_levels.append([self.nodes[level_number] for level_number in level_numbers.tolist()])
+
+        return subtree_levels
+
+    def get_subtree_size(self, node: Node):
+        """
+        Returns the amount of nodes in the subtree of the node, including the node itself.
+        :param node: Node
+        :return: int
+        """
+        return int(self.subtree_size[self.get_number(node)])
+
+    def is_ancestor(self, ancestor: Node, node: Node):
+        """
+        Tests if the first node is an ancestor of the second one. A node is its own ancestor.
+        :param ancestor: Node
+        :param node: Node
+        :return: bool
+        """
+        ancestor_number = self.get_number(ancestor)
+        return ancestor_number <= self.get_number(node) < ancestor_number + self.subtree_size[ancestor_number]
+
+    def get_lowest_common_ancestor(self, node_a: Node, node_b: Node):
+        """
+        Returns the deepest node, which is an ancestor of both nodes.
+        :param node_a: Node
+        :param node_b: Node
+        :return: Node
+        """
+        first, last = sorted((self.get_number(node_a), self.get_number(node_b)))
+        if last < first + self.subtree_size[first]:
+            return self.nodes[first]
+
+        if self.__minimum_table is None:
+            self.__minimum_table = self.__build_minimum_table()
+        # The least deep node after first up to last is a child of the lowest common ancestor.
+        first += 1
+        power = (last - first + 1).bit_length() - 1
+        left = self.__minimum_table[power][first]
+        right = self.__minimum_table[power][last - (1 << power) + 1]
+        shallowest = left if self.depth[left] <= self.depth[right] else right
+        return self.nodes[self.parent[shallowest]]
+
+    def __build_minimum_table(self):
+        """
+        Builds the sparse table: row k holds for each number the number of the least deep node
+        in the range of 2^k numbers starting there.
+        :return: [np.ndarray]
+        """
+        table = [np.arange(len(self.nodes), dtype=np.int32)]
+        width = 1
+        while 2 * width <= len(self.nodes):
+            previous = table[-1]
+            left = previous[:len(previous) - width]
+            right = previous[width:]
+            table.append(np.where(self.depth[left] <= self.depth[right], left, right))
+            width *= 2
+
+        return table
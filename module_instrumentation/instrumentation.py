@@ -0,0 +1,200 @@
+import functools
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from module_color import Color
+
+CURRENT_INSTRUMENTATION = ContextVar('current_instrumentation', default=None)
+
+
+class InstrumentationHook:
+    """
+    Class Instrumentation Hook
+    Base class for the callbacks of an Instrumentation. Subclasses override the methods they are interested in.
+    """
+
+    def stage_started(self, stage: str):
+        """
+        Is called before a stage starts.
+        :param stage: str, name of the stage, e.g. parse, convert, layout or draw
+        :return: None
+        """
+
+    def stage_finished(self, stage: str, seconds: float, peak_bytes):
+        """
+        Is called after a stage has finished.
+        :param stage: str, name of the stage
+        :param seconds: float, wall time of the stage
+        :param peak_bytes: ?int, peak of the traced memory above the start of the stage, None without tracemalloc
+        :return: None
+        """
+
+    def counters_reported(self, source: str, counters: dict):
+        """
+        Is called when an algorithm reports its counters.
+        :param source: str, name of the algorithm
+        :param counters: {str: int}
+        :return: None
+        """
+
+
+class PrintHook(InstrumentationHook):
+    """
+    Class Print Hook
+    Prints the stages and counters. Nested stages are indented.
+    """
+
+    def __init__(self):
+        self.depth = 0
+
+    def stage_started(self, stage: str):
+        self.depth += 1
+
+    def stage_finished(self, stage: str, seconds: float, peak_bytes):
+        self.depth -= 1
+        memory = '' if peak_bytes is None else ' Peak Memory (kB): ' + str(round(peak_bytes / 1024))
+        print('  ' * self.depth + Color.DARKCYAN + 'Stage ' + stage + Color.END,
+              'Seconds: ' + str(round(seconds, 4)) + memory)
+
+    def counters_reported(self, source: str, counters: dict):
+        print('  ' * self.depth + Color.DARKCYAN + 'Counters ' + source + Color.END,
+              ' '.join(name + ': ' + str(value) for name, value in counters.items()))
+
+
+class Instrumentation:
+    """
+    Class Instrumentation
+    Measures the wall time and the peak memory of stages and collects the counters of the algorithms.
+    The instrumented functions report to the instrumentation, which is active in the current context,
+    so nothing is measured while no instrumentation is active. The peak memory is only measured
+    while tracemalloc is tracing.
+    """
+
+    def __init__(self, hooks=None, trace_memory=False):
+        """
+        :param hooks: ?[InstrumentationHook]
+        :param trace_memory: bool, starts tracemalloc while the instrumentation is active
+        """
+        self.hooks = list(hooks or [])
+        self.trace_memory = trace_memory
+        self.stages = []
+        self.counters = {}
+        self.open_stages = []
+
+    def add_hook(self, hook: InstrumentationHook):
+        """
+        Adds a hook, which is called for all following stages and counters.
+        :param hook: InstrumentationHook
+        :return: None
+        """
+        self.hooks.append(hook)
+
+    @contextmanager
+    def activate(self):
+        """
+        Makes the instrumentation the active one of the current context until the block is left.
+        :return: context manager
+        """
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        token = CURRENT_INSTRUMENTATION.set(self)
+        try:
+            yield self
+        finally:
+            CURRENT_INSTRUMENTATION.reset(token)
+            if started_tracing:
+                tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, stage: str):
+        """
+        Measures the block as stage. Stages may be nested, the peak of an outer stage includes the inner stages.
+        :param stage: str, name of the stage
+        :return: context manager
+        """
+        for hook in self.hooks:
+            hook.stage_started(stage)
+
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            # The peak of tracemalloc is global, so the peak of the outer stage is kept before it is reset.
+            current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+            if self.open_stages:
+                self.open_stages[-1][1] = max(self.open_stages[-1][1], peak_bytes)
+            tracemalloc.reset_peak()
+            self.open_stages.append([current_bytes, current_bytes])
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            stage_peak_bytes = None
+            if tracing and tracemalloc.is_tracing():
+                start_bytes, inner_peak_bytes = self.open_stages.pop()
+                peak_bytes = max(tracemalloc.get_traced_memory()[1], inner_peak_bytes)
+                stage_peak_bytes = peak_bytes - start_bytes
+                if self.open_stages:
+                    self.open_stages[-1][1] = max(self.open_stages[-1][1], peak_bytes)
+
+            self.stages.append((stage, seconds, stage_peak_bytes))
+            for hook in self.hooks:
+                hook.stage_finished(stage, seconds, stage_peak_bytes)
+
+    def report_counters(self, source: str, counters: dict):
+        """
+        Adds the counters of an algorithm to the summed counters and passes them to the hooks.
+        :param source: str, name of the algorithm
+        :param counters: {str: int}
+        :return: None
+        """
+        summed_counters = self.counters.setdefault(source, {})
+        for name, value in counters.items():
+            summed_counters[name] = summed_counters.get(name, 0) + value
+        for hook in self.hooks:
+            hook.counters_reported(source, counters)
+
+
+def get_instrumentation():
+    """
+    Returns the instrumentation, which is active in the current context.
+    :return: ?Instrumentation
+    """
+    return CURRENT_INSTRUMENTATION.get()
+
+
+@contextmanager
+def instrument_stage(stage: str):
+    """
+    Measures the block as stage of the active instrumentation. Without active instrumentation nothing is measured.
+    :param stage: str, name of the stage
+    :return: context manager
+    """
+    instrumentation = CURRENT_INSTRUMENTATION.get()
+    if instrumentation is None:
+        yield
+    else:
+        with instrumentation.stage(stage):
+            yield
+
+
+def instrumented_stage(stage: str):
+    """
+    Decorator, which measures each call of the function as stage of the active instrumentation.
+    :param stage: str, name of the stage
+    :return: decorator
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def instrumented_function(*args, **kwargs):
+            instrumentation = CURRENT_INSTRUMENTATION.get()
+            if instrumentation is None:
+                return function(*args, **kwargs)
+            with instrumentation.stage(stage):
+                return function(*args, **kwargs)
+
+        return instrumented_function
+
+    return decorator
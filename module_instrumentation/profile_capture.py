@@ -0,0 +1,75 @@
+import cProfile
+import os
+import pstats
+import tracemalloc
+
+from module_color import Color
+
+
+class ProfileCapture:
+    """
+    Class Profile Capture
+    Context manager, which records the enclosed block with cProfile and/or tracemalloc.
+    On exit the profile is written to the output directory and the most expensive functions
+    and allocation sites are printed.
+    """
+
+    def __init__(self, name='profile', profile=True, trace_memory=False, top_count=20,
+                 directory=os.path.join('output', 'profile')):
+        """
+        :param name: str, file name of the written profile without extension
+        :param profile: bool, records the function calls with cProfile
+        :param trace_memory: bool, records the allocations with tracemalloc
+        :param top_count: int, amount of printed functions and allocation sites
+        :param directory: str, directory of the written profile
+        """
+        self.name = name
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.top_count = top_count
+        self.directory = directory
+        self.profiler = None
+        self.started_tracing = False
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        if self.profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        if self.profiler:
+            self.profiler.disable()
+            self.print_profile()
+        if self.trace_memory and tracemalloc.is_tracing():
+            self.print_allocations()
+            if self.started_tracing:
+                tracemalloc.stop()
+                self.started_tracing = False
+
+    def print_profile(self):
+        """
+        Writes the cProfile statistics, which can be read with pstats or snakeviz,
+        and prints the functions with the highest cumulative time.
+        :return: str, path of the written statistics
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, self.name + '.prof')
+        self.profiler.dump_stats(path)
+        print(Color.UNDERLINE + 'Profile written to ' + path + ':' + Color.END)
+        pstats.Stats(self.profiler).sort_stats('cumulative').print_stats(self.top_count)
+        return path
+
+    def print_allocations(self):
+        """
+        Prints the current and peak traced memory and the source lines with the most allocated memory.
+        :return: None
+        """
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        print(Color.UNDERLINE + 'Traced Memory:' + Color.END,
+              'Current (kB):', round(current_bytes / 1024), 'Peak (kB):', round(peak_bytes / 1024))
+        for statistic in tracemalloc.take_snapshot().statistics('lineno')[:self.top_count]:
+            print(statistic)
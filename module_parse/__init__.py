@@ -1 +1,3 @@
-from .parse_graphs import *
\ No newline at end of file
+from .parse_graphs import *
+from .parse_graphml_stream import *
+from .parse_newick_stream import *
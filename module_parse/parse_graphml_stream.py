@@ -0,0 +1,121 @@
+from collections import deque
+from xml.etree.ElementTree import iterparse
+
+from module_graph import CompactTree
+from module_graph import Graph
+from module_instrumentation import instrumented_stage
+
+
+def iter_graphml_elements(filename: str):
+    """
+    Reads the graph, node and edge elements of a graphml file one after another. Only the attributes needed for
+    the layout are kept and each element is removed from the document after it is read, so the memory does not
+    grow with the size of the file.
+    :param filename: str; full path of the to be parsed file
+    :return: generator of tuple, ('graph', ?edgedefault), ('node', id) or ('edge', source, target)
+    """
+    parents = []
+    for event, element in iterparse(filename, events=('start', 'end')):
+        tag = element.tag.rsplit('}', 1)[-1]
+        if event == 'start':
+            if tag == 'graph':
+                yield 'graph', element.get('edgedefault')
+            parents.append(element)
+            continue
+
+        parents.pop()
+        if tag == 'node':
+            yield 'node', element.get('id')
+        elif tag == 'edge':
+            yield 'edge', element.get('source'), element.get('target')
+        else:
+            continue
+        element.clear()
+        if parents:
+            parents[-1].remove(element)
+
+
+@instrumented_stage('parse')
+def parse_graphml_file_edge_list(filename: str):
+    """
+    Reads the node ids and the directed edges (source, target) of a graphml file in document order.
+    Unlike networkx the direction of the edges is kept if the graph has no edgedefault.
+    :param filename: str; full path of the to be parsed file
+    :return: ([str], [(str, str)]), node names and edges
+    """
+    node_names = []
+    edges = []
+    for element in iter_graphml_elements(filename):
+        if element[0] == 'node':
+            node_names.append(element[1])
+        elif element[0] == 'edge':
+            edges.append(element[1:])
+
+    return node_names, edges
+
+
+@instrumented_stage('parse')
+def parse_graphml_file_to_graph(filename: str, digraph=True):
+    """
+    Parses a graphml file directly into a graph in one pass without networkx.
+    The graph is the same as the one of parse_graphml_file_newick_format: without edgedefault="directed"
+    the graph is undirected, so a digraph gets each edge in both directions.
+    :param filename: str; full path of the to be parsed file
+    :param digraph: Bool; is the graph a digraph
+    :return: Graph
+    """
+    node_names = []
+    edges = []
+    directed = None
+    for element in iter_graphml_elements(filename):
+        if element[0] == 'node':
+            node_names.append(element[1])
+        elif element[0] == 'edge':
+            edges.append(element[1:])
+            if digraph and not directed:
+                edges.append((element[2], element[1]))
+        elif directed is None:
+            directed = element[1] == 'directed'
+
+    return Graph.create_graph_from_edge_list(node_names, edges)
+
+
+def parse_graphml_file_to_compact_tree(filename: str):
+    """
+    Parses a graphml file into a compact tree of all of its nodes. The tree is a spanning forest of the directed
+    edges below a virtual root node 0 without name: the nodes without incoming edges are the roots of the forest
+    in document order, each node is attached to the first node it is reached from in breadth first order.
+    Nodes which are only reachable through a cycle become further roots of the forest.
+    :param filename: str; full path of the to be parsed file
+    :return: CompactTree
+    """
+    node_names, edges = parse_graphml_file_edge_list(filename)
+    names = [''] + node_names
+    numbers = {name: number for number, name in enumerate(node_names, 1)}
+    children = [[] for _ in names]
+    has_incoming_edge = [False] * len(names)
+    for source, target in edges:
+        for name in (source, target):
+            if name not in numbers:
+                numbers[name] = len(names)
+                names.append(name)
+                children.append([])
+                has_incoming_edge.append(False)
+        children[numbers[source]].append(numbers[target])
+        has_incoming_edge[numbers[target]] = True
+
+    parent = [-1] + [None] * (len(names) - 1)
+    roots = [number for number in range(1, len(names)) if not has_incoming_edge[number]]
+    for root in roots + list(range(1, len(names))):
+        if parent[root] is not None:
+            continue
+        parent[root] = 0
+        queue = deque([root])
+        while queue:
+            node_number = queue.popleft()
+            for child in children[node_number]:
+                if parent[child] is None:
+                    parent[child] = node_number
+                    queue.append(child)
+
+    return CompactTree.from_parent_array(names, parent)
@@ -1,7 +1,14 @@
-import networkx as nx
-import newick
+from typing import TYPE_CHECKING
 
+from module_instrumentation import instrumented_stage
 
+# networkx and newick are imported by the parse functions, so the stream parsers can be used without them.
+if TYPE_CHECKING:
+    import networkx as nx
+    import newick
+
+
+@instrumented_stage('parse')
 def parse_graphml_file_newick_format(filename: str, digraph=True):
     """
     Parses a graphml file and return the networkx graph. Forces each node to be in the newick.Node format.
@@ -9,6 +16,9 @@ def parse_graphml_file_newick_format(filename: str, digraph=True):
     :param digraph: Bool; is the graph a digraph
     :return: nx.Graph()
     """
+    import networkx as nx
+    import newick
+
     graphml_graph = nx.read_graphml(filename, node_type=newick.Node)
     if digraph:
         graphml_graph = graphml_graph.to_directed()
@@ -19,6 +29,7 @@ def parse_graphml_file_newick_format(filename: str, digraph=True):
     return graphml_graph
 
 
+@instrumented_stage('parse')
 def parse_graphml_file(filename: str, digraph=True):
     """
     Parses a graphml file and return the networkx graph.
@@ -26,6 +37,8 @@ def parse_graphml_file(filename: str, digraph=True):
     :param digraph: Bool; is the graph a digraph
     :return: nx.Graph()
     """
+    import networkx as nx
+
     graphml_graph = nx.read_graphml(filename)
     if digraph:
         graphml_graph = graphml_graph.to_directed()
@@ -33,13 +46,18 @@ def parse_graphml_file(filename: str, digraph=True):
     return graphml_graph
 
 
+@instrumented_stage('parse')
 def parse_newick_file(filename: str, digraph=True):
     """
-    Parses a newick file and returns the networkx graph.
+    Parses a newick file and returns the networkx graph. The branch length of each node is kept in its attribute
+    'length', which is None if the file has no length for the node.
     :param filename: str; full path of the to be parsed file
     :param digraph: Bool; is the graph a digraph
     :return: nx.Graph()
     """
+    import networkx as nx
+    import newick
+
     tree = newick.read(filename)
 
     if digraph:
@@ -50,19 +68,20 @@ def parse_newick_file(filename: str, digraph=True):
     none_counter = 1
 
     # Adding root node
-    graph_newick.add_node(tree[0], child_position=0)
+    graph_newick.add_node(tree[0], child_position=0, length=get_newick_length(tree[0]))
 
-    while tree:
-        tree_node = tree[0]
+    position = 0
+    while position < len(tree):
+        tree_node = tree[position]
         tree_node, none_counter = rename_none_node(tree_node, none_counter)
         graph_newick, descendants, none_counter = add_newick_node_and_edge(graph_newick, tree_node, none_counter)
         tree += descendants
-        tree.remove(tree_node)
+        position += 1
 
     return graph_newick
 
 
-def add_newick_node_and_edge(nx_graph: nx.Graph, current_node, none_counter: int):
+def add_newick_node_and_edge(nx_graph: 'nx.Graph', current_node, none_counter: int):
     """
     Adding the descendants of the current node to the graph and adding the according edge.
     Rename a node if the name is None.
@@ -74,13 +93,23 @@ def add_newick_node_and_edge(nx_graph: nx.Graph, current_node, none_counter: int
     descendants = current_node.descendants
     for child_pos in range(len(descendants)):
         descendants[child_pos], none_counter = rename_none_node(descendants[child_pos], none_counter)
-        nx_graph.add_node(descendants[child_pos], child_position=child_pos)
+        nx_graph.add_node(descendants[child_pos], child_position=child_pos,
+                          length=get_newick_length(descendants[child_pos]))
         nx_graph.add_edge(current_node, descendants[child_pos])
 
     return nx_graph, descendants, none_counter
 
 
-def rename_none_node(node_to_rename: newick.Node, counter):
+def get_newick_length(node: 'newick.Node'):
+    """
+    Returns the branch length of the node. Unlike newick.Node.length a missing length is None instead of 0.
+    :param node: newick.Node
+    :return: ?float
+    """
+    return None if node._length is None else node.length
+
+
+def rename_none_node(node_to_rename: 'newick.Node', counter):
     """
     Renaming node with no name to differ from other not named node.
     :param node_to_rename: node to be checked
@@ -0,0 +1,247 @@
+import gzip
+import re
+
+from module_graph import CompactForest
+from module_graph import CompactTree
+from module_graph import Graph
+from module_graph import Node
+from module_instrumentation import instrumented_stage
+
+NEWICK_TOKEN = re.compile(r"[(),;:]|\[[^\]]*\]|\s*'(?:[^']|'')*'|[^(),;:\[\]]+|[\[\]]")
+NEWICK_DELIMITERS = '(),;:'
+
+
+def open_newick_file(filename: str):
+    """
+    Opens a newick file for reading text. Gzip compressed files are detected by their magic number.
+    :param filename: str; full path of the file
+    :return: text stream
+    """
+    with open(filename, 'rb') as binary_file:
+        magic_number = binary_file.read(2)
+    if magic_number == b'\x1f\x8b':
+        return gzip.open(filename, 'rt', encoding='utf-8')
+    return open(filename, 'r', encoding='utf-8')
+
+
+def tokenize_newick(stream, chunk_size=1 << 16):
+    """
+    Splits a newick text stream into delimiters and labels while reading it chunk by chunk.
+    Comments in square brackets are skipped and the whitespace around labels is removed.
+    :param stream: text stream
+    :param chunk_size: int; amount of characters which are read at once
+    :return: generator of str
+    """
+    buffer = ''
+    position = 0
+    end_of_stream = False
+    while not end_of_stream:
+        chunk = stream.read(chunk_size)
+        end_of_stream = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+        buffer_end = len(buffer)
+
+        for match in NEWICK_TOKEN.finditer(buffer):
+            token = match.group()
+            if token in NEWICK_DELIMITERS:
+                position = match.end()
+                yield token
+                continue
+            # A label or comment at the end of the buffer may continue in the next chunk. A quoted label is
+            # incomplete while its closing quote is missing or is followed by a quote, so it was an escaped quote.
+            if not end_of_stream and (match.end() == buffer_end or token == '['
+                                      or (token.lstrip()[:1] == "'"
+                                          and (token.count("'") % 2 or buffer.startswith("'", match.end())))):
+                break
+            if token == '[' or token == ']':
+                raise ValueError('Invalid newick format near: ' + buffer[match.start():match.start() + 20])
+            position = match.end()
+            if token[0] == '[':
+                continue
+            token = token.strip()
+            if token:
+                yield token
+
+
+def iter_newick_file_trees(filename: str):
+    """
+    Parses all trees of a newick file one after another. Only one tree is held in memory at once.
+    The nodes are numbered in pre-order. Nodes without name are renamed like in rename_none_node.
+    :param filename: str; full path of the to be parsed file, may be gzip compressed
+    :return: generator of ([str], [int], [?float]), names, parent numbers (-1 for the root) and branch lengths
+    """
+    names = []
+    parents = []
+    lengths = []
+    open_nodes = []
+    current_node = -1
+    expect_length = False
+
+    def add_node():
+        names.append(None)
+        parents.append(open_nodes[-1] if open_nodes else -1)
+        lengths.append(None)
+        return len(names) - 1
+
+    with open_newick_file(filename) as stream:
+        for token in tokenize_newick(stream):
+            if expect_length and token not in NEWICK_DELIMITERS:
+                if current_node < 0:
+                    current_node = add_node()
+                lengths[current_node] = float(token)
+                expect_length = False
+                continue
+            expect_length = False
+
+            if token == '(':
+                open_nodes.append(add_node())
+                current_node = -1
+            elif token == ',':
+                if current_node < 0:
+                    add_node()
+                current_node = -1
+            elif token == ')':
+                if not open_nodes:
+                    raise ValueError('Unbalanced parentheses in ' + filename)
+                if current_node < 0:
+                    add_node()
+                current_node = open_nodes.pop()
+            elif token == ':':
+                expect_length = True
+            elif token == ';':
+                if open_nodes:
+                    raise ValueError('Unbalanced parentheses in ' + filename)
+                if names:
+                    rename_none_nodes(names, parents)
+                    yield names, parents, lengths
+                names, parents, lengths = [], [], []
+                current_node = -1
+            else:
+                if current_node < 0:
+                    current_node = add_node()
+                names[current_node] = unquote_newick_label(token)
+
+    if open_nodes:
+        raise ValueError('Unbalanced parentheses in ' + filename)
+    if names:
+        rename_none_nodes(names, parents)
+        yield names, parents, lengths
+
+
+def iter_newick_file_graphs(filename: str):
+    """
+    Parses all trees of a newick file and returns a graph for each of them.
+    :param filename: str; full path of the to be parsed file, may be gzip compressed
+    :return: generator of Graph
+    """
+    for names, parents, lengths in iter_newick_file_trees(filename):
+        yield Graph.create_graph_from_parent_array(names, parents)
+
+
+@instrumented_stage('parse')
+def parse_newick_file_to_graph(filename: str):
+    """
+    Parses the first tree of a newick file directly into a graph without networkx.
+    :param filename: str; full path of the to be parsed file, may be gzip compressed
+    :return: Graph
+    """
+    return next(iter_newick_file_graphs(filename))
+
+
+@instrumented_stage('parse')
+def parse_newick_file_to_compact_tree(filename: str):
+    """
+    Parses the first tree of a newick file directly into a compact tree with its branch lengths.
+    :param filename: str; full path of the to be parsed file, may be gzip compressed
+    :return: CompactTree
+    """
+    names, parents, lengths = next(iter_newick_file_trees(filename))
+    return CompactTree.from_parent_array(names, parents, lengths)
+
+
+@instrumented_stage('parse')
+def parse_newick_file_to_forest(filename: str):
+    """
+    Parses all trees of a newick file into one compact forest.
+    :param filename: str; full path of the to be parsed file, may be gzip compressed
+    :return: CompactForest
+    """
+    forest = CompactForest.from_parent_arrays(iter_newick_file_trees(filename))
+    if not forest.tree_count:
+        raise ValueError('No tree in ' + filename)
+    return forest
+
+
+def write_newick_file(graph: Graph, filename: str):
+    """
+    Writes the tree of the graph as newick file. The nodes are written with an explicit stack,
+    so the depth of the tree is not limited by the recursion limit.
+    :param graph: Graph
+    :param filename: str; full path of the file
+    :return: str; full path of the file
+    """
+    with open(filename, 'w', encoding='utf-8') as newick_file:
+        # Each entry is a node which is opened or a label which is written after the children of its node.
+        stack = [graph.root_node]
+        while stack:
+            entry = stack.pop()
+            if not isinstance(entry, Node):
+                newick_file.write(entry)
+                continue
+            if not entry.children:
+                newick_file.write(quote_newick_label(entry.name))
+                continue
+
+            newick_file.write('(')
+            stack.append(')' + quote_newick_label(entry.name))
+            for position in range(len(entry.children) - 1, -1, -1):
+                stack.append(entry.children[position])
+                if position:
+                    stack.append(',')
+        newick_file.write(';\n')
+
+    return filename
+
+
+def quote_newick_label(label):
+    """
+    Quotes a label if it contains newick delimiters, whitespace, brackets or quotes.
+    :param label: str
+    :return: str
+    """
+    label = str(label)
+    if any(character in label for character in NEWICK_DELIMITERS + "[]' \t\n"):
+        return "'" + label.replace("'", "''") + "'"
+    return label
+
+
+def unquote_newick_label(label: str):
+    """
+    Removes the quotes of a quoted newick label.
+    :param label: str
+    :return: str
+    """
+    if len(label) > 1 and label[0] == "'" and label[-1] == "'":
+        return label[1:-1].replace("''", "'")
+    return label
+
+
+def rename_none_nodes(names, parents):
+    """
+    Renames the nodes without name in breadth first order, so the names are the same as with rename_none_node.
+    The parent of a node has to have a smaller number than the node.
+    :param names: [?str]
+    :param parents: [int]
+    :return: None
+    """
+    depths = [0] * len(parents)
+    for node_number in range(1, len(parents)):
+        depths[node_number] = depths[parents[node_number]] + 1
+
+    none_counter = 1
+    # Sorting the pre-order stable by depth results in the breadth first order.
+    for node_number in sorted(range(len(names)), key=depths.__getitem__):
+        if names[node_number] is None:
+            names[node_number] = str(None) + '_' + str(none_counter)
+            none_counter += 1
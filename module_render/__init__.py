@@ -0,0 +1,4 @@
+from .graph_renderer import *
+from .layout_index import *
+from .level_of_detail_renderer import *
+from .tile_pyramid import *
@@ -0,0 +1,198 @@
+import os
+from typing import TYPE_CHECKING
+
+from module_graph import Graph
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+IMAGE_FORMATS = ('png', 'svg', 'pdf')
+# Average advance of a glyph relative to the font size, used to estimate the width of a label.
+GLYPH_ADVANCE = 0.6
+# Largest amount of pixels of an automatically sized image, 32 megapixels take 128 MB as RGBA canvas.
+PIXEL_BUDGET = 32 * 1024 * 1024
+# Largest width or height of an automatically sized image in pixels.
+MAX_IMAGE_SIDE = 32768
+
+
+class FigureSize:
+    """
+    Class Figure Size
+    Size of the figure in inches, its resolution and the sizes of fonts and nodes for one graph.
+    """
+
+    def __init__(self, scale_x: float, scale_y: float, dpi: int, font_size=12, node_size=300, with_labels=True):
+        self.scale_x = scale_x
+        self.scale_y = scale_y
+        self.dpi = dpi
+        self.font_size = font_size
+        self.node_size = node_size
+        self.with_labels = with_labels
+
+    def get_pixels(self):
+        """
+        Returns the size of the image in pixels.
+        :return: (int, int), width and height
+        """
+        return round(self.scale_x * self.dpi), round(self.scale_y * self.dpi)
+
+
+class GraphRenderer:
+    """
+    Class Graph Renderer
+    Draws a graph from the coordinates of its nodes without a GUI backend. The edges are drawn as one
+    LineCollection and the nodes as one scatter plot. Each figure is created without pyplot,
+    so no figure state is kept between two drawings. Matplotlib is only imported when the first figure is drawn.
+    """
+
+    def __init__(self, dpi=500, image_format='png', node_size=300, font_size=12, with_labels=True):
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError('Unknown image format ' + image_format + ', expected one of ' + str(IMAGE_FORMATS))
+        self.dpi = dpi
+        self.image_format = image_format
+        self.node_size = node_size
+        self.font_size = font_size
+        self.with_labels = with_labels
+
+    @staticmethod
+    def get_figure_size(graph: Graph, scale_x=None, scale_y=None, dpi=None, pixel_budget=PIXEL_BUDGET):
+        """
+        Derives the figure size from the layout metrics of the graph, a given scale is kept and only the missing
+        one is derived. With both scales the metrics are not needed.
+        Neighboring nodes are as far apart as the typical label is wide at 12 points and 100 dpi, the image is at
+        least as wide as the longest label and the levels are four lines of text apart. If the layout already keeps
+        the labels apart, one em of the font at 12 points is as wide as the label units per em of the layout and
+        the image gets a typical label as margin for the labels of the outer nodes. A side longer than
+        MAX_IMAGE_SIDE is shrunk in its direction and an image above the pixel budget in both, the fonts and nodes
+        shrink with it and the labels are left out below 4 points. A smaller image gets up to 300 dpi.
+        A layout with square metrics, like a radial phylogram, gets a square image as wide as its larger extent.
+        A given scale is neither shrunk nor counted against the pixel budget of the derived side, but the fonts and
+        nodes shrink with it if it is smaller than the derived one.
+        :param graph: Graph, CompactForest or Phylogram, with calculated coordinates
+        :param scale_x: ?float, width of the image in inches
+        :param scale_y: ?float, height of the image in inches
+        :param dpi: ?int, resolution, by default derived from the pixel budget
+        :param pixel_budget: int, largest amount of pixels of the image
+        :return: FigureSize
+        """
+        if scale_x and scale_y:
+            return FigureSize(scale_x, scale_y, dpi or 500)
+
+        metrics = graph.get_layout_metrics()
+        base_dpi = 100
+        character_pixels = GLYPH_ADVANCE * 12 * base_dpi / 72
+        node_spacing = max(32.0, (metrics['label_length'] + 1) * character_pixels)
+        label_margin = 0
+        if metrics.get('label_units_per_em'):
+            node_spacing = max(32.0, graph.distance / metrics['label_units_per_em'] * 12 * base_dpi / 72)
+            label_margin = (metrics['label_length'] + 1) * character_pixels
+        level_spacing = max(60.0, 4 * 12 * base_dpi / 72)
+        # Nodes of one level are at least the distance apart, so the widest level also bounds the width.
+        columns = max((metrics['max_x'] - metrics['min_x']) / graph.distance + 1, metrics['max_level_width'])
+        width = max(columns * node_spacing + label_margin, (metrics['max_label_length'] + 1) * character_pixels) * 1.1
+        height = max(1, metrics['levels']) * level_spacing * 1.1
+        if metrics.get('square'):
+            columns = max(metrics['max_x'] - metrics['min_x'], metrics['max_y'] - metrics['min_y']) / graph.distance + 1
+            width = height = max(columns * node_spacing, (metrics['max_label_length'] + 1) * character_pixels) * 1.1
+            # The image stays square, so the missing scale is the given one.
+            scale_x = scale_y = scale_x or scale_y
+
+        # A side above MAX_IMAGE_SIDE only shrinks its own direction, the pixel budget shrinks both derived sides
+        # or the whole excess of the one derived side.
+        shrink_x = scale_x * base_dpi / width if scale_x else min(1.0, MAX_IMAGE_SIDE / width)
+        shrink_y = scale_y * base_dpi / height if scale_y else min(1.0, MAX_IMAGE_SIDE / height)
+        fit = pixel_budget / (width * shrink_x * height * shrink_y)
+        if fit < 1 or shrink_x < 1 or shrink_y < 1:
+            budget_shrink = min(1.0, fit if scale_x or scale_y else fit ** 0.5)
+            shrink_x *= 1.0 if scale_x else budget_shrink
+            shrink_y *= 1.0 if scale_y else budget_shrink
+            shrink = min(1.0, shrink_x, shrink_y)
+            font_size = 12 * shrink
+            return FigureSize(scale_x or width * shrink_x / base_dpi, scale_y or height * shrink_y / base_dpi,
+                              dpi or base_dpi, font_size=font_size, node_size=300 * shrink ** 2,
+                              with_labels=font_size >= 4)
+
+        return FigureSize(scale_x or width * shrink_x / base_dpi, scale_y or height * shrink_y / base_dpi,
+                          dpi or int(base_dpi * min(3.0, fit ** 0.5)))
+
+    def render(self, graph: Graph, filename: str, scale_x=10, scale_y=10, show=False):
+        """
+        Draws the graph from top to bottom and saves it in the output directory with the specified filename.
+        If show is set the figure is also shown in a window, which blocks until the window is closed.
+        :param graph: Graph or CompactForest
+        :param filename: str, Filename for the image without extension
+        :param scale_x: int, width of the image in inches
+        :param scale_y: int, height of the image in inches
+        :param show: bool
+        :return: str, path of the saved image
+        """
+        if show:
+            import matplotlib.pyplot as plt
+            figure = plt.figure(figsize=(scale_x, scale_y))
+        else:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            figure = Figure(figsize=(scale_x, scale_y))
+            FigureCanvasAgg(figure)
+
+        self.draw(graph, figure)
+        path = self.save(figure, filename)
+
+        if show:
+            plt.show()
+            plt.close(figure)
+
+        return path
+
+    def draw(self, graph: Graph, figure: 'Figure'):
+        """
+        Draws the nodes, edges and labels of the graph into the figure. Edges with bends are drawn as polylines.
+        :param graph: Graph or CompactForest
+        :param figure: Figure
+        :return: None
+        """
+        from matplotlib.collections import LineCollection
+
+        names, coordinates, edge_indices = graph.get_coordinate_arrays()
+        axes = figure.add_axes([0, 0, 1, 1])
+        axes.set_axis_off()
+
+        if graph.edge_polylines:
+            segments = [graph.edge_polylines.get(edge) or coordinates[edge_index]
+                        for edge, edge_index in zip(graph.edges, edge_indices)]
+            axes.add_collection(LineCollection(segments, colors='k', linewidths=1, zorder=1))
+        elif len(edge_indices):
+            axes.add_collection(LineCollection(coordinates[edge_indices], colors='k', linewidths=1, zorder=1))
+        axes.scatter(coordinates[:, 0], coordinates[:, 1], s=self.node_size, c='#1f78b4', zorder=2)
+        if self.with_labels:
+            for name, (x, y) in zip(names, coordinates.tolist()):
+                axes.text(x, y, name, fontsize=self.font_size, horizontalalignment='center',
+                          verticalalignment='center', zorder=3)
+
+        axes.margins(0.05)
+        axes.autoscale_view()
+        axes.invert_yaxis()
+
+    def save(self, figure: 'Figure', filename: str):
+        """
+        Saves the figure in the output directory with the specified filename and the image format.
+        :param figure: Figure
+        :param filename: str, Filename for the image without extension
+        :return: str, path of the saved image
+        """
+        path = GraphRenderer.get_output_path(filename, self.image_format)
+        figure.savefig(path, dpi=self.dpi, format=self.image_format)
+        return path
+
+    @staticmethod
+    def get_output_path(filename: str, image_format: str):
+        """
+        Returns the path of the image within the output directory and creates the missing directories.
+        :param filename: str, Filename for the image without extension
+        :param image_format: str
+        :return: str
+        """
+        path = os.path.join('output', filename + '.' + image_format)
+        Graph.create_missing_dir(os.path.dirname(path))
+        return path
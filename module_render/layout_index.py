@@ -0,0 +1,207 @@
+import numpy as np
+
+from module_graph import Graph
+
+
+class LayoutQueryResult:
+    """
+    Class Layout Query Result
+    Content of a queried area: the visible nodes, the edges as pairs of points and the summaries of collapsed
+    subtrees. A summary is (parent, min_x, max_x, min_y, max_y, node_count), the parent is -1 for root nodes and
+    node_count is the amount of nodes in the collapsed subtrees.
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.edges = []
+        self.summaries = []
+
+
+class LayoutIndex:
+    """
+    Class Layout Index
+    Spatial index over the coordinates of a laid out tree. The tree itself is used as bounding volume hierarchy:
+    each node stores the bounding box of its subtree, so a query only descends into subtrees which intersect the
+    queried area. Subtrees narrower than the collapse width are merged per pixel column into summaries instead of
+    being visited, so the cost of a query depends on the visible content and not on the size of the tree.
+    The parents of the nodes define the tree, other edges of the graph are ignored. Several root nodes form a forest.
+    """
+
+    def __init__(self, graph: Graph):
+        """
+        :param graph: Graph or CompactForest, with calculated coordinates
+        """
+        names, coordinates, self.parent = graph.get_tree_arrays()
+        self.names = [str(name) for name in names]
+        self.x = np.ascontiguousarray(coordinates[:, 0])
+        self.y = np.ascontiguousarray(coordinates[:, 1])
+
+        order = np.argsort(self.parent, kind='stable')
+        root_count = int(np.count_nonzero(self.parent < 0))
+        self.roots = order[:root_count]
+        self.children = order[root_count:]
+        child_counts = np.bincount(self.parent[self.parent >= 0], minlength=len(self.parent))
+        self.child_offsets = np.concatenate(([0], np.cumsum(child_counts))).astype(np.int64)
+
+        self.min_x = self.x.copy()
+        self.max_x = self.x.copy()
+        self.min_y = self.y.copy()
+        self.max_y = self.y.copy()
+        self.subtree_sizes = np.ones(len(self.parent), dtype=np.int64)
+        for level in reversed(self.__get_levels()[1:]):
+            parents = self.parent[level]
+            np.add.at(self.subtree_sizes, parents, self.subtree_sizes[level])
+            np.minimum.at(self.min_x, parents, self.min_x[level])
+            np.maximum.at(self.max_x, parents, self.max_x[level])
+            np.minimum.at(self.min_y, parents, self.min_y[level])
+            np.maximum.at(self.max_y, parents, self.max_y[level])
+
+        self.label_space = self.__get_label_space()
+
+    def __len__(self):
+        return len(self.names)
+
+    def __get_levels(self):
+        """
+        Splits the nodes into levels by expanding the roots level by level.
+        :return: [np.ndarray], node numbers of each level
+        """
+        levels = [self.roots]
+        frontier = self.roots
+        while len(frontier):
+            starts = self.child_offsets[frontier]
+            lengths = self.child_offsets[frontier + 1] - starts
+            total = int(lengths.sum())
+            if not total:
+                break
+            group_starts = np.cumsum(lengths) - lengths
+            frontier = self.children[np.repeat(starts - group_starts, lengths) + np.arange(total)]
+            levels.append(frontier)
+
+        return levels
+
+    def __get_label_space(self):
+        """
+        Returns for each node the horizontal distance to its nearest neighbor on the same level.
+        :return: np.ndarray
+        """
+        order = np.lexsort((self.x, self.y))
+        sorted_x = self.x[order]
+        sorted_y = self.y[order]
+        gaps = np.where(sorted_y[1:] == sorted_y[:-1], np.diff(sorted_x), np.inf)
+        label_space = np.empty(len(order))
+        label_space[order] = np.minimum(np.concatenate(([np.inf], gaps)), np.concatenate((gaps, [np.inf])))
+        return label_space
+
+    def get_extent(self):
+        """
+        Returns the bounding box of all nodes.
+        :return: (float, float, float, float), min x, max x, min y and max y
+        """
+        if not len(self.names):
+            return 0.0, 0.0, 0.0, 0.0
+        return float(self.x.min()), float(self.x.max()), float(self.y.min()), float(self.y.max())
+
+    def query(self, bounds, x_scale: float, collapse_pixels=4.0, margin_x=0.0, margin_y=0.0):
+        """
+        Collects the content of the area. Subtrees narrower than collapse_pixels are merged into one summary
+        per column of collapse_pixels width. The columns are aligned to the origin, so adjacent areas agree.
+        Nodes within the margins around the area are also collected, so their labels and markers, which reach
+        into the area, can be drawn.
+        :param bounds: (float, float, float, float), min x, max x, min y and max y of the area
+        :param x_scale: float, pixels per x unit
+        :param collapse_pixels: float, width in pixels below which subtrees are collapsed
+        :param margin_x: float, horizontal margin in x units
+        :param margin_y: float, vertical margin in y units
+        :return: LayoutQueryResult
+        """
+        result = LayoutQueryResult()
+        stack = []
+        min_x, max_x, min_y, max_y = bounds
+        node_bounds = (min_x - margin_x, max_x + margin_x, min_y - margin_y, max_y + margin_y)
+        self.__visit_children(self.roots, -1, bounds, node_bounds, x_scale, collapse_pixels, stack, result)
+        min_x, max_x, min_y, max_y = node_bounds
+        while stack:
+            node = stack.pop()
+            if min_x <= self.x[node] <= max_x and min_y <= self.y[node] <= max_y:
+                result.nodes.append(node)
+            start = self.child_offsets[node]
+            end = self.child_offsets[node + 1]
+            if start < end:
+                self.__visit_children(self.children[start:end], node, bounds, node_bounds, x_scale, collapse_pixels,
+                                      stack, result)
+
+        return result
+
+    def __visit_children(self, children, parent: int, bounds, node_bounds, x_scale: float, collapse_pixels: float,
+                         stack, result: LayoutQueryResult):
+        """
+        Adds the edges, which cross the area, pushes the wide children, whose subtree intersects the area with
+        its margins, onto the stack and merges the narrow visible ones into summaries.
+        :return: None
+        """
+        min_x, max_x, min_y, max_y = node_bounds
+        subtree_visible = (self.min_x[children] <= max_x) & (self.max_x[children] >= min_x) \
+            & (self.min_y[children] <= max_y) & (self.max_y[children] >= min_y)
+        edge_visible = self.__get_visible_edges(children, parent, bounds) if parent >= 0 \
+            else np.zeros(len(children), dtype=bool)
+        visible = subtree_visible | edge_visible
+        narrow = (self.max_x[children] - self.min_x[children]) * x_scale < collapse_pixels
+
+        wide = visible & ~narrow
+        for child, has_subtree, has_edge in zip(children[wide].tolist(), subtree_visible[wide].tolist(),
+                                                edge_visible[wide].tolist()):
+            if has_subtree:
+                stack.append(child)
+            if has_edge:
+                result.edges.append(((self.x[parent], self.y[parent]), (self.x[child], self.y[child])))
+
+        narrow_children = children[visible & narrow]
+        narrow_edges = edge_visible[visible & narrow]
+        if not len(narrow_children):
+            return
+        columns = np.floor((self.min_x[narrow_children] + self.max_x[narrow_children]) / 2 * x_scale
+                           / collapse_pixels).astype(np.int64)
+        order = np.argsort(columns, kind='stable')
+        narrow_children = narrow_children[order]
+        narrow_edges = narrow_edges[order]
+        column_starts = np.flatnonzero(np.concatenate(([True], np.diff(columns[order]) != 0)))
+        column_min_x = np.minimum.reduceat(self.min_x[narrow_children], column_starts)
+        column_max_x = np.maximum.reduceat(self.max_x[narrow_children], column_starts)
+        column_min_y = np.minimum.reduceat(self.min_y[narrow_children], column_starts)
+        column_max_y = np.maximum.reduceat(self.max_y[narrow_children], column_starts)
+        column_node_counts = np.add.reduceat(self.subtree_sizes[narrow_children], column_starts)
+
+        for column in range(len(column_starts)):
+            if column_node_counts[column] == 1:
+                # A single leaf is drawn as node.
+                child = int(narrow_children[column_starts[column]])
+                stack.append(child)
+                if narrow_edges[column_starts[column]]:
+                    result.edges.append(((self.x[parent], self.y[parent]), (self.x[child], self.y[child])))
+            else:
+                result.summaries.append((parent, float(column_min_x[column]), float(column_max_x[column]),
+                                         float(column_min_y[column]), float(column_max_y[column]),
+                                         int(column_node_counts[column])))
+
+    def __get_visible_edges(self, children, parent: int, bounds):
+        """
+        Tests which edges from the parent to the children cross the area. Each edge is cut to the rows of the area
+        and the x range of the remaining part is compared with the columns of the area.
+        :param children: np.ndarray
+        :param parent: int
+        :param bounds: (float, float, float, float), min x, max x, min y and max y of the area
+        :return: np.ndarray, bool per child
+        """
+        min_x, max_x, min_y, max_y = bounds
+        parent_x = self.x[parent]
+        parent_y = self.y[parent]
+        child_x = self.x[children]
+        child_y = self.y[children]
+        low_y = np.maximum(np.minimum(child_y, parent_y), min_y)
+        high_y = np.minimum(np.maximum(child_y, parent_y), max_y)
+        delta_y = child_y - parent_y
+        slope = np.divide(child_x - parent_x, delta_y, out=np.zeros(len(children)), where=delta_y != 0)
+        low_x = np.where(delta_y != 0, parent_x + (low_y - parent_y) * slope, np.minimum(child_x, parent_x))
+        high_x = np.where(delta_y != 0, parent_x + (high_y - parent_y) * slope, np.maximum(child_x, parent_x))
+        return (low_y <= high_y) & (np.minimum(low_x, high_x) <= max_x) & (np.maximum(low_x, high_x) >= min_x)
@@ -0,0 +1,225 @@
+import hashlib
+import math
+import os
+
+import numpy as np
+
+from module_graph import Graph
+from module_graph import get_label_width_estimator
+from .graph_renderer import GraphRenderer
+from .graph_renderer import IMAGE_FORMATS
+from .layout_index import LayoutIndex
+
+
+class LevelOfDetailRenderer:
+    """
+    Class Level Of Detail Renderer
+    Renders viewports and tiles of a laid out tree from a LayoutIndex. Subtrees narrower than collapse_pixels
+    are drawn as one summary triangle per pixel column and labels are only drawn if they fit between the
+    neighbors of their node, so the cost of an image depends on its visible content and not on the tree size.
+    The tiles form a pyramid like Deep Zoom: the highest zoom level has pixels_per_unit and pixels_per_level
+    as scale, each lower level halves the scale until the whole tree fits into one tile.
+    """
+
+    def __init__(self, graph: Graph, dpi=100, image_format='png', collapse_pixels=4, node_size=20, font_size=8,
+                 pixels_per_unit=8, pixels_per_level=60, tile_size=256, with_labels=True):
+        """
+        :param graph: Graph or CompactForest, with calculated coordinates
+        :param dpi: int, resolution, the sizes of nodes and fonts are relative to it
+        :param image_format: str, png, svg or pdf
+        :param collapse_pixels: float, width in pixels below which subtrees are collapsed
+        :param node_size: float, area of a node marker in points^2
+        :param font_size: float, font size of the labels in points
+        :param pixels_per_unit: float, pixels per x unit at the highest zoom level
+        :param pixels_per_level: float, pixels per level at the highest zoom level
+        :param tile_size: int, width and height of a tile in pixels
+        :param with_labels: bool, draws the labels which fit between the neighbors of their node
+        """
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError('Unknown image format ' + image_format + ', expected one of ' + str(IMAGE_FORMATS))
+        self.index = LayoutIndex(graph)
+        self.dpi = dpi
+        self.image_format = image_format
+        self.collapse_pixels = collapse_pixels
+        self.node_size = node_size
+        self.font_size = font_size
+        self.pixels_per_unit = pixels_per_unit
+        self.pixels_per_level = pixels_per_level
+        self.tile_size = tile_size
+        self.with_labels = with_labels
+        # Labels repeat between the tiles and zoom levels, so their widths are taken from the shared cache.
+        self.label_widths = get_label_width_estimator()
+        self.max_label_width = float(self.label_widths.get_widths(self.index.names).max(initial=0)) \
+            if with_labels else 0.0
+        # The nodes on the border of the tree get half a distance as margin.
+        min_x, max_x, min_y, max_y = self.index.get_extent()
+        self.extent = (min_x - graph.distance / 2, max_x + graph.distance / 2, min_y - 0.5, max_y + 0.5)
+
+    def render_overview(self, filename: str, width=2000, height=1000):
+        """
+        Renders the whole tree into one image.
+        :param filename: str, Filename for the image without extension
+        :param width: int, width of the image in pixels
+        :param height: int, height of the image in pixels
+        :return: str, path of the saved image
+        """
+        return self.render_viewport(self.extent, width, height, filename)
+
+    def render_viewport(self, bounds, width: int, height: int, filename: str):
+        """
+        Renders the area of the layout into an image of the given size.
+        :param bounds: (float, float, float, float), min x, max x, min y and max y of the area
+        :param width: int, width of the image in pixels
+        :param height: int, height of the image in pixels
+        :param filename: str, Filename for the image without extension
+        :return: str, path of the saved image
+        """
+        figure = self.draw_viewport(bounds, width, height)
+        path = GraphRenderer.get_output_path(filename, self.image_format)
+        figure.savefig(path, dpi=self.dpi, format=self.image_format)
+        return path
+
+    def draw_viewport(self, bounds, width: int, height: int):
+        """
+        Draws the visible content of the area into a new figure of the given size.
+        :param bounds: (float, float, float, float), min x, max x, min y and max y of the area
+        :param width: int, width of the image in pixels
+        :param height: int, height of the image in pixels
+        :return: Figure
+        """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.collections import LineCollection
+        from matplotlib.collections import PolyCollection
+        from matplotlib.figure import Figure
+
+        min_x, max_x, min_y, max_y = bounds
+        x_scale = width / (max_x - min_x)
+        content = self.query(bounds, width, height)
+
+        figure = Figure(figsize=(width / self.dpi, height / self.dpi), dpi=self.dpi)
+        FigureCanvasAgg(figure)
+        axes = figure.add_axes([0, 0, 1, 1])
+        axes.set_axis_off()
+        axes.set_xlim(min_x, max_x)
+        axes.set_ylim(max_y, min_y)
+
+        index = self.index
+        segments = content.edges
+        triangles = []
+        # Summaries are at least one pixel wide and reach half a level below their deepest node.
+        half_pixel = 0.5 / x_scale
+        for parent, summary_min_x, summary_max_x, summary_min_y, summary_max_y, _ in content.summaries:
+            top = ((summary_min_x + summary_max_x) / 2, summary_min_y)
+            if parent >= 0:
+                segments.append(((index.x[parent], index.y[parent]), top))
+            triangles.append((top, (summary_min_x - half_pixel, summary_max_y + 0.5),
+                              (summary_max_x + half_pixel, summary_max_y + 0.5)))
+        if segments:
+            axes.add_collection(LineCollection(segments, colors='k', linewidths=0.5, zorder=1))
+        if triangles:
+            axes.add_collection(PolyCollection(triangles, facecolors='#a6cee3', edgecolors='#1f78b4',
+                                               linewidths=0.5, zorder=1))
+        if content.nodes:
+            axes.scatter(index.x[content.nodes], index.y[content.nodes], s=self.node_size, c='#1f78b4', zorder=2)
+
+        # Nodes in the margins are clipped, so their labels and markers continue seamlessly in the next tile.
+        pixels_per_em = self.font_size * self.dpi / 72
+        for node in content.nodes if self.with_labels else ():
+            name = index.names[node]
+            if self.label_widths.get_width(name) * pixels_per_em <= index.label_space[node] * x_scale:
+                axes.text(index.x[node], index.y[node], name, fontsize=self.font_size, clip_on=True,
+                          horizontalalignment='center', verticalalignment='center', zorder=3)
+
+        return figure
+
+    def query(self, bounds, width: int, height: int):
+        """
+        Queries the content of the area for an image of the given size. The nodes are collected within margins
+        of half of the longest label plus the marker radius in x and half of a line plus the marker radius in y,
+        so the labels and markers of nodes near the border are drawn into the image too.
+        :param bounds: (float, float, float, float), min x, max x, min y and max y of the area
+        :param width: int, width of the image in pixels
+        :param height: int, height of the image in pixels
+        :return: LayoutQueryResult
+        """
+        min_x, max_x, min_y, max_y = bounds
+        x_scale = width / (max_x - min_x)
+        y_scale = height / (max_y - min_y)
+        points_to_pixels = self.dpi / 72
+        marker_radius = math.sqrt(self.node_size) / 2 * points_to_pixels
+        label_width = self.max_label_width * self.font_size * points_to_pixels
+        label_height = self.font_size * points_to_pixels if self.with_labels else 0.0
+        return self.index.query(bounds, x_scale, self.collapse_pixels,
+                                margin_x=(label_width / 2 + marker_radius + 1) / x_scale,
+                                margin_y=(label_height / 2 + marker_radius + 1) / y_scale)
+
+    def get_max_zoom(self):
+        """
+        Returns the highest zoom level, on level 0 the whole tree fits into one tile.
+        :return: int
+        """
+        min_x, max_x, min_y, max_y = self.extent
+        largest_side = max((max_x - min_x) * self.pixels_per_unit, (max_y - min_y) * self.pixels_per_level)
+        return max(0, math.ceil(math.log2(largest_side / self.tile_size)))
+
+    def get_tile_counts(self, zoom: int):
+        """
+        Returns the amount of tile columns and rows of the zoom level.
+        :param zoom: int
+        :return: (int, int)
+        """
+        min_x, max_x, min_y, max_y = self.extent
+        factor = 2.0 ** (zoom - self.get_max_zoom())
+        columns = math.ceil((max_x - min_x) * self.pixels_per_unit * factor / self.tile_size)
+        rows = math.ceil((max_y - min_y) * self.pixels_per_level * factor / self.tile_size)
+        return max(1, columns), max(1, rows)
+
+    def get_tile_bounds(self, zoom: int, column: int, row: int):
+        """
+        Returns the area of the layout covered by the tile.
+        :param zoom: int
+        :param column: int
+        :param row: int
+        :return: (float, float, float, float), min x, max x, min y and max y
+        """
+        factor = 2.0 ** (zoom - self.get_max_zoom())
+        tile_width = self.tile_size / (self.pixels_per_unit * factor)
+        tile_height = self.tile_size / (self.pixels_per_level * factor)
+        min_x = self.extent[0] + column * tile_width
+        min_y = self.extent[2] + row * tile_height
+        return min_x, min_x + tile_width, min_y, min_y + tile_height
+
+    def render_tile(self, zoom: int, column: int, row: int, directory: str):
+        """
+        Renders one tile into directory/zoom/column/row like the z/x/y layout of tile servers.
+        :param zoom: int
+        :param column: int
+        :param row: int
+        :param directory: str, directory of the tiles within the output directory
+        :return: str, path of the saved tile
+        """
+        filename = os.path.join(directory, str(zoom), str(column), str(row))
+        return self.render_viewport(self.get_tile_bounds(zoom, column, row), self.tile_size, self.tile_size,
+                                    filename)
+
+    def get_content_hash(self, bounds, width: int, height: int):
+        """
+        Hashes everything that is drawn into the area, so an image only has to be rendered again if the hash changes.
+        :param bounds: (float, float, float, float), min x, max x, min y and max y of the area
+        :param width: int, width of the image in pixels
+        :param height: int, height of the image in pixels
+        :return: ?str, None if the area is empty
+        """
+        content = self.query(bounds, width, height)
+        if not (content.nodes or content.edges or content.summaries):
+            return None
+
+        index = self.index
+        nodes = np.array(content.nodes, dtype=np.int64)
+        content_hash = hashlib.sha1(repr((bounds, width, height, self.dpi, self.image_format, self.collapse_pixels,
+                                          self.node_size, self.font_size, self.with_labels)).encode())
+        content_hash.update(np.array(content.edges, dtype=float).tobytes())
+        content_hash.update(np.array(content.summaries, dtype=float).tobytes())
+        content_hash.update(np.stack((index.x[nodes], index.y[nodes], index.label_space[nodes])).tobytes())
+        content_hash.update('\n'.join(index.names[node] for node in content.nodes).encode())
+        return content_hash.hexdigest()
@@ -0,0 +1,168 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from module_color import Color
+from module_graph import Graph
+from .level_of_detail_renderer import LevelOfDetailRenderer
+
+TILE_MANIFEST_VERSION = 1
+TILE_CHUNK_SIZE = 64
+
+# Renderer of a worker process, it is set once per process by the pool initializer.
+_worker_renderer = None
+
+
+def export_tile_pyramid(graph: Graph, directory: str, image_format='png', jobs=1, max_zoom=None, tile_size=256):
+    """
+    Renders the laid out tree as tile pyramid into output/directory/z/x/y.png, which can be browsed with a
+    static viewer for z/x/y tiles. Level 0 shows the whole tree in one tile, each further level doubles the scale.
+    Only tiles with content are rendered. The content hash of each tile is kept in manifest.json, so a tile is
+    only rendered again when its content changed, and tiles without content are removed.
+    The tiles are rendered in a pool of worker processes, with one job in the current process.
+    :param graph: Graph, with calculated coordinates
+    :param directory: str, directory of the pyramid within the output directory
+    :param image_format: str, png or svg
+    :param jobs: int, amount of worker processes
+    :param max_zoom: ?int, highest rendered zoom level, by default the one with the full scale
+    :param tile_size: int, width and height of a tile in pixels
+    :return: (int, int, int), amount of tiles, rendered tiles and removed tiles
+    """
+    start = time.perf_counter()
+    renderer = LevelOfDetailRenderer(graph, image_format=image_format, tile_size=tile_size)
+    full_zoom = renderer.get_max_zoom()
+    max_zoom = full_zoom if max_zoom is None else min(max_zoom, full_zoom)
+
+    manifest_path = os.path.join('output', directory, 'manifest.json')
+    old_tiles = read_tile_manifest(manifest_path, renderer)
+    tiles = get_tile_hashes(renderer, max_zoom)
+    changed_tiles = [tile for tile, content_hash in tiles.items() if old_tiles.get(tile) != content_hash
+                     or not os.path.exists(get_tile_path(directory, tile, image_format))]
+    removed_tiles = [tile for tile in old_tiles if tile not in tiles]
+
+    for tile in removed_tiles:
+        path = get_tile_path(directory, tile, image_format)
+        if os.path.exists(path):
+            os.remove(path)
+    chunks = [(changed_tiles[position:position + TILE_CHUNK_SIZE], directory)
+              for position in range(0, len(changed_tiles), TILE_CHUNK_SIZE)]
+    if jobs <= 1:
+        set_worker_renderer(renderer)
+        for chunk in chunks:
+            render_tiles(chunk)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=set_worker_renderer,
+                                 initargs=(renderer,)) as executor:
+            for _ in executor.map(render_tiles, chunks):
+                pass
+
+    write_tile_manifest(manifest_path, renderer, max_zoom, tiles)
+    print(Color.BOLD + 'Tile Pyramid:' + Color.END, os.path.join('output', directory), 'Zoom Levels:', max_zoom + 1,
+          'Tiles:', len(tiles), 'Rendered:', len(changed_tiles), 'Removed:', len(removed_tiles),
+          'Seconds:', round(time.perf_counter() - start, 3))
+    return len(tiles), len(changed_tiles), len(removed_tiles)
+
+
+def get_tile_hashes(renderer: LevelOfDetailRenderer, max_zoom: int):
+    """
+    Hashes the content of the tiles level by level. Only the four tiles below a tile with content
+    can have content, so empty areas are skipped on all deeper levels.
+    :param renderer: LevelOfDetailRenderer
+    :param max_zoom: int
+    :return: {str: str}, content hash by 'z/x/y'
+    """
+    tiles = {}
+    candidates = [(0, 0)]
+    for zoom in range(max_zoom + 1):
+        columns, rows = renderer.get_tile_counts(zoom)
+        filled_tiles = []
+        for column, row in candidates:
+            if column >= columns or row >= rows:
+                continue
+            bounds = renderer.get_tile_bounds(zoom, column, row)
+            content_hash = renderer.get_content_hash(bounds, renderer.tile_size, renderer.tile_size)
+            if content_hash:
+                tiles[str(zoom) + '/' + str(column) + '/' + str(row)] = content_hash
+                filled_tiles.append((column, row))
+        candidates = [(2 * column + column_offset, 2 * row + row_offset) for column, row in filled_tiles
+                      for column_offset in (0, 1) for row_offset in (0, 1)]
+
+    return tiles
+
+
+def set_worker_renderer(renderer: LevelOfDetailRenderer):
+    """
+    Keeps the renderer for the following render_tiles calls of the process.
+    :param renderer: LevelOfDetailRenderer
+    :return: None
+    """
+    global _worker_renderer
+    _worker_renderer = renderer
+
+
+def render_tiles(chunk):
+    """
+    Renders the tiles of the chunk with the renderer of the process.
+    :param chunk: ([str], str), tiles as 'z/x/y' and directory of the pyramid
+    :return: int, amount of rendered tiles
+    """
+    tiles, directory = chunk
+    for tile in tiles:
+        zoom, column, row = map(int, tile.split('/'))
+        _worker_renderer.render_tile(zoom, column, row, directory)
+
+    return len(tiles)
+
+
+def get_tile_path(directory: str, tile: str, image_format: str):
+    """
+    Returns the path of the tile image.
+    :param directory: str, directory of the pyramid within the output directory
+    :param tile: str, 'z/x/y'
+    :param image_format: str
+    :return: str
+    """
+    return os.path.join('output', directory, *tile.split('/')) + '.' + image_format
+
+
+def read_tile_manifest(path: str, renderer: LevelOfDetailRenderer):
+    """
+    Returns the content hashes of the existing tiles. They are only valid if the tiles have the same format.
+    :param path: str, path of the manifest
+    :param renderer: LevelOfDetailRenderer
+    :return: {str: str}, content hash by 'z/x/y'
+    """
+    try:
+        with open(path, encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if manifest.get('version') != TILE_MANIFEST_VERSION or manifest.get('format') != renderer.image_format \
+            or manifest.get('tile_size') != renderer.tile_size:
+        return {}
+
+    return manifest.get('tiles', {})
+
+
+def write_tile_manifest(path: str, renderer: LevelOfDetailRenderer, max_zoom: int, tiles):
+    """
+    Writes the description of the pyramid and the content hashes of the tiles.
+    :param path: str, path of the manifest
+    :param renderer: LevelOfDetailRenderer
+    :param max_zoom: int
+    :param tiles: {str: str}, content hash by 'z/x/y'
+    :return: None
+    """
+    Graph.create_missing_dir(os.path.dirname(path))
+    manifest = {
+        'version': TILE_MANIFEST_VERSION,
+        'format': renderer.image_format,
+        'tile_size': renderer.tile_size,
+        'max_zoom': max_zoom,
+        'extent': renderer.extent,
+        'levels': [renderer.get_tile_counts(zoom) for zoom in range(max_zoom + 1)],
+        'tiles': tiles
+    }
+    with open(path, 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, indent=1, sort_keys=True)
@@ -0,0 +1,32 @@
+import contextlib
+import io
+import unittest
+
+from module_cli import run_command_line
+
+NEWICK_FILE = 'directed_graph_examples/Phylogeny-Binaer/7way.nh'
+
+
+class CommandLineTest(unittest.TestCase):
+
+    def assert_argument_error(self, arguments, message: str):
+        error_output = io.StringIO()
+        with self.assertRaises(SystemExit) as context, contextlib.redirect_stderr(error_output):
+            run_command_line(arguments)
+        self.assertEqual(2, context.exception.code)
+        self.assertIn(message, error_output.getvalue())
+
+    def test_phylogram_rejects_graphml_and_tree_files(self):
+        for filename in ('directed_graph_examples/graphml/JFtp.graphml', 'tree.nh.gvt'):
+            for command in ('layout', 'render'):
+                with self.subTest(filename=filename, command=command):
+                    self.assert_argument_error([command, '--phylogram', 'rectangular', NEWICK_FILE, filename],
+                                               'the phylogram mode only reads newick files, not ' + filename)
+
+    def test_phylogram_rejects_graphml_files_of_batch_directories(self):
+        self.assert_argument_error(['batch', '--phylogram', 'radial', 'directed_graph_examples/graphml'],
+                                   'directed_graph_examples/graphml/JFtp.graphml')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+
+from module_batch.batch_layout import convert_to_tree_file
+from module_graph import TreeFile
+from module_parse import parse_graphml_file_edge_list
+
+GRAPHML_FILES = sorted(glob.glob(os.path.abspath('directed_graph_examples/graphml/*.graphml')))
+
+
+class ConvertToTreeFileTest(unittest.TestCase):
+
+    def setUp(self):
+        # The tree file is written into the output directory below the working directory.
+        working_directory = os.getcwd()
+        temporary_directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temporary_directory)
+        self.addCleanup(os.chdir, working_directory)
+        os.chdir(temporary_directory)
+
+    def test_graphml_files_keep_all_nodes(self):
+        self.assertTrue(GRAPHML_FILES)
+        for graphml_file in GRAPHML_FILES:
+            with self.subTest(graphml_file=os.path.basename(graphml_file)):
+                filename = os.path.basename(graphml_file)
+                shutil.copy(graphml_file, filename)
+                node_names, edges = parse_graphml_file_edge_list(filename)
+
+                tree = TreeFile(convert_to_tree_file(filename)).get_tree()
+                # All nodes of the graphml file are below the virtual root node 0.
+                self.assertEqual(len(node_names) + 1, len(tree))
+                self.assertEqual(sorted(node_names), sorted(tree.names[1:]))
+                self.assertTrue(all(0 <= parent < number for number, parent in enumerate(tree.parent[1:], 1)))
+                # Each edge of the tree is a directed edge of the graphml file.
+                edge_set = set(edges)
+                self.assertTrue(all((tree.names[parent], tree.names[number]) in edge_set
+                                    for number, parent in enumerate(tree.parent[1:], 1) if parent > 0))
+
+    def test_graphml_file_with_layout(self):
+        filename = os.path.basename(GRAPHML_FILES[0])
+        shutil.copy(GRAPHML_FILES[0], filename)
+        tree_file = TreeFile(convert_to_tree_file(filename, with_layout=True))
+        self.assertTrue(tree_file.has_layout)
+        self.assertEqual(len(parse_graphml_file_edge_list(filename)[0]) + 1, len(tree_file.get_tree()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from improved_walker_algorithm import CompactImprovedWalkerAlgorithm
+from improved_walker_algorithm import ImprovedWalkerAlgorithm
+from module_graph import Phylogram
+from module_parse import parse_newick_file_to_compact_tree
+from module_parse import parse_newick_file_to_graph
+from module_render import GraphRenderer
+
+NEWICK_FILES = ('directed_graph_examples/Phylogeny-Binaer/7way.nh',
+                'directed_graph_examples/Phylogeny-Binaer/hg38.100way.commonNames.nh')
+
+
+class FigureSizeTest(unittest.TestCase):
+
+    def test_a_single_scale_is_kept(self):
+        for newick_file in NEWICK_FILES:
+            graph = parse_newick_file_to_graph(newick_file)
+            ImprovedWalkerAlgorithm().calculate_layout(graph)
+            derived = GraphRenderer.get_figure_size(graph)
+            for scale_x, scale_y in ((3, None), (20, None), (None, 4), (None, 30)):
+                with self.subTest(newick_file=newick_file, scale_x=scale_x, scale_y=scale_y):
+                    figure_size = GraphRenderer.get_figure_size(graph, scale_x, scale_y)
+                    if scale_x:
+                        self.assertEqual(scale_x, figure_size.scale_x)
+                        self.assertLessEqual(figure_size.scale_y, derived.scale_y)
+                    else:
+                        self.assertEqual(scale_y, figure_size.scale_y)
+                        self.assertLessEqual(figure_size.scale_x, derived.scale_x)
+
+    def test_the_missing_scale_is_derived(self):
+        graph = parse_newick_file_to_graph(NEWICK_FILES[0])
+        ImprovedWalkerAlgorithm().calculate_layout(graph)
+        derived = GraphRenderer.get_figure_size(graph)
+        self.assertAlmostEqual(derived.scale_y, GraphRenderer.get_figure_size(graph, scale_x=10).scale_y)
+        self.assertAlmostEqual(derived.scale_x, GraphRenderer.get_figure_size(graph, scale_y=10).scale_x)
+
+    def test_a_radial_phylogram_stays_square(self):
+        tree = parse_newick_file_to_compact_tree(NEWICK_FILES[1])
+        CompactImprovedWalkerAlgorithm().run(tree)
+        figure_size = GraphRenderer.get_figure_size(Phylogram(tree, 'radial'), scale_y=12)
+        self.assertEqual((12, 12), (figure_size.scale_x, figure_size.scale_y))
+
+
+if __name__ == '__main__':
+    unittest.main()
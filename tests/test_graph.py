@@ -0,0 +1,53 @@
+import unittest
+
+from module_graph import Graph
+from module_graph import Node
+
+
+def create_subtree(name: str, child_names):
+    root = Node(name=name)
+    root.set_children([Node(name=child_name) for child_name in child_names])
+    return root
+
+
+class GraphTest(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = Graph.create_graph_from_parent_array(['root', 'a', 'b', 'c'], [-1, 0, 0, 1])
+
+    def assert_unchanged(self):
+        self.assertEqual(['root', 'a', 'b', 'c'], [node.name for node in self.graph.nodes])
+        self.assertEqual(['a', 'b'], [child.name for child in self.graph.root_node.children])
+        self.assertIsNone(self.graph.get_node_by_name('d'))
+
+    def test_add_child_grafts_the_subtree(self):
+        parent = self.graph.get_node_by_name('b')
+        child = self.graph.add_child(parent, create_subtree('d', ['e', 'f']))
+        self.assertEqual((child,), parent.children)
+        self.assertEqual(['root', 'a', 'b', 'c', 'd', 'e', 'f'], [node.name for node in self.graph.nodes])
+        self.assertIs(child, self.graph.get_node_by_name('e').parent)
+
+    def test_add_child_rejects_a_duplicate_below_the_subtree_root(self):
+        for child_names in (['e', 'c'], ['e', 'root'], ['e', 'e']):
+            with self.subTest(child_names=child_names):
+                subtree = create_subtree('d', child_names)
+                with self.assertRaises(ValueError):
+                    self.graph.add_child(self.graph.get_node_by_name('b'), subtree)
+                self.assert_unchanged()
+                self.assertIsNone(subtree.parent)
+
+    def test_edge_list_shares_the_names_of_the_nodes(self):
+        names = ['root', 'left', 'right']
+        # Equal names as new strings, like the attributes of each edge of a parsed graphml file.
+        edges = [(''.join(edge_from), ''.join(edge_to)) for edge_from, edge_to in
+                 [('root', 'left'), ('root', 'right'), ('left', 'right'), ('root', 'leaf')]]
+        graph = Graph.create_graph_from_edge_list(names, edges)
+        self.assertIsNotNone(graph.explicit_edges)
+        for edge_from, edge_to in graph.explicit_edges:
+            self.assertIs(graph.get_node_by_name(edge_from).name, edge_from)
+            self.assertIs(graph.get_node_by_name(edge_to).name, edge_to)
+        self.assertIs(names[0], graph.root_node.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
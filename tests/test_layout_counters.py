@@ -0,0 +1,43 @@
+import unittest
+
+from improved_walker_algorithm import CompactImprovedWalkerAlgorithm
+from improved_walker_algorithm import ImprovedWalkerAlgorithm
+from module_graph import CompactTree
+from module_instrumentation import Instrumentation
+from module_parse import parse_newick_file_to_graph
+
+NEWICK_FILES = ('directed_graph_examples/Phylogeny-Binaer/hg38.100way.commonNames.nh',
+                'directed_graph_examples/Phylogeny-Binaer/ce11.26way.commonNames.nh',
+                'directed_graph_examples/Phylogeny/phyliptree.nh')
+
+
+class LayoutCountersTest(unittest.TestCase):
+
+    def test_compact_counters_match_node_counters(self):
+        for newick_file in NEWICK_FILES:
+            for label_spacing in (False, True):
+                with self.subTest(newick_file=newick_file, label_spacing=label_spacing):
+                    graph = parse_newick_file_to_graph(newick_file)
+                    if label_spacing:
+                        graph.set_label_widths()
+                    tree = CompactTree.from_graph(graph)
+                    algorithm = ImprovedWalkerAlgorithm()
+                    algorithm.calculate_layout(graph)
+                    compact_algorithm = CompactImprovedWalkerAlgorithm()
+                    compact_algorithm.run(tree)
+
+                    self.assertGreater(algorithm.get_counters()['contour_steps'], 0)
+                    self.assertEqual(algorithm.get_counters(), compact_algorithm.get_counters())
+
+    def test_compact_counters_are_reported(self):
+        tree = CompactTree.from_graph(parse_newick_file_to_graph(NEWICK_FILES[0]))
+        instrumentation = Instrumentation()
+        with instrumentation.activate():
+            algorithm = CompactImprovedWalkerAlgorithm()
+            algorithm.run(tree)
+
+        self.assertEqual({'CompactImprovedWalkerAlgorithm': algorithm.get_counters()}, instrumentation.counters)
+
+
+if __name__ == '__main__':
+    unittest.main()
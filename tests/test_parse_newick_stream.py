@@ -0,0 +1,22 @@
+import io
+import unittest
+
+from module_parse.parse_newick_stream import tokenize_newick
+
+
+class TokenizeNewickTest(unittest.TestCase):
+
+    def test_quoted_label_across_chunks(self):
+        for text in ("(A,'x,y')root;", "(A,'x''s, y'):1.5;", "('a(b)':2,[c]B);"):
+            expected = list(tokenize_newick(io.StringIO(text)))
+            for chunk_size in range(1, len(text) + 1):
+                with self.subTest(text=text, chunk_size=chunk_size):
+                    self.assertEqual(expected, list(tokenize_newick(io.StringIO(text), chunk_size=chunk_size)))
+
+    def test_quoted_label_is_one_token(self):
+        self.assertEqual(['(', 'A', ',', "'x,y'", ')', 'root', ';'],
+                         list(tokenize_newick(io.StringIO("(A,'x,y')root;"), chunk_size=2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
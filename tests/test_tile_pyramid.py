@@ -0,0 +1,82 @@
+import io
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from improved_walker_algorithm import ImprovedWalkerAlgorithm
+from module_parse import parse_newick_file_to_graph
+from module_render import LevelOfDetailRenderer
+from module_render import get_tile_hashes
+
+NEWICK_FILE = 'directed_graph_examples/Phylogeny-Binaer/hg38.20way.commonNames.nh'
+
+
+def create_renderer(renamed_nodes=None):
+    graph = parse_newick_file_to_graph(NEWICK_FILE)
+    ImprovedWalkerAlgorithm().calculate_layout(graph)
+    for node in graph.nodes:
+        node.name = (renamed_nodes or {}).get(node.name, node.name)
+    return LevelOfDetailRenderer(graph)
+
+
+def draw_gray(renderer: LevelOfDetailRenderer, bounds, width: int, height: int):
+    image_file = io.BytesIO()
+    renderer.draw_viewport(bounds, width, height).savefig(image_file, dpi=renderer.dpi, format='png')
+    return np.asarray(Image.open(image_file).convert('L'), dtype=float)
+
+
+class TilePyramidTest(unittest.TestCase):
+
+    def test_stitched_tiles_match_one_image(self):
+        renderer = create_renderer()
+        zoom = renderer.get_max_zoom()
+        columns, rows = renderer.get_tile_counts(zoom)
+        tile_size = renderer.tile_size
+        stitched = np.zeros((rows * tile_size, columns * tile_size))
+        for column in range(columns):
+            for row in range(rows):
+                stitched[row * tile_size:(row + 1) * tile_size, column * tile_size:(column + 1) * tile_size] = \
+                    draw_gray(renderer, renderer.get_tile_bounds(zoom, column, row), tile_size, tile_size)
+
+        first = renderer.get_tile_bounds(zoom, 0, 0)
+        last = renderer.get_tile_bounds(zoom, columns - 1, rows - 1)
+        whole = draw_gray(renderer, (first[0], last[1], first[2], last[3]), columns * tile_size, rows * tile_size)
+        self.assertEqual(0, int(np.count_nonzero(np.abs(stitched - whole) > 64)))
+
+    def test_hashes_are_stable(self):
+        first_renderer = create_renderer()
+        zoom = first_renderer.get_max_zoom()
+        self.assertEqual(get_tile_hashes(first_renderer, zoom), get_tile_hashes(create_renderer(), zoom))
+
+    def test_renamed_label_changes_only_the_tiles_it_reaches(self):
+        renderer = create_renderer()
+        zoom = renderer.get_max_zoom()
+        hashes = get_tile_hashes(renderer, zoom)
+        reached_tiles = {}
+        for tile in hashes:
+            for node in renderer.query(_get_bounds(renderer, tile), renderer.tile_size, renderer.tile_size).nodes:
+                reached_tiles.setdefault(node, set()).add(tile)
+        # A node near a seam, whose label reaches into a tile which does not contain the node itself.
+        node = next(node for node, tiles in sorted(reached_tiles.items())
+                    if any(not _contains(renderer, tile, node) for tile in tiles))
+
+        # The new name has the same length, so the margins of the tiles stay the same.
+        name = renderer.index.names[node]
+        renamed_hashes = get_tile_hashes(create_renderer({name: name[::-1]}), zoom)
+        changed_tiles = {tile for tile in hashes if hashes[tile] != renamed_hashes.get(tile)}
+        self.assertEqual(reached_tiles[node], changed_tiles)
+
+
+def _get_bounds(renderer: LevelOfDetailRenderer, tile: str):
+    zoom, column, row = map(int, tile.split('/'))
+    return renderer.get_tile_bounds(zoom, column, row)
+
+
+def _contains(renderer: LevelOfDetailRenderer, tile: str, node: int):
+    min_x, max_x, min_y, max_y = _get_bounds(renderer, tile)
+    return min_x <= renderer.index.x[node] <= max_x and min_y <= renderer.index.y[node] <= max_y
+
+
+if __name__ == '__main__':
+    unittest.main()